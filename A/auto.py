@@ -5,24 +5,37 @@
 支持多用户配置，可在GitHub Actions上运行
 """
 
+import argparse
+import asyncio
 import json
 import logging
+import multiprocessing
 import os
 import sys
-import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
 # 在文件顶部的导入部分添加
 import yaml
+# 直接运行 python A/auto.py 时把仓库根目录加入模块搜索路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # 导入现有模块
-from manager.ConfigManager import ConfigManager, CONFIG_PATH as ORIGINAL_CONFIG_PATH
-from manager.UserInfoManager import UserInfoManager, USER_INFO_PATH as ORIGINAL_USER_INFO_PATH
-from manager.PlanInfoManager import PlanInfoManager, PLAN_INFO_PATH as ORIGINAL_PLAN_INFO_PATH
-from step.clockIn import clock_in
-from step.fetchPlan import fetch_plan
-from step.login import login
-from step.sendEmail import send_email
-from util.HelperFunctions import get_checkin_type
+from manager.CaptchaCacheManager import CaptchaCacheManager  # noqa: E402
+from manager.UserContext import UserContext  # noqa: E402
+from step.clockIn import clock_in  # noqa: E402
+from step.fetchPlan import fetch_plan  # noqa: E402
+from step.login import login  # noqa: E402
+from step.sendEmail import send_email  # noqa: E402
+from util.ApiService import ApiService  # noqa: E402
+from util.AsyncApiService import AsyncApiService  # noqa: E402
+from util.CaptchaService import CaptchaService  # noqa: E402
+from util.CircuitBreaker import CircuitBreaker  # noqa: E402
+from util.HelperFunctions import get_checkin_type, desensitize_name, desensitize_phone, desensitize_address  # noqa: E402
+from util.RateLimiter import RateLimiter  # noqa: E402
+from util.RetryPolicy import RetryPolicy  # noqa: E402
+
+# 因接口熔断未执行打卡的用户结果，与 True（成功或无需打卡）、False（失败）区分
+CIRCUIT_SKIPPED = "circuit_skipped"
 
 def is_custom_checkin_day(user_config):
     """检查当前日期是否为自定义打卡日期"""
@@ -95,45 +108,41 @@ def load_users_config():
     
     # ... 其余代码保持不变
 
-def setup_user_config(user_config):
-    """为单个用户设置配置"""
-    # 创建临时目录存储用户配置
-    temp_dir = tempfile.mkdtemp()
-    
-    # 设置配置文件路径
-    config_path = os.path.join(temp_dir, "config.json")
-    user_dir = os.path.join(temp_dir, "user")
-    os.makedirs(user_dir, exist_ok=True)
-    
-    # 写入配置文件
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(user_config, f, ensure_ascii=False, indent=4)
-    
-    # 保存原始路径
-    original_config_path = ORIGINAL_CONFIG_PATH
-    original_user_info_path = ORIGINAL_USER_INFO_PATH
-    original_plan_info_path = ORIGINAL_PLAN_INFO_PATH
-    
-    # 导入模块并修改路径常量
-    import manager.ConfigManager as cm
-    import manager.UserInfoManager as uim
-    import manager.PlanInfoManager as pim
-    
-    # 更新路径常量
-    cm.CONFIG_PATH = Path(config_path)
-    uim.USER_INFO_PATH = Path(user_dir) / "userInfo.json"
-    pim.PLAN_INFO_PATH = Path(user_dir) / "planInfo.json"
-    
-    # 清除缓存
-    ConfigManager._config_cache = None
-    UserInfoManager._userInfo_cache = None
-    PlanInfoManager._planinfo_cache = None
-    
-    # 返回临时目录和原始路径，以便后续恢复
-    return temp_dir, original_config_path, original_user_info_path, original_plan_info_path
+def determine_clock_type(clock_type=None):
+    """未指定打卡类型时根据北京时间判断上班卡/下班卡"""
+    if clock_type is None:
+        # 获取北京时间（UTC+8）
+        from datetime import timezone, timedelta
+        current_time = datetime.now(timezone(timedelta(hours=8)))
+        hour = current_time.hour
+        clock_type = "上班" if hour < 12 else "下班"
+        logging.info(f"当前北京时间: {current_time.strftime('%H:%M')}, 执行{clock_type}卡")
+    else:
+        logging.info(f"执行{clock_type}卡打卡")
+    return clock_type
+
+def resolve_checkin_type(clock_type):
+    """将上班/下班转换为接口使用的打卡类型和显示名称"""
+    if clock_type == "下班":
+        return "END", "下班"
+    # 默认上班卡
+    return "START", "上班"
+
+def build_clock_in_result(success, phone, address):
+    """根据打卡提交结果生成通知内容，敏感信息脱敏处理"""
+    phone = desensitize_phone(phone)
+    address = desensitize_address(address)
+    if success.get("result"):
+        logging.info("打卡成功")
+        content = f"签到账号：{phone}\n签到地点：{address}"
+        return {"title": "工学云签到成功通知", "content": content}
+    logging.warning(f"打卡失败：{success.get('data')}")
+    # 打卡失败时也返回账号和地点信息
+    content = f"签到账号：{phone}\n签到地点：{address}\n失败原因：{success.get('data')}"
+    return {"title": "工学云签到失败通知", "content": content}
 
 def execute_clock_in(user_config, clock_type=None):
-    """为单个用户执行打卡操作"""
+    """为单个用户执行打卡操作，用户状态只保存在内存中的 UserContext 里"""
     phone = user_config.get("config", {}).get("user", {}).get("phone", "未知用户")
     logging.info(f"开始为用户 {phone} 执行打卡任务")
     
@@ -142,102 +151,64 @@ def execute_clock_in(user_config, clock_type=None):
         logging.info(f"用户 {phone} 今日不在自定义打卡日期内，跳过打卡")
         return True  # 返回True表示成功跳过，不视为失败
     
-    # 设置用户配置
-    temp_dir, original_config_path, original_user_info_path, original_plan_info_path = setup_user_config(user_config)
+    if CircuitBreaker.get_default().is_open():
+        logging.warning(f"接口熔断中，跳过用户 {phone}")
+        return CIRCUIT_SKIPPED
+    
+    # 创建用户上下文
+    ctx = UserContext.from_user_config(user_config)
     
     try:
         # 判断打卡类型
-        if clock_type is None:
-            # 获取北京时间（UTC+8）
-            from datetime import timezone, timedelta
-            current_time = datetime.now(timezone(timedelta(hours=8)))
-            hour = current_time.hour
-            clock_type = "上班" if hour < 12 else "下班"
-            logging.info(f"当前北京时间: {current_time.strftime('%H:%M')}, 执行{clock_type}卡")
-        else:
-            logging.info(f"执行{clock_type}卡打卡")
+        clock_type = determine_clock_type(clock_type)
         
         # 登录
-        is_login = login()
+        is_login = login(ctx)
         if not is_login:
             logging.warning(f"用户 {phone} 登录失败")
-            return False
+            return failure_result(ctx)
         
         logging.info(f"用户 {phone} 登录成功")
         
         # 获取打卡信息
-        has_plan = fetch_plan()
+        has_plan = fetch_plan(ctx)
         if not has_plan:
             logging.warning(f"用户 {phone} 未获取到打卡信息")
-            return False
+            return failure_result(ctx)
         
         # 执行打卡 - 根据clock_type参数决定打卡类型
-        result = clock_in_with_type(clock_type)
+        result = clock_in_with_type(clock_type, ctx)
         logging.info(f"用户 {phone} 打卡结果: {result}")
         
         # 发送邮件通知
-        if user_config.get("config", {}).get("smtp", {}).get("enable", False):
-            send_email(result["title"], result["content"])
+        if ctx.get_config("smtp", "enable", default=False):
+            send_email(result["title"], result["content"], ctx)
         
         return True
     
     except Exception as e:
         logging.error(f"用户 {phone} 打卡过程中发生异常: {e}")
-        return False
-    
-    finally:
-        # 恢复原始路径
-        import manager.ConfigManager as cm
-        import manager.UserInfoManager as uim
-        import manager.PlanInfoManager as pim
-        
-        cm.CONFIG_PATH = original_config_path
-        uim.USER_INFO_PATH = original_user_info_path
-        pim.PLAN_INFO_PATH = original_plan_info_path
-        
-        # 清除缓存
-        ConfigManager._config_cache = None
-        UserInfoManager._userInfo_cache = None
-        PlanInfoManager._planinfo_cache = None
-        
-        # 清理临时文件
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
-def clock_in_with_type(clock_type):
+        return failure_result(ctx)
+
+def failure_result(ctx):
+    """打卡未完成时的结果：有请求被熔断拒绝的记为因熔断跳过，否则为失败"""
+    return CIRCUIT_SKIPPED if ctx.circuit_rejected else False
+
+def clock_in_with_type(clock_type, ctx):
     """
     根据指定的打卡类型执行打卡
     """
-    from manager.ConfigManager import ConfigManager
-    from util.ApiService import ApiService
-    from util.HelperFunctions import desensitize_name, desensitize_phone, desensitize_address
-    from manager.UserInfoManager import UserInfoManager
-    from datetime import datetime
-    
     logging.info(f"执行{clock_type}卡打卡")
     
     current_time = datetime.now()
     
     # 根据clock_type设置打卡类型
-    if clock_type == "上班":
-        checkin_type = "START"
-        display_type = "上班"
-    elif clock_type == "下班":
-        checkin_type = "END"
-        display_type = "下班"
-    else:
-        # 默认上班卡
-        checkin_type = "START"
-        display_type = "上班"
+    checkin_type, display_type = resolve_checkin_type(clock_type)
     
-    # 调用API服务 - 每次创建新的实例确保使用当前用户配置
-    api_client = ApiService()
+    # 调用API服务 - 使用当前用户的上下文
+    api_client = ApiService(ctx)
     
-    # 重新获取当前用户的打卡信息，确保不是前一个用户的信息
     try:
-        # 清除缓存，强制重新获取当前用户信息
-        UserInfoManager._userInfo_cache = None
-        PlanInfoManager._planinfo_cache = None
-        
         # 获取打卡信息
         last_checkin_info = api_client.get_checkin_info()
         
@@ -253,7 +224,7 @@ def clock_in_with_type(clock_type):
         logging.warning(f"获取打卡信息失败，继续执行打卡: {e}")
         last_checkin_info = None
 
-    user_name = desensitize_name(UserInfoManager.get("nikeName"))
+    user_name = desensitize_name(ctx.get_user("nikeName"))
     logging.info(f"用户 {user_name} 开始 {display_type} 打卡")
 
     # 设置打卡信息
@@ -267,24 +238,236 @@ def clock_in_with_type(clock_type):
     success = api_client.submit_clock_in(checkin_info)
 
     # 记录获取结果
-    if success.get("result"):
-        logging.info("打卡成功")
-        # 使用脱敏函数处理敏感信息
-        phone = desensitize_phone(ConfigManager.get('user', 'phone'))
-        address = desensitize_address(ConfigManager.get('clockIn', 'location', 'address'))
-        content = f"签到账号：{phone}\n签到地点：{address}"
-        return {"title": "工学云签到成功通知", "content": content}
+    return build_clock_in_result(success,
+                                 ctx.phone,
+                                 ctx.get_config('clockIn', 'location', 'address'))
+
+async def clock_in_with_type_async(api_client, clock_type):
+    """
+    clock_in_with_type 的异步版本
+    """
+    ctx = api_client.ctx
+    checkin_type, display_type = resolve_checkin_type(clock_type)
+    current_time = datetime.now()
+
+    try:
+        last_checkin_info = await api_client.get_checkin_info()
+
+        # 检查是否已经打过卡
+        if last_checkin_info and last_checkin_info.get("type") == checkin_type:
+            last_checkin_time = datetime.strptime(
+                last_checkin_info["createTime"], "%Y-%m-%d %H:%M:%S")
+            if last_checkin_time.date() == current_time.date():
+                log = f"今日[{display_type}]卡已打，无需重复打卡"
+                logging.info(log)
+                return {"title": "工学云签到任务通知", "content": log}
+    except Exception as e:
+        logging.warning(f"获取打卡信息失败，继续执行打卡: {e}")
+        last_checkin_info = None
+
+    user_name = desensitize_name(ctx.get_user("nikeName"))
+    logging.info(f"用户 {user_name} 开始 {display_type} 打卡")
+
+    checkin_info = {
+        "type": checkin_type,
+        "lastDetailAddress": last_checkin_info.get("address") if last_checkin_info else None,
+        "attachments": None,
+        "description": "",
+    }
+
+    success = await api_client.submit_clock_in(checkin_info)
+    return build_clock_in_result(success,
+                                 ctx.phone,
+                                 ctx.get_config('clockIn', 'location', 'address'))
+
+async def execute_clock_in_async(user_config, clock_type, semaphore):
+    """
+    异步为单个用户执行打卡，可与其他用户并发执行
+    """
+    phone = user_config.get("config", {}).get("user", {}).get("phone", "未知用户")
+
+    if not is_custom_checkin_day(user_config):
+        logging.info(f"用户 {phone} 今日不在自定义打卡日期内，跳过打卡")
+        return True
+
+    async with semaphore:
+        if CircuitBreaker.get_default().is_open():
+            logging.warning(f"接口熔断中，跳过用户 {phone}")
+            return CIRCUIT_SKIPPED
+        logging.info(f"开始为用户 {phone} 执行打卡任务")
+        ctx = UserContext.from_user_config(user_config)
+        api_client = AsyncApiService(ctx)
+        try:
+            clock_type = determine_clock_type(clock_type)
+
+            if api_client.restore_token():
+                logging.info(f"用户 {phone} 复用已保存的 token，跳过登录")
+            elif await api_client.login() or api_client.restore_token(allow_expiring=True):
+                logging.info(f"用户 {phone} 登录成功")
+            else:
+                logging.warning(f"用户 {phone} 登录失败")
+                return failure_result(ctx)
+
+            if not await api_client.fetch_plan():
+                logging.warning(f"用户 {phone} 未获取到打卡信息")
+                return failure_result(ctx)
+
+            result = await clock_in_with_type_async(api_client, clock_type)
+            logging.info(f"用户 {phone} 打卡结果: {result}")
+
+            if ctx.get_config("smtp", "enable", default=False):
+                await asyncio.to_thread(send_email, result["title"], result["content"], ctx)
+
+            return True
+
+        except Exception as e:
+            logging.error(f"用户 {phone} 打卡过程中发生异常: {e}")
+            return failure_result(ctx)
+
+async def run_users_async(users, clock_type=None, concurrency=8):
+    """
+    并发为所有用户执行打卡，最多同时处理 concurrency 个用户
+
+    Returns:
+        list: 与 users 顺序一致的打卡结果，True/False 或 CIRCUIT_SKIPPED（不在打卡日期内视为成功）
+    """
+    concurrency = max(concurrency, 1)
+    # 每个用户同一时刻只有一个阻塞调用在线程中执行，线程数与并发数一致即可
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    return list(await asyncio.gather(
+        *(execute_clock_in_async(user_config, clock_type, semaphore) for user_config in users)
+    ))
+
+def init_process_worker(workers):
+    """进程池工作进程初始化：配置日志，并按进程数分摊限速预算，使总请求速率与单进程运行时一致"""
+    setup_logging()
+    RateLimiter.configure(scale=1 / workers)
+
+def run_users_in_pool(users, clock_type=None, workers=4, executor="thread"):
+    """
+    用线程池或进程池为所有用户执行打卡，每个用户使用独立的 UserContext，互不共享状态
+
+    Args:
+        users (list): 用户配置列表
+        clock_type (str): 打卡类型，None 为按北京时间判断
+        workers (int): 工作线程/进程数
+        executor (str): thread 或 process
+
+    Returns:
+        list: 与 users 顺序一致的打卡结果，True/False 或 CIRCUIT_SKIPPED（不在打卡日期内视为成功）
+    """
+    if executor == "process":
+        # spawn 启动的子进程需要重新配置日志；进程间不共享连接池和缓存
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=init_process_worker,
+                                   initargs=(workers,))
     else:
-        logging.warning(f"打卡失败：{success.get('data')}")
-        # 打卡失败时也返回账号和地点信息
-        phone = desensitize_phone(ConfigManager.get('user', 'phone'))
-        address = desensitize_address(ConfigManager.get('clockIn', 'location', 'address'))
-        content = f"签到账号：{phone}\n签到地点：{address}\n失败原因：{success.get('data')}"
-        return {"title": "工学云签到失败通知", "content": content}
-
-def main():
+        pool = ThreadPoolExecutor(max_workers=workers)
+    with pool:
+        futures = [pool.submit(execute_clock_in, user_config, clock_type) for user_config in users]
+        results = []
+        for user_config, future in zip(users, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # 工作进程异常退出等情况，按该用户打卡失败处理
+                phone = user_config.get("config", {}).get("user", {}).get("phone", "未知用户")
+                logging.error(f"用户 {phone} 打卡任务异常退出: {e}")
+                results.append(False)
+        return results
+
+def parse_shard(value):
+    """
+    解析分片参数 i/N（i 从 1 开始），例如 2/3 表示共 3 个分片中的第 2 个
+
+    Returns:
+        tuple[int, int] | None: (i, N)，未指定时返回 None
+    """
+    if not value:
+        return None
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"分片格式应为 i/N，例如 1/3: {value}")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"分片序号应在 1 到 {count} 之间: {value}")
+    return index, count
+
+def select_shard(users, shard):
+    """按用户在列表中的位置轮流分配到各分片，同一份 USERS 在各分片间不重不漏"""
+    if shard is None:
+        return users
+    index, count = shard
+    return [user_config for position, user_config in enumerate(users) if position % count == index - 1]
+
+def build_summary(users, results, shard=None):
+    """汇总打卡结果，失败和因熔断跳过的用户手机号脱敏"""
+    def phones(expected):
+        return [desensitize_phone(user_config.get("config", {}).get("user", {}).get("phone", "未知用户"))
+                for user_config, result in zip(users, results) if result == expected]
+    failed, skipped = phones(False), phones(CIRCUIT_SKIPPED)
+    return {
+        "shard": f"{shard[0]}/{shard[1]}" if shard else None,
+        "total": len(users),
+        "success": len(users) - len(failed) - len(skipped),
+        "failed": failed,
+        "skipped": skipped,
+    }
+
+def merge_summaries(paths):
+    """合并各分片写出的汇总文件"""
+    merged = {"shards": [], "total": 0, "success": 0, "failed": [], "skipped": []}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        merged["shards"].append(summary.get("shard"))
+        merged["total"] += summary["total"]
+        merged["success"] += summary["success"]
+        merged["failed"] += summary["failed"]
+        merged["skipped"] += summary.get("skipped", [])
+    return merged
+
+def parse_args(argv=None):
+    """解析命令行参数，未指定时读取同名环境变量，兼容原有的 CONCURRENCY"""
+    parser = argparse.ArgumentParser(description="工学云自动签到")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WORKERS") or os.environ.get("CONCURRENCY") or 1),
+                        help="同时处理的用户数，1 为按顺序逐个执行（环境变量 WORKERS / CONCURRENCY）")
+    parser.add_argument("--executor", choices=("async", "thread", "process"),
+                        default=os.environ.get("EXECUTOR") or "async",
+                        help="并发方式，workers 大于 1 时生效（环境变量 EXECUTOR）")
+    parser.add_argument("--shard", type=parse_shard, default=os.environ.get("SHARD"),
+                        help="只处理第 i 个分片的用户，格式 i/N（环境变量 SHARD）")
+    parser.add_argument("--summary-file", default=os.environ.get("SUMMARY_FILE"),
+                        help="把汇总结果写入 JSON 文件，供 --merge-summaries 合并")
+    parser.add_argument("--merge-summaries", nargs="+", metavar="FILE",
+                        help="合并多个分片的汇总文件并按合并结果返回退出码，不执行打卡")
+    args = parser.parse_args(argv)
+    if isinstance(args.shard, str):
+        # 来自环境变量的默认值不会经过 type 转换
+        try:
+            args.shard = parse_shard(args.shard)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+    return args
+
+def main(argv=None):
     """主函数"""
     setup_logging()
+    args = parse_args(argv)
+
+    if args.merge_summaries:
+        summary = merge_summaries(args.merge_summaries)
+        logging.info(f"打卡任务完成，成功: {summary['success']}/{summary['total']}，分片: {summary['shards']}")
+        if summary["failed"]:
+            logging.warning(f"打卡失败的用户: {', '.join(summary['failed'])}")
+        if summary["skipped"]:
+            logging.warning(f"因接口熔断跳过的用户: {', '.join(summary['skipped'])}")
+        if summary["success"] < summary["total"]:
+            sys.exit(1)
+        return
     
     # 获取执行模式
     mode = os.environ.get('MODE', 'manual')  # 默认为手动模式
@@ -294,6 +477,10 @@ def main():
     if not users:
         logging.error("未找到用户配置，程序退出")
         sys.exit(1)
+
+    users = select_shard(users, args.shard)
+    if args.shard:
+        logging.info(f"分片 {args.shard[0]}/{args.shard[1]}：本次处理 {len(users)} 个用户")
     
     # 判断打卡类型
     clock_type = None
@@ -303,17 +490,45 @@ def main():
         clock_type = "下班"
     
     # 执行打卡
-    success_count = 0
-    total_count = len(users)
+    workers = max(args.workers, 1)
+    executor = args.executor if workers > 1 else "sequential"
     
-    for user_config in users:
-        if execute_clock_in(user_config, clock_type):
-            success_count += 1
+    # CAPTCHA_WORKERS 大于 0 时验证码识别交给独立的工作进程，不占用网络请求所在进程的 CPU
+    captcha_workers = int(os.environ.get('CAPTCHA_WORKERS', '0'))
+    if captcha_workers > 0 and executor == "process":
+        logging.info("进程池模式下各工作进程自行识别验证码，忽略 CAPTCHA_WORKERS")
+    elif captcha_workers > 0:
+        CaptchaService.start(captcha_workers).wait_ready()
+
+    logging.info(f"执行方式: {executor}，并发数: {workers}")
+    try:
+        if executor == "async":
+            results = asyncio.run(run_users_async(users, clock_type, workers))
+        elif executor in ("thread", "process"):
+            results = run_users_in_pool(users, clock_type, workers, executor)
+        else:
+            results = [execute_clock_in(user_config, clock_type) for user_config in users]
+    finally:
+        CaptchaService.stop()
+
+    summary = build_summary(users, results, args.shard)
+    if args.summary_file:
+        with open(args.summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
     
-    logging.info(f"打卡任务完成，成功: {success_count}/{total_count}")
+    logging.info(f"打卡任务完成，成功: {summary['success']}/{summary['total']}")
+    if summary["failed"]:
+        logging.warning(f"打卡失败的用户: {', '.join(summary['failed'])}")
+    if summary["skipped"]:
+        logging.warning(f"因接口熔断跳过的用户: {', '.join(summary['skipped'])}")
+    logging.info(f"HTTP连接复用统计: {ApiService.get_connection_stats()}")
+    logging.info(f"验证码识别缓存统计: {CaptchaCacheManager.get_stats()}")
+    logging.info(f"请求限速统计: {RateLimiter.get_stats()}")
+    logging.info(f"请求重试统计: {RetryPolicy.get_stats()}")
+    logging.info(f"接口熔断统计: {CircuitBreaker.get_stats()}")
     
     # 如果有用户打卡失败，返回非零退出码
-    if success_count < total_count:
+    if summary["success"] < summary["total"]:
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""
+CaptchaUtils 离线基准测试：在录制的验证码语料上统计各阶段耗时分位数、识别准确率和峰值内存，以 JSON 输出。
+
+阶段划分：
+    blockPuzzle：decode（base64 解码）→ match（match_blockPuzzle：按 captcha.slideMatcher 匹配并计算滑动距离）
+    clickWord：  decode（base64 与图片解码）→ detection（YOLO 检测）→ ocr（read_glyphs 裁剪与批量识别）→ match（clickWord_solution 按 wordList 生成坐标）
+另外统计 recognize_* 的端到端耗时（total），准确率按端到端结果计算。
+
+用法（在仓库根目录执行）：
+    python -m benchmark.bench_captcha --corpus ./captcha_corpus --output result.json
+    python -m benchmark.bench_captcha --synthetic 100          # 没有录制数据时使用合成 blockPuzzle
+    python -m benchmark.bench_captcha --corpus ./captcha_corpus --compare last.json
+"""
+import argparse
+import base64
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark.captcha_corpus import check_solution, load_corpus, make_block_puzzle  # noqa: E402
+from manager.CaptchaCacheManager import CaptchaCacheManager  # noqa: E402
+from util import CaptchaUtils  # noqa: E402
+from util.CaptchaUtils import (clickWord_solution, decode_captcha_image, detect_objects,  # noqa: E402
+                               match_blockPuzzle, read_glyphs, recognize_blockPuzzle_captcha,
+                               recognize_clickWord_captcha, warm_up_onnx_sessions)
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """按阶段累计耗时"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def measure(self, stage: str, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.samples[stage].append(time.perf_counter() - start)
+        return result
+
+
+def percentiles(values: list[float]) -> dict:
+    ordered = np.sort(np.asarray(values)) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": round(float(ordered.mean()), 3),
+        "p50_ms": round(float(np.percentile(ordered, 50)), 3),
+        "p95_ms": round(float(np.percentile(ordered, 95)), 3),
+        "p99_ms": round(float(np.percentile(ordered, 99)), 3),
+    }
+
+
+def run_block_puzzle_stages(timer: StageTimer, data: dict):
+    target_bytes, background_bytes = timer.measure(
+        "decode", lambda: (base64.b64decode(data["jigsawImageBase64"]),
+                           base64.b64decode(data["originalImageBase64"])))
+
+    timer.measure("match", match_blockPuzzle, target_bytes, background_bytes)
+
+
+def run_click_word_stages(timer: StageTimer, data: dict):
+    # 各阶段直接调用 recognize_glyphs / clickWord_solution 的组成部分，与线上识别流程一致
+    image = timer.measure("decode", lambda: decode_captcha_image(base64.b64decode(data["originalImageBase64"])))
+    bboxes = timer.measure("detection", detect_objects, CaptchaUtils.YOLO_MODEL_PATH, image)
+    glyphs = timer.measure("ocr", read_glyphs, image, bboxes)
+    timer.measure("match", clickWord_solution, glyphs, data["wordList"])
+
+
+def recognize(sample: dict) -> str:
+    data = sample["data"]
+    if sample["captchaType"] == "blockPuzzle":
+        return recognize_blockPuzzle_captcha(data["jigsawImageBase64"], data["originalImageBase64"])
+    return recognize_clickWord_captcha(data["originalImageBase64"], data["wordList"])
+
+
+def benchmark_type(samples: list[dict], rounds: int) -> dict:
+    """对同一类型的验证码统计各阶段耗时、准确率和峰值内存"""
+    stage_runner = run_block_puzzle_stages if samples[0]["captchaType"] == "blockPuzzle" else run_click_word_stages
+    timer = StageTimer()
+    correct = labelled = errors = 0
+
+    for sample in samples:
+        solution = None
+        for _ in range(rounds):
+            try:
+                stage_runner(timer, sample["data"])
+                solution = timer.measure("total", recognize, sample)
+            except Exception as e:
+                errors += 1
+                logger.warning(f"{sample.get('name', '')} 识别失败: {e}")
+        if sample.get("expected"):
+            labelled += 1
+            correct += solution is not None and bool(check_solution(sample, solution))
+
+    # 单独统计内存，避免 tracemalloc 影响计时
+    tracemalloc.start()
+    for sample in samples:
+        try:
+            recognize(sample)
+        except Exception:
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "samples": len(samples),
+        "labelled": labelled,
+        "accuracy": round(correct / labelled, 4) if labelled else None,
+        "errors": errors,
+        "stages": {stage: percentiles(values) for stage, values in timer.samples.items()},
+        "peak_traced_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """输出与上一次结果相比的变化"""
+    lines = []
+    for captcha_type, result in current["results"].items():
+        previous = baseline.get("results", {}).get(captcha_type)
+        if not previous:
+            continue
+        for stage, stats in result["stages"].items():
+            before = previous["stages"].get(stage)
+            if before and before["p50_ms"]:
+                change = (stats["p50_ms"] - before["p50_ms"]) / before["p50_ms"]
+                lines.append(f"{captcha_type}.{stage} p50 {before['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms "
+                             f"({change:+.1%})")
+        if result["accuracy"] is not None and previous.get("accuracy") is not None:
+            lines.append(f"{captcha_type}.accuracy {previous['accuracy']:.2%} -> {result['accuracy']:.2%}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="验证码识别离线基准")
+    parser.add_argument("--corpus", default=None, help="验证码语料目录")
+    parser.add_argument("--synthetic", type=int, default=0, help="追加的合成 blockPuzzle 验证码数量")
+    parser.add_argument("--model-dir", default=None, help="模型目录，默认 ./models")
+    parser.add_argument("--rounds", type=int, default=3, help="每条验证码的重复次数")
+    parser.add_argument("--output", default=None, help="结果 JSON 文件，默认输出到标准输出")
+    parser.add_argument("--compare", default=None, help="与之前的结果 JSON 比较")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    # 逐条的识别日志会干扰输出，只保留错误
+    logging.getLogger("util.CaptchaUtils").setLevel(logging.ERROR)
+    # 每条验证码会重复识别多轮，关闭识别缓存以免计时只反映缓存命中
+    CaptchaCacheManager.configure(size=0)
+
+    if args.model_dir:
+        CaptchaUtils.YOLO_MODEL_PATH = str(Path(args.model_dir) / "yolov5n.onnx")
+        CaptchaUtils.OCR_MODEL_PATH = str(Path(args.model_dir) / "ocr.onnx")
+
+    samples = load_corpus(args.corpus) if args.corpus else []
+    samples += [make_block_puzzle(seed) for seed in range(args.synthetic)]
+    if not samples:
+        raise SystemExit("没有验证码样本，请指定 --corpus 或 --synthetic")
+
+    by_type = defaultdict(list)
+    for sample in samples:
+        by_type[sample["captchaType"]].append(sample)
+
+    start = time.perf_counter()
+    if "clickWord" in by_type:
+        warm_up_onnx_sessions([CaptchaUtils.YOLO_MODEL_PATH, CaptchaUtils.OCR_MODEL_PATH])
+    load_time = time.perf_counter() - start
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "rounds": args.rounds,
+        "model_load_ms": round(load_time * 1000, 1),
+        "results": {captcha_type: benchmark_type(items, args.rounds) for captcha_type, items in by_type.items()},
+    }
+    if resource is not None:
+        # Linux 下 ru_maxrss 单位为 KB，macOS 为字节
+        report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                                      / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
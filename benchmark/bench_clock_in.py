@@ -0,0 +1,256 @@
+"""
+端到端打卡流程基准测试：在进程内启动回放服务器，让 N 个虚拟用户依次执行
+login → fetch_plan → get_checkin_info → submit_clock_in，统计吞吐量、各阶段延迟与连接复用情况。
+
+用法（在仓库根目录执行）：
+    python -m benchmark.bench_clock_in --users 50 --mode async --concurrency 8 --latency 80 --jitter 40
+也可以用 --base-url 指向已启动的回放服务器（python -m benchmark.replay_server）。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark.replay_server import ReplayOptions, ReplayServer  # noqa: E402
+from manager.CaptchaCacheManager import CaptchaCacheManager  # noqa: E402
+from manager.UserContext import UserContext  # noqa: E402
+from util import ApiService as api_module  # noqa: E402
+from util.ApiService import ApiService  # noqa: E402
+from util.AsyncApiService import AsyncApiService  # noqa: E402
+from util.CaptchaService import CaptchaService  # noqa: E402
+from util.CircuitBreaker import CircuitBreaker  # noqa: E402
+from util.RateLimiter import RateLimiter  # noqa: E402
+from util.RetryPolicy import RetryPolicy  # noqa: E402
+
+STAGES = ("login", "fetch_plan", "get_checkin_info", "submit_clock_in")
+
+LOCATION = {
+    "address": "四川省 · 成都市 · 高新区 · 在科创十一街附近",
+    "latitude": "30.559922",
+    "longitude": "104.093023",
+    "province": "四川省",
+    "city": "成都市",
+    "area": "高新区",
+}
+
+
+def make_context(index: int) -> UserContext:
+    """创建第 index 个虚拟用户的纯内存上下文"""
+    return UserContext({
+        "user": {"phone": f"1380000{index:04d}", "password": "benchmark"},
+        "clockIn": {"location": dict(LOCATION)},
+        "device": "{brand: Benchmark, systemVersion: 16, Platform: Android, isPhysicalDevice: true}",
+    })
+
+
+def _checkin_info(last_checkin_info: dict) -> dict:
+    return {
+        "type": "START",
+        "lastDetailAddress": last_checkin_info.get("address"),
+        "attachments": None,
+        "description": "",
+    }
+
+
+def run_user_sync(index: int) -> dict:
+    """同步执行一个用户的完整流程，返回各阶段耗时（秒）"""
+    api_client = ApiService(make_context(index))
+    timings = {}
+    try:
+        start = time.perf_counter()
+        if not api_client.login():
+            raise ValueError("登录失败")
+        timings["login"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if not api_client.fetch_plan():
+            raise ValueError("获取实习计划失败")
+        timings["fetch_plan"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        last_checkin_info = api_client.get_checkin_info()
+        timings["get_checkin_info"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        api_client.submit_clock_in(_checkin_info(last_checkin_info))
+        timings["submit_clock_in"] = time.perf_counter() - start
+        return {"ok": True, "timings": timings}
+    except Exception as e:
+        return {"ok": False, "timings": timings, "error": str(e)}
+
+
+async def run_user_async(index: int, semaphore: asyncio.Semaphore) -> dict:
+    """异步执行一个用户的完整流程，返回各阶段耗时（秒）"""
+    async with semaphore:
+        api_client = AsyncApiService(make_context(index))
+        timings = {}
+        try:
+            start = time.perf_counter()
+            if not await api_client.login():
+                raise ValueError("登录失败")
+            timings["login"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if not await api_client.fetch_plan():
+                raise ValueError("获取实习计划失败")
+            timings["fetch_plan"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            last_checkin_info = await api_client.get_checkin_info()
+            timings["get_checkin_info"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await api_client.submit_clock_in(_checkin_info(last_checkin_info))
+            timings["submit_clock_in"] = time.perf_counter() - start
+            return {"ok": True, "timings": timings}
+        except Exception as e:
+            return {"ok": False, "timings": timings, "error": str(e)}
+
+
+async def _run_all_async(users: int, concurrency: int) -> list[dict]:
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(run_user_async(i, semaphore) for i in range(users)))
+
+
+def run_benchmark(users: int, mode: str, concurrency: int) -> tuple[list[dict], float]:
+    start = time.perf_counter()
+    if mode == "async":
+        results = asyncio.run(_run_all_async(users, concurrency))
+    elif mode == "thread":
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run_user_sync, range(users)))
+    else:
+        results = [run_user_sync(i) for i in range(users)]
+    return results, time.perf_counter() - start
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(results: list[dict], elapsed: float) -> dict:
+    succeeded = [r for r in results if r["ok"]]
+    summary = {
+        "users": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+        "stages": {},
+        "connections": ApiService.get_connection_stats(),
+        "captcha_cache": CaptchaCacheManager.get_stats(),
+        "rate_limit": RateLimiter.get_stats(),
+        "retry": RetryPolicy.get_stats(),
+        "circuit_breaker": CircuitBreaker.get_stats(),
+    }
+    totals = [sum(r["timings"].values()) for r in succeeded]
+    for stage, values in [*((s, [r["timings"][s] for r in results if s in r["timings"]]) for s in STAGES),
+                          ("total", totals)]:
+        summary["stages"][stage] = {
+            "mean_ms": round(statistics.fmean(values) * 1000, 1) if values else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+        }
+    errors = {}
+    for r in results:
+        if not r["ok"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    if errors:
+        summary["errors"] = errors
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端打卡流程基准测试")
+    parser.add_argument("--users", type=int, default=20, help="虚拟用户数")
+    parser.add_argument("--mode", choices=("sequential", "thread", "async"), default="sequential")
+    parser.add_argument("--concurrency", type=int, default=8, help="thread/async 模式的并发数")
+    parser.add_argument("--captcha-workers", type=int, default=0, help="验证码识别进程数，0 为在本进程内识别")
+    parser.add_argument("--no-rate-limit", action="store_true", help="关闭请求限速（默认使用 config.json 的 rateLimit）")
+    parser.add_argument("--base-url", default=None, help="使用已启动的回放服务器，不在进程内启动")
+    parser.add_argument("--latency", type=float, default=0, help="基础延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="延迟随机抖动上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回 HTTP 500 的概率")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="返回 HTTP 429 的概率")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 响应的 Retry-After 秒数")
+    parser.add_argument("--captcha-fail-rate", type=float, default=0, help="验证码校验失败概率")
+    parser.add_argument("--captcha-302-rate", type=float, default=0, help="打卡触发行为验证码的概率")
+    parser.add_argument("--token-ttl", type=float, default=0, help="token 有效期（秒），0 为不过期")
+    parser.add_argument("--fixtures", default=None, help="录制的验证码语料目录")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    server = None
+    if args.base_url:
+        api_module.set_base_url(args.base_url)
+    else:
+        server = ReplayServer(options=ReplayOptions(
+            latency_ms=args.latency,
+            jitter_ms=args.jitter,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+            captcha_fail_rate=args.captcha_fail_rate,
+            captcha_302_rate=args.captcha_302_rate,
+            token_ttl=args.token_ttl,
+            fixtures_dir=args.fixtures,
+            seed=args.seed,
+        )).start()
+        api_module.set_base_url(server.base_url)
+
+    if args.no_rate_limit:
+        RateLimiter.configure({"enable": False})
+
+    if args.captcha_workers > 0:
+        # 先让工作进程完成启动，避免计入第一个用户的耗时
+        CaptchaService.start(args.captcha_workers).wait_ready()
+
+    try:
+        results, elapsed = run_benchmark(args.users, args.mode, args.concurrency)
+        summary = summarize(results, elapsed)
+        if server:
+            summary["server_requests"] = server.state.stats
+    finally:
+        CaptchaService.stop()
+        ApiService.close_http_session()
+        if server:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    print(f"模式: {args.mode}  用户数: {summary['users']}  成功: {summary['succeeded']}  失败: {summary['failed']}")
+    print(f"总耗时: {summary['elapsed']:.3f} s  吞吐量: {summary['throughput']:.2f} 用户/s")
+    for stage, stats in summary["stages"].items():
+        print(f"  {stage:<18} mean {stats['mean_ms']:>8.1f} ms  "
+              f"p50 {stats['p50_ms']:>8.1f} ms  p95 {stats['p95_ms']:>8.1f} ms")
+    print(f"连接: {summary['connections']}")
+    print(f"验证码缓存: {summary['captcha_cache']}")
+    print(f"重试: {summary['retry']}")
+    print(f"熔断: {summary['circuit_breaker']}")
+    for name, stats in summary["rate_limit"].items():
+        if stats["requests"]:
+            print(f"  限速 {name:<8} {stats['rate']:>5.1f}/s  请求 {stats['requests']:>4}  排队 {stats['delayed']:>4}  "
+                  f"排队峰值 {stats['max_waiting']:>3}  平均等待 {stats['mean_wait_ms']:>7.1f} ms  "
+                  f"最长等待 {stats['max_wait_ms']:>7.1f} ms")
+    for error, count in summary.get("errors", {}).items():
+        print(f"  失败原因 [{count}]: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+启动耗时基准测试：在全新的解释器中导入 main.py / A/auto.py，统计导入耗时以及是否加载了 cv2、numpy、onnxruntime。
+
+复用 token 的运行不需要识别验证码，这些模块只在第一次识别时才导入。每个入口会测两种情况：
+    lazy：只导入入口模块（token 可用时的实际启动成本）
+    eager：导入入口后再导入 util.CaptchaUtils（相当于启动时就加载识别依赖）
+
+用法（在仓库根目录执行）：
+    python -m benchmark.bench_import --rounds 7
+    python -m benchmark.bench_import --importtime main     # 列出导入耗时最多的模块（python -X importtime）
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("cv2", "numpy", "onnxruntime")
+
+# 入口名 -> 导入语句；A/auto.py 与仓库根目录的 auto.py 同名，按文件路径加载
+TARGETS = {
+    "main": "import main",
+    "A/auto.py": ("import importlib.util\n"
+                  f"spec = importlib.util.spec_from_file_location('auto', {str(ROOT / 'A' / 'auto.py')!r})\n"
+                  "spec.loader.exec_module(importlib.util.module_from_spec(spec))"),
+}
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+exec({statement!r})
+if {eager!r}:
+    import util.CaptchaUtils
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_ms": elapsed * 1000,
+                   "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(statement: str, eager: bool, workdir: str) -> dict:
+    """在新的解释器中执行一次导入，返回耗时和已加载的重量级模块"""
+    code = PROBE.format(root=str(ROOT), statement=statement, eager=eager, heavy=HEAVY_MODULES)
+    # main.py 会在当前目录创建日志文件，放到临时目录中运行
+    output = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(rounds: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, statement in TARGETS.items():
+            results[name] = {}
+            for mode in ("lazy", "eager"):
+                samples = [measure(statement, mode == "eager", workdir) for _ in range(rounds)]
+                timings = [sample["import_ms"] for sample in samples]
+                results[name][mode] = {
+                    "median_ms": round(statistics.median(timings), 1),
+                    "min_ms": round(min(timings), 1),
+                    "heavy_modules": samples[-1]["heavy"],
+                }
+    return results
+
+
+def top_imports(target: str, limit: int) -> list[tuple[int, str]]:
+    """用 python -X importtime 列出累计导入耗时最多的模块（微秒）"""
+    with tempfile.TemporaryDirectory() as workdir:
+        code = f"import sys\nsys.path.insert(0, {str(ROOT)!r})\n{TARGETS[target]}"
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=workdir,
+                                capture_output=True, text=True, check=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            entries.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动导入耗时基准")
+    parser.add_argument("--rounds", type=int, default=5, help="每种情况的重复次数（取中位数）")
+    parser.add_argument("--importtime", choices=tuple(TARGETS), default=None, help="列出该入口导入耗时最多的模块")
+    parser.add_argument("--limit", type=int, default=15, help="--importtime 列出的模块数")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    if args.importtime:
+        for cumulative, module in top_imports(args.importtime, args.limit):
+            print(f"{cumulative / 1000:>9.1f} ms  {module}")
+        return
+
+    results = run(args.rounds)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    for name, modes in results.items():
+        lazy, eager = modes["lazy"], modes["eager"]
+        print(f"{name:<10} lazy {lazy['median_ms']:>7.1f} ms  eager {eager['median_ms']:>7.1f} ms  "
+              f"节省 {eager['median_ms'] - lazy['median_ms']:>7.1f} ms  "
+              f"启动时加载: {', '.join(lazy['heavy_modules']) or '无'}")
+
+
+if __name__ == "__main__":
+    main()
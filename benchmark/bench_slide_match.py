@@ -0,0 +1,104 @@
+"""
+blockPuzzle 滑块匹配基准测试：在同一批验证码上对比 slide_match（旧实现）与 slide_match_fast 各配置的准确率和耗时。
+
+用法（在仓库根目录执行）：
+    python -m benchmark.bench_slide_match --corpus ./captcha_corpus
+    python -m benchmark.bench_slide_match --synthetic 200
+语料格式见 benchmark/captcha_corpus.py。带 expected 标注的验证码统计准确率，
+所有验证码都统计与旧实现结果一致（误差在允许范围内）的比例，便于在未标注的录制数据上评估。
+"""
+import argparse
+import base64
+import json
+import logging
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark.captcha_corpus import (BLOCK_PUZZLE_TOLERANCE, check_solution, load_corpus,  # noqa: E402
+                                      make_block_puzzle)
+from util.CaptchaUtils import (calculate_precise_slider_distance, extract_png_width,  # noqa: E402
+                               slide_match, slide_match_fast)
+
+MATCHERS = {
+    "slide_match": slide_match,
+    "fast": slide_match_fast,
+    "fast+pyramid": partial(slide_match_fast, pyramid=True),
+}
+
+
+def solve(matcher, target_bytes: bytes, background_bytes: bytes) -> str:
+    """与 recognize_blockPuzzle_captcha 相同的后处理，只替换匹配函数"""
+    left, right = matcher(target_bytes, background_bytes)
+    distance = calculate_precise_slider_distance(left, right, extract_png_width(target_bytes))
+    return json.dumps({"x": distance, "y": 5})
+
+
+def run(samples: list[dict], rounds: int) -> dict:
+    decoded = [(sample,
+                base64.b64decode(sample["data"]["jigsawImageBase64"]),
+                base64.b64decode(sample["data"]["originalImageBase64"]))
+               for sample in samples]
+    baseline = [json.loads(solve(slide_match, target_bytes, background_bytes))["x"]
+                for _, target_bytes, background_bytes in decoded]
+    labelled = sum(1 for sample in samples if sample.get("expected"))
+
+    results = {}
+    for name, matcher in MATCHERS.items():
+        timings, correct, agree = [], 0, 0
+        for (sample, target_bytes, background_bytes), baseline_x in zip(decoded, baseline):
+            best = float("inf")
+            for _ in range(rounds):
+                start = time.perf_counter()
+                matcher(target_bytes, background_bytes)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+            solution = solve(matcher, target_bytes, background_bytes)
+            correct += bool(check_solution(sample, solution))
+            agree += abs(json.loads(solution)["x"] - baseline_x) <= BLOCK_PUZZLE_TOLERANCE
+        results[name] = {
+            "accuracy": round(correct / labelled, 4) if labelled else None,
+            "agreement": round(agree / len(decoded), 4),
+            "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+            "p50_ms": round(statistics.median(timings) * 1000, 3),
+            "p95_ms": round(sorted(timings)[int(0.95 * (len(timings) - 1))] * 1000, 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="blockPuzzle 滑块匹配基准")
+    parser.add_argument("--corpus", default=None, help="验证码语料目录")
+    parser.add_argument("--synthetic", type=int, default=100, help="未指定语料时生成的合成验证码数量")
+    parser.add_argument("--rounds", type=int, default=5, help="每张验证码的计时轮数（取最小值）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    # 匹配函数每次调用都会输出 INFO 日志，计时时关闭
+    logging.disable(logging.INFO)
+
+    if args.corpus:
+        samples = load_corpus(args.corpus, "blockPuzzle")
+    else:
+        samples = [make_block_puzzle(seed) for seed in range(args.synthetic)]
+    if not samples:
+        raise SystemExit("没有 blockPuzzle 验证码")
+
+    results = run(samples, args.rounds)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"验证码数量: {len(samples)}")
+    for name, stats in results.items():
+        accuracy = "-" if stats["accuracy"] is None else f"{stats['accuracy']:.2%}"
+        print(f"{name:<14} 准确率 {accuracy:>7}  与旧实现一致 {stats['agreement']:>7.2%}  "
+              f"mean {stats['mean_ms']:>7.3f} ms  p50 {stats['p50_ms']:>7.3f} ms  p95 {stats['p95_ms']:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
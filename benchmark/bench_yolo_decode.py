@@ -0,0 +1,85 @@
+"""
+YOLOv5 输出解析的微基准测试：对比逐行列表推导（旧实现）与 NumPy 向量化实现（decode_yolo_output）。
+
+用法（在仓库根目录执行）：
+    python -m benchmark.bench_yolo_decode [--rounds 20] [--candidates 8]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from util.CaptchaUtils import decode_yolo_output  # noqa: E402
+
+
+def legacy_decode(detections, scale, dw, dh):
+    """旧版 detect_objects 中的解析逻辑，仅用于对比"""
+    boxes = [[
+        x_center - width / 2,
+        y_center - height / 2,
+        x_center + width / 2,
+        y_center + height / 2,
+    ] for x_center, y_center, width, height, confidence, *class_scores in
+             detections if confidence >= 0.5]
+    scores = [
+        max(class_scores)
+        for _, _, _, _, confidence, *class_scores in detections
+        if confidence >= 0.5
+    ]
+
+    if boxes:
+        indices = cv2.dnn.NMSBoxes(boxes, scores, 0.5, 0.5)
+        boxes = [boxes[i] for i in indices]
+
+    return [[
+        int((x1 - dw) / scale),
+        int((y1 - dh) / scale),
+        int((x2 - dw) / scale),
+        int((y2 - dh) / scale),
+    ] for x1, y1, x2, y2 in boxes]
+
+
+def make_detections(seed: int, candidates: int, rows: int = 25200,
+                    classes: int = 80) -> np.ndarray:
+    """生成与 yolov5n 输出形状一致的模拟数据，其中约 candidates 行超过置信度阈值"""
+    rs = np.random.RandomState(seed)
+    detections = np.empty((rows, 5 + classes), dtype=np.float32)
+    detections[:, 0] = rs.uniform(20, 620, rows)
+    detections[:, 1] = rs.uniform(180, 460, rows)
+    detections[:, 2:4] = rs.uniform(20, 60, (rows, 2))
+    detections[:, 4] = rs.uniform(0, 0.45, rows)
+    detections[rs.choice(rows, candidates, replace=False), 4] = rs.uniform(0.5, 1, candidates)
+    detections[:, 5:] = rs.uniform(0, 1, (rows, classes))
+    return detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 输出解析微基准")
+    parser.add_argument("--rounds", type=int, default=20, help="每种实现的计时轮数")
+    parser.add_argument("--candidates", type=int, default=8, help="超过置信度阈值的候选框数量")
+    args = parser.parse_args()
+
+    # 310x155 的验证码图片在预处理后的缩放比例和填充
+    scale, dw, dh = 640 / 310, 0, (640 - int(155 * 640 / 310)) // 2
+
+    for seed in range(5):
+        detections = make_detections(seed, args.candidates)
+        expected = legacy_decode(detections, scale, dw, dh)
+        actual = decode_yolo_output(detections, scale, dw, dh)
+        if expected != actual:
+            raise SystemExit(f"结果不一致 (seed={seed}):\n旧实现: {expected}\n新实现: {actual}")
+
+    detections = make_detections(0, args.candidates)
+    for name, func in (("legacy", legacy_decode), ("vectorized", decode_yolo_output)):
+        cost = min(timeit.repeat(lambda: func(detections, scale, dw, dh),
+                                 number=1, repeat=args.rounds))
+        print(f"{name:>10}: {cost * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
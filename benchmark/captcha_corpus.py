@@ -0,0 +1,153 @@
+"""
+验证码语料的读写与合成工具，供回放服务器和各基准测试共用。
+
+语料目录中每个 .json 文件是一条录制的验证码，格式为：
+    {
+        "captchaType": "blockPuzzle" | "clickWord",
+        "data": {...},       # 验证码 get 接口返回的 data 字段（含 base64 图片、wordList 等）
+        "expected": {...}    # 可选的标注：blockPuzzle 为 {"x": 滑动距离}，
+                             # clickWord 为 {"bboxes": [[x1, y1, x2, y2], ...]}（与 wordList 顺序一致）
+    }
+
+用法（在仓库根目录执行）：
+    python -m benchmark.captcha_corpus --output ./captcha_corpus --count 50
+生成带标注的合成 blockPuzzle 语料（clickWord 需要录制真实数据）。
+"""
+import argparse
+import base64
+import json
+import random
+import uuid
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# blockPuzzle 判定通过的允许误差（像素）
+BLOCK_PUZZLE_TOLERANCE = 5
+
+# 合成图片尺寸与服务端一致
+BACKGROUND_SIZE = (310, 155)
+PIECE_SIZE = 47
+
+
+def load_corpus(corpus_dir: str, captcha_type: str | None = None) -> list[dict]:
+    """读取语料目录下的全部验证码，可按类型过滤"""
+    samples = []
+    for path in sorted(Path(corpus_dir).glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            sample = json.load(f)
+        if captcha_type and sample.get("captchaType") != captcha_type:
+            continue
+        sample["name"] = path.name
+        samples.append(sample)
+    return samples
+
+
+def save_sample(corpus_dir: str, sample: dict) -> Path:
+    """保存一条验证码到语料目录"""
+    path = Path(corpus_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    file_path = path / f"{sample['captchaType']}-{uuid.uuid4().hex[:12]}.json"
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(sample, f, ensure_ascii=False)
+    return file_path
+
+
+def make_block_puzzle(seed: int | None = None) -> dict:
+    """
+    合成一条 blockPuzzle 验证码：背景上挖出带白色描边的拼图缺口，
+    jigsaw 图为与背景等高、带透明通道的拼图块。
+    """
+    rs = np.random.RandomState(seed)
+    width, height = BACKGROUND_SIZE
+    size = PIECE_SIZE
+
+    # 平滑的随机纹理背景
+    noise = rs.randint(0, 255, (height // 8, width // 8, 3)).astype(np.uint8)
+    background = cv2.GaussianBlur(
+        cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC), (5, 5), 0)
+
+    x0 = int(rs.randint(size + 10, width - size - 5))
+    y0 = int(rs.randint(5, height - size - 5))
+
+    # 拼图形状：方块加一个凸起
+    mask = np.zeros((size, size), np.uint8)
+    cv2.rectangle(mask, (4, 8), (size - 5, size - 5), 255, -1)
+    cv2.circle(mask, (size // 2, 8), 7, 255, -1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+
+    jigsaw = np.zeros((height, size, 4), np.uint8)
+    piece = jigsaw[y0:y0 + size]
+    piece[..., :3][mask > 0] = background[y0:y0 + size, x0:x0 + size][mask > 0]
+    piece[..., 3] = mask
+    cv2.drawContours(piece, contours, -1, (255, 255, 255, 255), 2)
+
+    hole = background[y0:y0 + size, x0:x0 + size]
+    hole[mask > 0] = (hole[mask > 0] * 0.4).astype(np.uint8)
+    cv2.drawContours(hole, contours, -1, (255, 255, 255), 2)
+
+    return {
+        "captchaType": "blockPuzzle",
+        "data": {
+            "jigsawImageBase64": base64.b64encode(cv2.imencode(".png", jigsaw)[1]).decode(),
+            "originalImageBase64": base64.b64encode(cv2.imencode(".jpg", background)[1]).decode(),
+        },
+        # 滑块中心对齐缺口中心，滑动距离即缺口左边界
+        "expected": {"x": float(x0)},
+    }
+
+
+def make_click_word(wordlist: list[str], seed: int | None = None) -> dict:
+    """合成一条无法识别的 clickWord 验证码，仅用于回放服务器的协议测试"""
+    rs = np.random.RandomState(seed)
+    width, height = BACKGROUND_SIZE
+    image = rs.randint(0, 255, (height, width, 3)).astype(np.uint8)
+    return {
+        "captchaType": "clickWord",
+        "data": {
+            "originalImageBase64": base64.b64encode(cv2.imencode(".jpg", image)[1]).decode(),
+            "wordList": wordlist,
+        },
+    }
+
+
+def check_solution(sample: dict, solution: str) -> bool | None:
+    """
+    按标注判断识别结果是否正确。
+
+    Args:
+        sample (dict): 语料中的一条验证码。
+        solution (str): recognize_* 返回的 JSON 字符串。
+
+    Returns:
+        bool | None: 是否正确，语料没有标注时返回 None。
+    """
+    expected = sample.get("expected")
+    if not expected:
+        return None
+    points = json.loads(solution)
+    if sample["captchaType"] == "blockPuzzle":
+        return abs(points["x"] - expected["x"]) <= BLOCK_PUZZLE_TOLERANCE
+    bboxes = expected.get("bboxes") or []
+    if len(points) != len(bboxes):
+        return False
+    return all(x1 <= p["x"] <= x2 and y1 <= p["y"] <= y2
+               for p, (x1, y1, x2, y2) in zip(points, bboxes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成 blockPuzzle 验证码语料")
+    parser.add_argument("--output", required=True, help="语料输出目录")
+    parser.add_argument("--count", type=int, default=50, help="生成数量")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for _ in range(args.count):
+        save_sample(args.output, make_block_puzzle(rng.randrange(2 ** 31)))
+    print(f"已生成 {args.count} 条 blockPuzzle 语料: {Path(args.output).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+点选验证码模型的 INT8 动态量化与精度校验：量化 yolov5n.onnx 和 ocr.onnx，在验证码语料上对比 FP32 与 INT8 的结果，
+生成模型目录下的 int8_gate.json。只有校验通过时，配置 onnx.precision 为 int8 才会实际加载量化模型。
+
+校验指标：
+    accuracy：带 expected 标注的 clickWord 验证码的识别准确率，INT8 比 FP32 下降不超过 --max-drop
+    agreement：每个 wordList 文字定位到的文本框与 FP32 一致（都未找到，或 IoU ≥ 0.5）的验证码比例，不低于 --min-agreement
+
+用法（在仓库根目录执行，需要额外安装 onnx）：
+    python -m benchmark.quantize_models --corpus ./captcha_corpus
+    python -m benchmark.quantize_models --corpus ./captcha_corpus --skip-quantize   # 只重新校验已有的量化模型
+"""
+import argparse
+import base64
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark.captcha_corpus import check_solution, load_corpus  # noqa: E402
+from manager.CaptchaCacheManager import CaptchaCacheManager  # noqa: E402
+from util import CaptchaUtils  # noqa: E402
+from util.CaptchaUtils import (INT8_GATE_FILE, file_sha256, locate_glyphs, quantized_model_path,  # noqa: E402
+                               recognize_clickWord_captcha, recognize_glyphs)
+
+MODEL_NAMES = ("yolov5n.onnx", "ocr.onnx")
+AGREEMENT_IOU = 0.5
+
+
+def quantize(model_dir: Path):
+    """对每个模型做动态量化（权重 INT8，激活值在推理时量化）"""
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise SystemExit(f"量化需要安装 onnx：pip install onnx（{e}）")
+    for name in MODEL_NAMES:
+        source = model_dir / name
+        target = Path(quantized_model_path(str(source)))
+        quantize_dynamic(str(source), str(target), weight_type=QuantType.QUInt8)
+        print(f"已量化 {source} -> {target}（{source.stat().st_size / 1e6:.1f} MB -> "
+              f"{target.stat().st_size / 1e6:.1f} MB）", file=sys.stderr)
+
+
+def iou(a: list[int], b: list[int]) -> float:
+    width = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    height = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def locate_words(data: dict) -> list:
+    """用当前的 YOLO_MODEL_PATH / OCR_MODEL_PATH 识别验证码，返回 wordList 中每个文字定位到的文本框，未找到时为 None"""
+    return locate_glyphs(recognize_glyphs(base64.b64decode(data["originalImageBase64"])), data["wordList"])
+
+
+def evaluate(samples: list[dict], yolo_path: str, ocr_path: str) -> dict:
+    """用指定的模型识别全部验证码，返回准确率、各验证码的文字定位结果和耗时"""
+    CaptchaUtils.YOLO_MODEL_PATH, CaptchaUtils.OCR_MODEL_PATH = yolo_path, ocr_path
+    located, timings, correct, labelled = [], [], 0, 0
+    for sample in samples:
+        located.append(locate_words(sample["data"]))
+        start = time.perf_counter()
+        solution = recognize_clickWord_captcha(sample["data"]["originalImageBase64"], sample["data"]["wordList"])
+        timings.append(time.perf_counter() - start)
+        if sample.get("expected"):
+            labelled += 1
+            correct += bool(check_solution(sample, solution))
+    return {
+        "accuracy": round(correct / labelled, 4) if labelled else None,
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "located": located,
+    }
+
+
+def agreement(fp32_located: list, int8_located: list) -> float:
+    agreed = 0
+    for fp32_boxes, int8_boxes in zip(fp32_located, int8_located):
+        agreed += all((a is None and b is None) or (a is not None and b is not None and iou(a, b) >= AGREEMENT_IOU)
+                      for a, b in zip(fp32_boxes, int8_boxes))
+    return agreed / len(fp32_located)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="点选验证码模型 INT8 量化与精度校验")
+    parser.add_argument("--corpus", required=True, help="验证码语料目录（使用其中的 clickWord 验证码）")
+    parser.add_argument("--model-dir", default="./models", help="模型目录")
+    parser.add_argument("--max-drop", type=float, default=0.01, help="允许的准确率下降（绝对值）")
+    parser.add_argument("--min-agreement", type=float, default=0.98, help="与 FP32 结果一致的最低比例")
+    parser.add_argument("--skip-quantize", action="store_true", help="不重新量化，只校验已有的量化模型")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger("util.CaptchaUtils").setLevel(logging.ERROR)
+    # FP32 与 INT8 识别同一批验证码，关闭识别缓存以免 INT8 直接使用 FP32 的结果
+    CaptchaCacheManager.configure(size=0)
+    # 按路径直接加载 FP32 和 INT8 模型，不受 onnx.precision 配置影响
+    CaptchaUtils.configure_onnx({**CaptchaUtils.get_onnx_options(), "precision": "fp32"})
+
+    model_dir = Path(args.model_dir)
+    samples = load_corpus(args.corpus, "clickWord")
+    if not samples:
+        raise SystemExit("语料中没有 clickWord 验证码")
+    if not args.skip_quantize:
+        quantize(model_dir)
+
+    fp32_paths = [str(model_dir / name) for name in MODEL_NAMES]
+    int8_paths = [quantized_model_path(path) for path in fp32_paths]
+    fp32 = evaluate(samples, *fp32_paths)
+    int8 = evaluate(samples, *int8_paths)
+    agreed = agreement(fp32["located"], int8["located"])
+
+    passed = agreed >= args.min_agreement
+    if fp32["accuracy"] is not None:
+        passed = passed and int8["accuracy"] >= fp32["accuracy"] - args.max_drop
+
+    gate = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "passed": passed,
+        "samples": len(samples),
+        "fp32": {"accuracy": fp32["accuracy"], "median_ms": fp32["median_ms"]},
+        "int8": {"accuracy": int8["accuracy"], "median_ms": int8["median_ms"]},
+        "agreement": round(agreed, 4),
+        "thresholds": {"maxDrop": args.max_drop, "minAgreement": args.min_agreement},
+        "models": {Path(path).name: {"sha256": file_sha256(path), "source": Path(source).name,
+                                     "sourceSha256": file_sha256(source)}
+                   for source, path in zip(fp32_paths, int8_paths)},
+    }
+    gate_path = model_dir / INT8_GATE_FILE
+    gate_path.write_text(json.dumps(gate, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(json.dumps({key: value for key, value in gate.items() if key != "models"}, ensure_ascii=False, indent=2))
+    if not passed:
+        print(f"INT8 模型未通过精度校验，onnx.precision 为 int8 时仍会使用 FP32 模型（{gate_path}）", file=sys.stderr)
+        sys.exit(1)
+    print(f"INT8 模型已通过精度校验，可将 onnx.precision 设为 int8（{gate_path}）", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
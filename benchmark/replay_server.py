@@ -0,0 +1,347 @@
+"""
+工学云接口的本地回放服务器，用于离线压测和基准测试。
+
+实现 ApiService 使用的全部接口，请求/响应使用与线上一致的 AES 加密和签名方案，
+并支持配置网络延迟、错误率、验证码失败率、打卡触发行为验证码（302）以及 token 过期。
+
+用法（在仓库根目录执行）：
+    python -m benchmark.replay_server --port 9000 --latency 80 --jitter 40 --error-rate 0.02
+然后设置环境变量 MOGUDING_BASE_URL=http://127.0.0.1:9000/ 运行 main.py 或 A/auto.py。
+
+也可在进程内启动，见 benchmark/bench_clock_in.py。
+"""
+import argparse
+import json
+import logging
+import random
+import string
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmark.captcha_corpus import (BLOCK_PUZZLE_TOLERANCE, load_corpus,  # noqa: E402
+                                      make_block_puzzle, make_click_word)
+from util.CaptchaUtils import OCR_CHARSET  # noqa: E402
+from util.CryptoUtils import aes_decrypt, aes_encrypt, create_sign  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplayOptions:
+    latency_ms: float = 0  # 每个请求的基础延迟
+    jitter_ms: float = 0  # 延迟的随机抖动上限
+    error_rate: float = 0  # 返回 HTTP 500 的概率
+    throttle_rate: float = 0  # 返回 HTTP 429（带 Retry-After）的概率
+    retry_after: int = 1  # 429 响应的 Retry-After 秒数
+    captcha_fail_rate: float = 0  # 验证码校验返回 6111 的概率（在结果正确的前提下）
+    captcha_302_rate: float = 0  # 打卡接口要求行为验证码的概率
+    token_ttl: float = 0  # token 有效期（秒），0 表示不过期
+    fixtures_dir: str | None = None  # 录制的验证码语料目录
+    seed: int | None = None
+
+
+@dataclass
+class _IssuedCaptcha:
+    captcha_type: str
+    secret_key: str
+    expected: dict | None
+
+
+@dataclass
+class ReplayState:
+    """回放服务器的内存状态与统计"""
+    options: ReplayOptions
+    captchas: dict = field(default_factory=dict)  # token -> _IssuedCaptcha
+    verified: set = field(default_factory=set)  # 已通过校验、待核销的验证码结果
+    tokens: dict = field(default_factory=dict)  # 登录 token -> (phone, 签发时间)
+    users: dict = field(default_factory=dict)  # phone -> userInfo
+    records: dict = field(default_factory=dict)  # userId -> 最近一次打卡记录
+    stats: dict = field(default_factory=dict)  # 接口 -> 请求次数
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.options.seed)
+        self.fixtures = load_corpus(self.options.fixtures_dir) if self.options.fixtures_dir else []
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ReplayServer"
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def do_POST(self):
+        state = self.server.state
+        options = state.options
+        body = self.rfile.read(int(self.headers.get("content-length", 0)))
+        endpoint = self.path.strip("/")
+
+        with state.lock:
+            state.stats[endpoint] = state.stats.get(endpoint, 0) + 1
+            delay = options.latency_ms + state.rng.uniform(0, options.jitter_ms)
+            failed = state.rng.random() < options.error_rate
+            throttled = not failed and state.rng.random() < options.throttle_rate
+        if delay:
+            time.sleep(delay / 1000)
+        if failed:
+            self._reply({"code": 500, "msg": "Internal Server Error"}, status=500)
+            return
+        if throttled:
+            self._reply({"code": 429, "msg": "Too Many Requests"}, status=429,
+                        headers={"Retry-After": str(options.retry_after)})
+            return
+
+        handler = ROUTES.get(endpoint)
+        if handler is None:
+            self._reply({"code": 404, "msg": f"未知接口: {endpoint}"}, status=404)
+            return
+        try:
+            self._reply(handler(state, json.loads(body or b"{}"), self.headers))
+        except Exception as e:
+            logger.exception("回放接口处理失败: %s", endpoint)
+            self._reply({"code": 500, "msg": f"回放服务器异常: {e}"})
+
+    def _reply(self, payload: dict, status: int = 200, headers: dict | None = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json; charset=utf-8")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# ======================
+# 接口实现
+# ======================
+def _random_key(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(16))
+
+
+def _get_captcha(state: ReplayState, body: dict, headers) -> dict:
+    captcha_type = body.get("captchaType", "blockPuzzle")
+    with state.lock:
+        fixtures = [f for f in state.fixtures if f.get("captchaType") == captcha_type]
+        sample = state.rng.choice(fixtures) if fixtures else None
+        seed = state.rng.randrange(2 ** 31)
+        secret_key = _random_key(state.rng)
+        wordlist = state.rng.sample(OCR_CHARSET, 3)
+    if sample is None:
+        sample = make_block_puzzle(seed) if captcha_type == "blockPuzzle" else make_click_word(wordlist, seed)
+
+    token = uuid.uuid4().hex
+    with state.lock:
+        state.captchas[token] = _IssuedCaptcha(captcha_type, secret_key, sample.get("expected"))
+    return {
+        "code": 200,
+        "msg": "success",
+        "data": {**sample["data"], "token": token, "secretKey": secret_key},
+    }
+
+
+def _check_captcha(state: ReplayState, body: dict, headers) -> dict:
+    token = body.get("token")
+    with state.lock:
+        captcha = state.captchas.pop(token, None)
+        lucky = state.rng.random() >= state.options.captcha_fail_rate
+    if captcha is None:
+        return {"code": 6111, "msg": "验证码已失效，请重新获取"}
+    try:
+        point_json = aes_decrypt(body.get("pointJson", ""), captcha.secret_key, "b64")
+        points = json.loads(point_json)
+    except Exception:
+        return {"code": 6111, "msg": "验证失败"}
+
+    correct = True
+    expected = captcha.expected
+    if expected and captcha.captcha_type == "blockPuzzle":
+        correct = abs(points.get("x", -1) - expected["x"]) <= BLOCK_PUZZLE_TOLERANCE
+    elif expected and expected.get("bboxes"):
+        correct = len(points) == len(expected["bboxes"]) and all(
+            x1 <= p["x"] <= x2 and y1 <= p["y"] <= y2
+            for p, (x1, y1, x2, y2) in zip(points, expected["bboxes"]))
+
+    if not (correct and lucky):
+        return {"code": 6111, "msg": "验证失败"}
+    # 客户端随后在登录/打卡请求中提交 aes(token---pointJson)，预先算好供一次性核销
+    with state.lock:
+        state.verified.add(aes_encrypt(f"{token}---{point_json}", captcha.secret_key, "b64"))
+    return {"code": 200, "msg": "验证成功"}
+
+
+def _consume_captcha(state: ReplayState, encrypted: str | None) -> bool:
+    """核销登录/打卡请求中携带的验证码结果，每个结果只能使用一次"""
+    with state.lock:
+        if encrypted in state.verified:
+            state.verified.remove(encrypted)
+            return True
+    return False
+
+
+def _login(state: ReplayState, body: dict, headers) -> dict:
+    if not _consume_captcha(state, body.get("captcha")):
+        return {"code": 6111, "msg": "请先完成滑块验证"}
+    phone = aes_decrypt(body["phone"])
+    aes_decrypt(body["password"])
+
+    token = uuid.uuid4().hex
+    with state.lock:
+        user_info = state.users.setdefault(phone, {
+            "userId": uuid.uuid4().hex[:16],
+            "phone": phone,
+            "nikeName": f"用户{phone[-4:]}",
+            "roleKey": "student",
+            "userType": "student",
+        })
+        state.tokens[token] = (phone, time.time())
+    return {"code": 200, "msg": "success", "data": aes_encrypt(json.dumps({**user_info, "token": token}))}
+
+
+def _authenticate(state: ReplayState, headers) -> dict | None:
+    with state.lock:
+        issued = state.tokens.get(headers.get("authorization"))
+        if issued is None:
+            return None
+        phone, issued_at = issued
+        if state.options.token_ttl and time.time() - issued_at > state.options.token_ttl:
+            return None
+        return state.users[phone]
+
+
+def _token_expired() -> dict:
+    return {"code": 401, "msg": "token失效，请重新登录"}
+
+
+def _get_plan(state: ReplayState, body: dict, headers) -> dict:
+    user = _authenticate(state, headers)
+    if user is None:
+        return _token_expired()
+    if headers.get("sign") != create_sign(user["userId"], user["roleKey"]):
+        return {"code": 500, "msg": "签名错误"}
+    return {"code": 200, "msg": "success", "data": [{
+        "planId": f"plan-{user['userId']}",
+        "planName": "回放实习计划",
+    }]}
+
+
+def _list_synchro(state: ReplayState, body: dict, headers) -> dict:
+    user = _authenticate(state, headers)
+    if user is None:
+        return _token_expired()
+    with state.lock:
+        record = state.records.get(user["userId"])
+    return {"code": 200, "msg": "success", "data": [record] if record else []}
+
+
+def _save_clock_in(state: ReplayState, body: dict, headers) -> dict:
+    user = _authenticate(state, headers)
+    if user is None:
+        return _token_expired()
+    expected_sign = create_sign(body.get("device") or "", body.get("type") or "",
+                                body.get("planId") or "", user["userId"],
+                                body.get("address") or "")
+    if headers.get("sign") != expected_sign:
+        return {"code": 500, "msg": "签名错误"}
+
+    with state.lock:
+        require_captcha = state.rng.random() < state.options.captcha_302_rate
+    if require_captcha and not _consume_captcha(state, body.get("captcha")):
+        return {"code": 200, "msg": "302"}
+
+    record = {
+        "type": body.get("type"),
+        "createTime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+        "address": body.get("address"),
+    }
+    with state.lock:
+        state.records[user["userId"]] = record
+    return {"code": 200, "msg": "success", "data": record}
+
+
+ROUTES = {
+    "session/captcha/v1/get": _get_captcha,
+    "session/captcha/v1/check": _check_captcha,
+    "attendence/clock/v1/get": _get_captcha,
+    "attendence/clock/v1/check": _check_captcha,
+    "session/user/v6/login": _login,
+    "practice/plan/v3/getPlanByStu": _get_plan,
+    "attendence/clock/v2/listSynchro": _list_synchro,
+    "attendence/clock/v5/save": _save_clock_in,
+}
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 options: ReplayOptions | None = None):
+        super().__init__((host, port), ReplayHandler)
+        self.state = ReplayState(options or ReplayOptions())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "ReplayServer":
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="工学云接口本地回放服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0, help="基础延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="延迟随机抖动上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回 HTTP 500 的概率")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="返回 HTTP 429 的概率")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 响应的 Retry-After 秒数")
+    parser.add_argument("--captcha-fail-rate", type=float, default=0, help="验证码校验失败概率")
+    parser.add_argument("--captcha-302-rate", type=float, default=0, help="打卡触发行为验证码的概率")
+    parser.add_argument("--token-ttl", type=float, default=0, help="token 有效期（秒），0 为不过期")
+    parser.add_argument("--fixtures", default=None, help="录制的验证码语料目录")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = ReplayServer(args.host, args.port, ReplayOptions(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        captcha_fail_rate=args.captcha_fail_rate,
+        captcha_302_rate=args.captcha_302_rate,
+        token_ttl=args.token_ttl,
+        fixtures_dir=args.fixtures,
+        seed=args.seed,
+    ))
+    logging.info(f"回放服务器已启动: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info(f"接口请求统计: {server.state.stats}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
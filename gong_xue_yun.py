@@ -1,15 +1,13 @@
-import datetime
-import gc
 import logging
 import random
-import time
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import List, Optional
 
-import schedule  # pip install schedule
-
-from main import execute_tasks
+from main import execute_tasks, prepare_tasks
 from manager.ConfigManager import ConfigManager
 from util.HelperFunctions import is_workday_realtime
+from util.Scheduler import DailyScheduler, ScheduledJob
 
 # 日志配置
 logging.basicConfig(
@@ -21,7 +19,7 @@ logging.basicConfig(
 def should_run_today() -> bool:
     """
     根据打卡配置判断今日是否需要执行任务。
-    支持三种模式：weekday（法定工作日）、everyday（每天）、customize（自定义）。
+    支持四种模式：weekday（法定工作日）、everyday（每天）、customize（自定义）、twice_daily（每天上下班各一次）。
     """
     # 如果开启了法定工作日打卡，则每天都要执行任务
     if ConfigManager.get("clockIn", "holidaysClockIn"):
@@ -33,8 +31,8 @@ def should_run_today() -> bool:
     if mode == "weekday":
         return is_workday_realtime()
 
-    # 2. 每天执行
-    if mode == "everyday":
+    # 2. 每天执行（一天两次的模式同样每天执行）
+    if mode in ("everyday", "twice_daily"):
         return True
 
     # 3. 自定义模式
@@ -47,45 +45,103 @@ def should_run_today() -> bool:
     return False
 
 
-def generate_random_time() -> datetime:
+def generate_random_time(start_time_str: Optional[str] = None,
+                         day: Optional[date] = None) -> datetime:
     """
     生成一个随机的打卡时间
 
     该函数根据配置文件中的打卡时间范围，生成一个在指定时间基础上增加随机分钟数的打卡时间。
-    随机分钟数的上限由配置决定，最终返回今天的具体打卡时间点。
+    随机分钟数的上限由配置决定，最终返回指定日期的具体打卡时间点。
+
+    Args:
+        start_time_str (Optional[str]): 基准时间（HH:MM），默认读取 clockIn.time.start。
+        day (Optional[date]): 打卡日期，默认今天。
 
     Returns:
-        datetime: 今天的一个datetime对象，表示计划打卡的具体时间（秒和微秒都设为0）
+        datetime: 表示计划打卡的具体时间（秒和微秒都设为0）
     """
     # 生成一个随机分钟数
     float_minute = ConfigManager.get("clockIn", "time", "float", default=1)
     random_minutes = random.randint(0, float_minute)
 
     # 获取配置的打卡时间
-    start_time_str = ConfigManager.get("clockIn", "time", "start", default="04:30")
-    config_time = datetime.strptime(start_time_str, "%H:%M")
+    if start_time_str is None:
+        start_time_str = ConfigManager.get("clockIn", "time", "start", default="04:30")
+    config_time = datetime.strptime(start_time_str, "%H:%M").time()
 
-    # 获取小时和分钟
-    hour = config_time.hour
-    minute = config_time.minute + random_minutes
+    # 返回计划打卡时间
+    return datetime.combine(day or date.today(), config_time) + timedelta(minutes=random_minutes)
 
-    # 处理分钟进位
-    if minute >= 60:
-        hour += 1
-        minute -= 60
 
-    # 返回计划打卡时间
-    return datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+def plan_jobs(day: date) -> List[ScheduledJob]:
+    """
+    生成当天的打卡任务：twice_daily 模式包含上班卡（time.start）和下班卡（time.end），其余模式只有上班卡。
 
+    Args:
+        day (date): 计划的日期。
 
-def run():
+    Returns:
+        List[ScheduledJob]: 当天的任务列表，今日不打卡时为空。
+    """
+    if not should_run_today():
+        logging.info("\n-------------今日不打卡-------------\n")
+        return []
+
+    # twice_daily 的打卡类型在计划时确定，不在预热或执行时按当前钟点重新判断；
+    # 其余模式为 None，仍由 get_checkin_type 按配置判断（如 weekday 的节假日）
+    start_time_str = ConfigManager.get("clockIn", "time", "start", default="04:30")
+    if ConfigManager.get("clockIn", "mode") != "twice_daily":
+        planned = [("上班卡", start_time_str, None)]
+    else:
+        planned = [("上班卡", start_time_str, {"type": "START", "display": "上班"})]
+        end_time_str = ConfigManager.get("clockIn", "time", "end")
+        if end_time_str:
+            planned.append(("下班卡", end_time_str, {"type": "END", "display": "下班"}))
+        else:
+            logging.warning("twice_daily 模式未配置 clockIn.time.end，仅打上班卡")
+
+    # 计划打卡时间前提前多少分钟预热（登录、获取计划和打卡状态），0 表示不预热
+    warmup_minutes = ConfigManager.get("clockIn", "time", "warmup", default=2)
+
+    jobs = []
+    for name, time_str, checkin in planned:
+        execution_time = generate_random_time(time_str, day)
+        logging.info(f"\n-------------今日计划{name}时间: {execution_time.strftime('%H:%M')}-------------\n")
+        state = {"checkin": checkin}
+        if warmup_minutes:
+            jobs.append(ScheduledJob(f"{name}预热", execution_time - timedelta(minutes=warmup_minutes),
+                                     partial(warm_up, state)))
+        jobs.append(ScheduledJob(name, execution_time, partial(run, state)))
+    return jobs
+
+
+def warm_up(state: dict):
+    """
+    打卡前的预热：加载验证码模型、建立连接、刷新 token（必要时通过滑块验证码）并获取计划和打卡状态，
+    结果保存在 state 中，到点后 run 只需提交打卡。
+
+    Args:
+        state (dict): 与同一次打卡的 run 共享的状态，checkin 为计划时确定的打卡类型。
+    """
+    from util.CaptchaUtils import warm_up_onnx_sessions
+
+    logging.info("开始打卡前预热")
+    warm_up_onnx_sessions()
+    state["prepared"] = prepare_tasks(state.get("checkin"))
+
+
+def run(state: Optional[dict] = None):
     """
     执行打卡任务的主函数
 
-    该函数作为程序入口，负责启动打卡任务的执行流程
+    该函数作为程序入口，负责启动打卡任务的执行流程；预热成功时直接提交打卡，否则执行完整流程
+
+    Args:
+        state (Optional[dict]): 预热阶段保存的状态。
     """
     print("开始执行今日打卡任务")
-    execute_tasks()  # 执行具体的任务列表
+    state = state or {}
+    execute_tasks(state.pop("prepared", None), state.get("checkin"))  # 执行具体的任务列表
 
 
 if __name__ == "__main__":
@@ -93,24 +149,8 @@ if __name__ == "__main__":
 
     # 打印模式信息
     mode = ConfigManager.get("clockIn", "mode")
-    mode_names = {"weekday": "【法定工作日】", "everyday": "【每天】", "customize": "【自定义】"}
+    mode_names = {"weekday": "【法定工作日】", "everyday": "【每天】", "customize": "【自定义】",
+                  "twice_daily": "【一天两次】"}
     logging.info(f"打卡模式为{mode_names.get(mode, '【未知】')}\n")
 
-    while True:
-        current_time = datetime.now().strftime("%H:%M")
-        logging.info(f"当前时间：{current_time}")
-        gc.collect()
-
-        # 每日 04:29 设置计划打卡任务
-        if current_time == "00:00":
-            if should_run_today():  # 每天只检查一次！
-                execution_time = generate_random_time()
-                logging.info(f"\n-------------今日计划打卡时间: {execution_time.strftime('%H:%M')}-------------\n")
-                schedule.clear()
-                schedule.every().day.at(execution_time.strftime("%H:%M")).do(run)
-            else:
-                logging.info("\n-------------今日不打卡-------------\n")
-                schedule.clear()
-
-        schedule.run_pending()
-        time.sleep(60)
+    DailyScheduler(plan_jobs).run_forever()
@@ -2,11 +2,11 @@ import logging
 import os
 import sys
 from datetime import datetime
-from manager.ConfigManager import ConfigManager
-from step.clockIn import clock_in
+from typing import Optional
+from manager.UserContext import UserContext
+from step.clockIn import clock_in, prepare_clock_in, submit_clock_in
 from step.fetchPlan import fetch_plan
 from step.login import login
-from manager.UserInfoManager import UserInfoManager
 from step.sendEmail import send_email
 
 # ======================
@@ -23,27 +23,52 @@ logging.basicConfig(
 )
 
 
-def execute_tasks():
+def prepare_tasks(checkin: Optional[dict] = None) -> Optional[dict]:
+    """
+    打卡前的准备：登录（必要时通过滑块验证码）、获取实习计划、查询打卡状态。
+
+    Args:
+        checkin (Optional[dict]): 指定的打卡类型，默认按配置和当前时间判断。
+
+    Returns:
+        Optional[dict]: step.clockIn.prepare_clock_in 准备好的打卡状态，失败时返回 None
+    """
+    ctx = UserContext.from_managers()
     # 登录
-    isLogin = login()
+    isLogin = login(ctx)
     if not isLogin:
         logging.warning("登录失败")
-        return
-    logging.info(f"用户数据：{UserInfoManager.load()}")
-    logging.info(f"用户类型：{UserInfoManager.get('roleKey')}")
-    if UserInfoManager.get("userType") != "student":
+        return None
+    logging.info(f"用户数据：{ctx.user_info}")
+    logging.info(f"用户类型：{ctx.get_user('roleKey')}")
+    if ctx.get_user("userType") != "student":
         sys.exit("当前用户不是学生，结束执行打卡任务")
     # 获取打卡信息
-    hasPlan = fetch_plan()
+    hasPlan = fetch_plan(ctx)
     if not hasPlan:
         logging.warning("未获取到打卡信息")
+        return None
+    return prepare_clock_in(ctx, checkin)
+
+
+def execute_tasks(prepared: Optional[dict] = None, checkin: Optional[dict] = None):
+    """
+    执行打卡任务。
+
+    Args:
+        prepared (Optional[dict]): 预热阶段 prepare_tasks 的结果，提供时只需提交打卡。
+        checkin (Optional[dict]): 未预热时使用的打卡类型，默认按配置和当前时间判断。
+    """
+    prepared = prepared or prepare_tasks(checkin)
+    if not prepared:
         return
     # 执行打卡
-    str = clock_in()
+    str = submit_clock_in(prepared)
     logging.info(str)
     # 发送邮件通知
-    if ConfigManager.get("smtp", "enable"):
-        send_email(str["title"], str["content"])
+    ctx = prepared["api_client"].ctx
+    if ctx.get_config("smtp", "enable"):
+        send_email(str["title"], str["content"], ctx)
 
 
 def test_clock_in():
@@ -61,29 +86,30 @@ def test_clock_in():
         clock_type = "下班"
         logging.info(f"当前时间 {current_time.strftime('%H:%M')}，执行下班卡测试")
     
+    ctx = UserContext.from_managers()
     # 登录
-    isLogin = login()
+    isLogin = login(ctx)
     if not isLogin:
         logging.warning("登录失败")
         return
-    logging.info(f"用户数据：{UserInfoManager.load()}")
-    logging.info(f"用户类型：{UserInfoManager.get('roleKey')}")
-    if UserInfoManager.get("userType") != "student":
+    logging.info(f"用户数据：{ctx.user_info}")
+    logging.info(f"用户类型：{ctx.get_user('roleKey')}")
+    if ctx.get_user("userType") != "student":
         sys.exit("当前用户不是学生，结束执行打卡任务")
     
     # 获取打卡信息
-    hasPlan = fetch_plan()
+    hasPlan = fetch_plan(ctx)
     if not hasPlan:
         logging.warning("未获取到打卡信息")
         return
     
     # 执行打卡
-    result = clock_in()
+    result = clock_in(ctx)
     logging.info(f"{clock_type}卡测试结果：{result}")
     
     # 发送邮件通知
-    if ConfigManager.get("smtp", "enable"):
-        send_email(result["title"], result["content"])
+    if ctx.get_config("smtp", "enable"):
+        send_email(result["title"], result["content"], ctx)
     
     return result
 
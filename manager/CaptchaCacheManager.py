@@ -0,0 +1,222 @@
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Optional
+
+from manager.ConfigManager import ConfigManager
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，只保证进程内的线程安全
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# 根目录 & captchaCache 路径
+# ======================
+if getattr(sys, 'frozen', False):
+    # 打包 exe 后
+    BASE_DIR = Path(sys.executable).resolve().parent
+else:
+    # 源码运行
+    BASE_DIR = Path(__file__).resolve().parent.parent
+
+USER_DIR = BASE_DIR / "user"
+USER_DIR.mkdir(parents=True, exist_ok=True)  # 不存在则自动创建
+
+CAPTCHA_CACHE_PATH = USER_DIR / "captchaCache.json"
+# 多个进程读取-合并-写入 captchaCache.json 时持有的文件锁
+CAPTCHA_CACHE_LOCK_PATH = USER_DIR / "captchaCache.json.lock"
+
+# 默认最多缓存的验证码数量，0 为关闭缓存
+DEFAULT_CACHE_SIZE = 256
+
+
+class CaptchaCacheManager:
+    """
+    管理验证码识别结果的 LRU 缓存（可选持久化到 captchaCache.json）：
+    - 以解码后图片内容的哈希为键，服务端重复下发同一张验证码时直接返回结果，不再做匹配和推理
+    - blockPuzzle 缓存滑动距离，clickWord 缓存每个文字及其文本框，换一组 wordList 也能命中
+    - 配置来自 config.json 的 captchaCache 字段：size（缓存条数）、persist（是否写入文件）
+    - 缓存属于当前进程；CaptchaService 的工作进程各自缓存，不写文件
+    - 持久化时在文件锁内合并文件中的条目后整体替换，多个进程同时运行不会互相覆盖或读到写了一半的文件
+    """
+    _cache: OrderedDict | None = None
+    _lock = threading.Lock()
+    _size: int | None = None
+    _persist: bool | None = None
+    _stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+
+    @classmethod
+    def configure(cls, size: Optional[int] = None, persist: Optional[bool] = None):
+        """覆盖配置文件中的缓存条数和是否持久化，未指定的保持不变"""
+        with cls._lock:
+            if size is not None:
+                cls._size = max(size, 0)
+            if persist is not None:
+                cls._persist = persist
+            cls._trim()
+
+    @classmethod
+    def size(cls) -> int:
+        if cls._size is None:
+            cls._size = max(int(ConfigManager.get("captchaCache", "size", default=DEFAULT_CACHE_SIZE)), 0)
+        return cls._size
+
+    @classmethod
+    def persist(cls) -> bool:
+        if cls._persist is None:
+            cls._persist = bool(ConfigManager.get("captchaCache", "persist", default=False))
+        return cls._persist
+
+    @classmethod
+    def _load_from_file(cls) -> OrderedDict:
+        """从文件读取，格式为 {"entries": [[键, 结果], ...]}，按最近使用从旧到新排列"""
+        if not cls.persist() or not CAPTCHA_CACHE_PATH.exists():
+            return OrderedDict()
+        try:
+            with open(CAPTCHA_CACHE_PATH, "r", encoding="utf-8") as f:
+                return OrderedDict((key, value) for key, value in json.load(f).get("entries", []))
+        except Exception as e:
+            logger.error(f"读取 captchaCache.json 失败: {e}")
+            return OrderedDict()
+
+    @classmethod
+    def load(cls) -> OrderedDict:
+        """获取缓存，如果尚未加载则从文件加载"""
+        if cls._cache is None:
+            cls._cache = cls._load_from_file()
+            cls._trim()
+        return cls._cache
+
+    @staticmethod
+    @contextmanager
+    def _file_lock():
+        """跨进程的排他锁，同时运行的多个进程依次读取、合并、写入 captchaCache.json"""
+        if fcntl is None:
+            yield
+            return
+        CAPTCHA_CACHE_LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(CAPTCHA_CACHE_LOCK_PATH, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def _save(cls, removed: Optional[str] = None):
+        """
+        写入 captchaCache.json，调用方需持有 cls._lock。
+
+        Args:
+            removed (Optional[str]): 刚删除的缓存键，合并时不再从文件中恢复。
+        """
+        if not cls.persist():
+            return
+        # 先写临时文件再替换，并行运行的其他进程不会读到写了一半的文件
+        tmp_path = CAPTCHA_CACHE_PATH.with_name(f"{CAPTCHA_CACHE_PATH.name}.{os.getpid()}.tmp")
+        try:
+            # 读取到写入之间持有文件锁，合并文件中其他进程保存的条目（视为更早使用），不会互相覆盖
+            with cls._file_lock():
+                merged = cls._load_from_file()
+                merged.pop(removed, None)
+                for key, value in cls.load().items():
+                    merged.pop(key, None)
+                    merged[key] = value
+                cls._cache = merged
+                cls._trim()
+                CAPTCHA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"entries": [[key, value] for key, value in merged.items()]}, f, ensure_ascii=False)
+                os.replace(tmp_path, CAPTCHA_CACHE_PATH)
+        except Exception as e:
+            logger.error(f"写入 captchaCache.json 失败: {e}")
+        finally:
+            if tmp_path.exists():
+                os.unlink(tmp_path)
+
+    @classmethod
+    def _trim(cls):
+        if cls._cache is None:
+            return
+        while len(cls._cache) > cls.size():
+            cls._cache.popitem(last=False)
+            cls._stats["evictions"] += 1
+
+    @staticmethod
+    def make_key(captcha_type: str, *images: bytes) -> str:
+        """由验证码类型和解码后的图片内容生成缓存键"""
+        digest = blake2b(digest_size=16)
+        for image in images:
+            digest.update(len(image).to_bytes(8, "little"))
+            digest.update(image)
+        return f"{captcha_type}:{digest.hexdigest()}"
+
+    @classmethod
+    def key_for(cls, captcha_type: str, captcha_data: dict) -> str:
+        """由验证码接口返回的 data 字段生成缓存键"""
+        if captcha_type == "blockPuzzle":
+            return cls.make_key(captcha_type, base64.b64decode(captcha_data["jigsawImageBase64"]),
+                                base64.b64decode(captcha_data["originalImageBase64"]))
+        return cls.make_key(captcha_type, base64.b64decode(captcha_data["originalImageBase64"]))
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Any]:
+        """读取缓存的识别结果，未命中时返回 None"""
+        if not cls.size():
+            return None
+        with cls._lock:
+            cache = cls.load()
+            value = cache.get(key)
+            if value is None:
+                cls._stats["misses"] += 1
+                return None
+            cache.move_to_end(key)
+            cls._stats["hits"] += 1
+            return value
+
+    @classmethod
+    def put(cls, key: str, value: Any):
+        """保存识别结果，超出缓存条数时淘汰最久未使用的"""
+        if not cls.size():
+            return
+        with cls._lock:
+            cache = cls.load()
+            cache[key] = value
+            cache.move_to_end(key)
+            cls._stats["stores"] += 1
+            cls._trim()
+            cls._save()
+
+    @classmethod
+    def invalidate(cls, captcha_type: str, captcha_data: dict):
+        """验证码校验失败时删除对应的缓存，避免重复使用错误的结果"""
+        if not cls.size():
+            return
+        try:
+            key = cls.key_for(captcha_type, captcha_data)
+        except Exception:
+            return
+        with cls._lock:
+            if cls.load().pop(key, None) is not None:
+                cls._stats["invalidations"] += 1
+                cls._save(removed=key)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """返回缓存命中统计"""
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats["entries"] = len(cls._cache) if cls._cache is not None else 0
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
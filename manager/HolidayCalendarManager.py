@@ -0,0 +1,215 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# 根目录 & holidayCalendar 路径
+# ======================
+if getattr(sys, 'frozen', False):
+    # 打包 exe 后
+    BASE_DIR = Path(sys.executable).resolve().parent
+else:
+    # 源码运行
+    BASE_DIR = Path(__file__).resolve().parent.parent
+
+USER_DIR = BASE_DIR / "user"
+USER_DIR.mkdir(parents=True, exist_ok=True)  # 不存在则自动创建
+
+HOLIDAY_CALENDAR_PATH = USER_DIR / "holidayCalendar.json"
+
+# 全年节假日接口：返回该年所有法定节假日（holiday=true）和调休补班日（holiday=false）
+HOLIDAY_YEAR_API = "https://timor.tech/api/holiday/year/{year}"
+REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+# 日历超过该时长未更新则视为过期，下次查询时重新拉取（国务院通常在年底公布次年安排，期间也可能调整）
+MAX_AGE_SECONDS = 7 * 24 * 3600
+# 拉取失败后至少间隔该时长再重试，避免接口不可用时每次查询都等待超时
+RETRY_INTERVAL_SECONDS = 3600
+
+
+class HolidayCalendarManager:
+    """
+    管理 holidayCalendar.json（按年份存储的节假日日历）：
+    - 每年整体拉取一次，只在过期时重新拉取，拉取失败时继续使用旧数据
+    - 只记录与周一至周五规则不同的日期：法定节假日为 false，调休补班日为 true
+    - 查询为内存字典 O(1) 查找，热点路径上不产生网络请求
+    - 支持从文件离线导入（接口原始响应或本文件格式）
+    """
+    _calendar_cache: dict | None = None
+    _last_attempts: dict[int, float] = {}  # 年份 -> 最近一次拉取时间
+    _lock = threading.Lock()
+
+    @classmethod
+    def _load_from_file(cls) -> dict:
+        """从文件读取日历，格式为 {"years": {"2026": {"updatedAt": 时间戳, "days": {"2026-01-01": false}}}}"""
+        if not HOLIDAY_CALENDAR_PATH.exists():
+            return {"years": {}}
+        try:
+            with open(HOLIDAY_CALENDAR_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data.setdefault("years", {})
+            return data
+        except Exception as e:
+            logger.error(f"读取 holidayCalendar.json 失败: {e}")
+            return {"years": {}}
+
+    @classmethod
+    def load(cls) -> dict:
+        """获取缓存中的日历，如果没有缓存则从文件加载"""
+        if cls._calendar_cache is None:
+            cls._calendar_cache = cls._load_from_file()
+        return cls._calendar_cache
+
+    @classmethod
+    def _save(cls):
+        try:
+            HOLIDAY_CALENDAR_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(HOLIDAY_CALENDAR_PATH, "w", encoding="utf-8") as f:
+                json.dump(cls.load(), f, ensure_ascii=False, indent=4)
+            logger.info(f"holidayCalendar.json 已更新: {HOLIDAY_CALENDAR_PATH.resolve()}")
+        except Exception as e:
+            logger.error(f"写入 holidayCalendar.json 失败: {e}")
+
+    @staticmethod
+    def _parse_api_response(year: int, data: dict) -> dict[str, bool]:
+        """
+        将全年节假日接口的响应转换为 {日期: 是否工作日}。
+
+        Raises:
+            ValueError: 响应业务码异常或缺少 holiday 字段。
+        """
+        if data.get("code") != 0 or not isinstance(data.get("holiday"), dict):
+            raise ValueError(f"节假日接口返回异常: {str(data)[:200]}")
+        days = {}
+        for key, info in data["holiday"].items():
+            day = info.get("date") or f"{year}-{key}"
+            days[day] = not info.get("holiday")  # holiday=false 表示调休补班
+        return days
+
+    @classmethod
+    def set_year(cls, year: int, days: dict[str, bool]):
+        """更新某一年的日历并写回文件"""
+        with cls._lock:
+            cls.load()["years"][str(year)] = {"updatedAt": int(time.time()), "days": days}
+            cls._save()
+
+    @classmethod
+    def refresh(cls, year: int) -> bool:
+        """
+        从接口整体拉取某一年的节假日安排。
+
+        Returns:
+            bool: 拉取并保存成功返回 True，否则返回 False
+        """
+        try:
+            resp = requests.get(HOLIDAY_YEAR_API.format(year=year), headers=REQUEST_HEADERS, timeout=5)
+            resp.raise_for_status()
+            days = cls._parse_api_response(year, resp.json())
+        except Exception as e:
+            logger.warning(f"拉取 {year} 年节假日安排失败: {e}")
+            return False
+        cls.set_year(year, days)
+        logger.info(f"已拉取 {year} 年节假日安排，共 {len(days)} 个特殊日期")
+        return True
+
+    @classmethod
+    def import_file(cls, path: str, year: Optional[int] = None) -> int:
+        """
+        离线导入节假日日历。
+
+        Args:
+            path (str): 文件路径，可以是全年节假日接口的原始响应（需指定 year），
+                也可以是 holidayCalendar.json 格式的文件（导入其中的所有年份）。
+            year (Optional[int]): 导入接口原始响应时对应的年份。
+
+        Returns:
+            int: 导入的年份数量。
+
+        Raises:
+            ValueError: 文件格式无法识别。
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if "years" in data:
+            for key, calendar in data["years"].items():
+                cls.set_year(int(key), calendar.get("days", {}))
+            return len(data["years"])
+
+        if "holiday" in data:
+            if year is None:
+                raise ValueError("导入接口原始响应时需要指定年份")
+            cls.set_year(year, cls._parse_api_response(year, data))
+            return 1
+
+        raise ValueError(f"无法识别的节假日日历文件: {path}")
+
+    @classmethod
+    def _is_stale(cls, calendar: dict) -> bool:
+        return time.time() - calendar.get("updatedAt", 0) > MAX_AGE_SECONDS
+
+    @classmethod
+    def get_year(cls, year: int) -> Optional[dict[str, bool]]:
+        """
+        获取某一年的特殊日期表，缺失或过期时尝试重新拉取，拉取失败则返回旧数据。
+
+        Returns:
+            Optional[dict[str, bool]]: {日期: 是否工作日}，没有任何可用数据时返回 None
+        """
+        calendar = cls.load()["years"].get(str(year))
+        if calendar is None or cls._is_stale(calendar):
+            with cls._lock:
+                last_attempt = cls._last_attempts.get(year, 0)
+                should_refresh = time.time() - last_attempt > RETRY_INTERVAL_SECONDS
+                if should_refresh:
+                    cls._last_attempts[year] = time.time()
+            if should_refresh:
+                cls.refresh(year)
+            calendar = cls.load()["years"].get(str(year))
+        return calendar["days"] if calendar else None
+
+    @classmethod
+    def is_workday(cls, day: date) -> Optional[bool]:
+        """
+        判断某天是否为法定工作日。
+
+        Returns:
+            Optional[bool]: True 为工作日（含调休补班），False 为周末或节假日；
+                该年份没有可用日历时返回 None，由调用方降级处理
+        """
+        days = cls.get_year(day.year)
+        if days is None:
+            return None
+        return days.get(day.isoformat(), day.weekday() < 5)
+
+
+if __name__ == "__main__":
+    # 离线导入：python -m manager.HolidayCalendarManager --import holiday-2026.json --year 2026
+    # 手动刷新：python -m manager.HolidayCalendarManager --refresh 2026
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="节假日日历管理")
+    parser.add_argument("--import", dest="import_path", help="导入的文件路径")
+    parser.add_argument("--year", type=int, help="导入接口原始响应时对应的年份")
+    parser.add_argument("--refresh", type=int, metavar="YEAR", help="从接口重新拉取某一年的安排")
+    args = parser.parse_args()
+
+    if args.import_path:
+        count = HolidayCalendarManager.import_file(args.import_path, args.year)
+        logger.info(f"已导入 {count} 个年份的节假日日历")
+    if args.refresh:
+        HolidayCalendarManager.refresh(args.refresh)
@@ -43,19 +43,19 @@ class PlanInfoManager:
             planinfo = data.get("planInfo")
             if planinfo:
                 # 将键全部转换为小写，方便大小写不敏感访问
-                planinfo = cls._lower_keys(planinfo)
+                planinfo = cls.lower_keys(planinfo)
             return planinfo
         except Exception as e:
             logger.error(f"读取 planInfo.json 失败: {e}")
             return None
 
     @classmethod
-    def _lower_keys(cls, d: dict) -> dict:
+    def lower_keys(cls, d: dict) -> dict:
         """递归将字典键转换为小写"""
         new_d = {}
         for k, v in d.items():
             if isinstance(v, dict):
-                v = cls._lower_keys(v)
+                v = cls.lower_keys(v)
             new_d[k.lower()] = v
         return new_d
 
@@ -70,7 +70,7 @@ class PlanInfoManager:
     @classmethod
     def set_planinfo(cls, planinfo: dict):
         """更新缓存并写回文件"""
-        cls._planinfo_cache = cls._lower_keys(planinfo)  # 保持缓存键为小写
+        cls._planinfo_cache = cls.lower_keys(planinfo)  # 保持缓存键为小写
         try:
             PLAN_INFO_PATH.parent.mkdir(parents=True, exist_ok=True)
             with open(PLAN_INFO_PATH, "w", encoding="utf-8") as f:
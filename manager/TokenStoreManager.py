@@ -0,0 +1,217 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from util.CryptoUtils import aes_decrypt, aes_encrypt
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，只保证进程内的线程安全
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ======================
+# 根目录 & tokenStore 路径
+# ======================
+if getattr(sys, 'frozen', False):
+    # 打包 exe 后
+    BASE_DIR = Path(sys.executable).resolve().parent
+else:
+    # 源码运行
+    BASE_DIR = Path(__file__).resolve().parent.parent
+
+USER_DIR = BASE_DIR / "user"
+USER_DIR.mkdir(parents=True, exist_ok=True)  # 不存在则自动创建
+
+TOKEN_STORE_PATH = USER_DIR / "tokenStore.json"
+# 多个进程读取-合并-写入 tokenStore.json 时持有的文件锁
+TOKEN_STORE_LOCK_PATH = USER_DIR / "tokenStore.json.lock"
+
+# 加密密钥的来源，建议在 GitHub Secrets 中设置；未设置时 token 只保存在内存中，不写入文件
+TOKEN_STORE_KEY_ENV = "TOKEN_STORE_KEY"
+
+# 尚未观察到 token 过期时假定的有效期
+DEFAULT_TOKEN_LIFETIME = 3 * 24 * 3600
+# token 使用超过有效期的该比例后提前重新登录
+REFRESH_RATIO = 0.8
+
+
+class TokenStoreManager:
+    """
+    管理 tokenStore.json（按手机号保存的加密登录信息）：
+    - 以手机号的 HMAC-SHA256（密钥为 TOKEN_STORE_KEY）为键，登录返回的 userInfo 连同签发时间用 AES 加密保存，密钥由手机号和 TOKEN_STORE_KEY 派生
+    - 每次观察到 token 失效时记录其实际存活时长，用观察到的最短时长估计有效期
+    - 使用超过估计有效期的 80% 后提示提前刷新，多数运行可以直接复用 token，跳过验证码登录
+    - 未设置 TOKEN_STORE_KEY 时不读写 tokenStore.json，token 仅在本进程内复用，密钥为进程内随机生成
+    """
+    _store_cache: dict | None = None
+    _lock = threading.Lock()
+    # 未设置 TOKEN_STORE_KEY 时 token 只在内存中使用，用进程内随机生成的密钥加密
+    _ephemeral_secret = secrets.token_hex(16)
+
+    @classmethod
+    def _secret(cls) -> Optional[str]:
+        return os.environ.get(TOKEN_STORE_KEY_ENV) or None
+
+    @classmethod
+    def persistent(cls) -> bool:
+        """是否把 token 保存到 tokenStore.json（需要设置 TOKEN_STORE_KEY）"""
+        return cls._secret() is not None
+
+    @classmethod
+    def _load_from_file(cls) -> dict:
+        """从文件读取，格式为 {"lifetime": 秒数或 null, "tokens": {手机号HMAC: 密文}}"""
+        if not cls.persistent() or not TOKEN_STORE_PATH.exists():
+            return {"lifetime": None, "tokens": {}}
+        try:
+            with open(TOKEN_STORE_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data.setdefault("lifetime", None)
+            data.setdefault("tokens", {})
+            return data
+        except Exception as e:
+            logger.error(f"读取 tokenStore.json 失败: {e}")
+            return {"lifetime": None, "tokens": {}}
+
+    @classmethod
+    def load(cls) -> dict:
+        """获取缓存中的 token 存储，如果没有缓存则从文件加载"""
+        if cls._store_cache is None:
+            if not cls.persistent():
+                logger.warning(f"未设置环境变量 {TOKEN_STORE_KEY_ENV}，登录 token 不会保存到 tokenStore.json，"
+                               f"每次运行都需要重新登录；请在 Secrets 中添加 {TOKEN_STORE_KEY_ENV}")
+            cls._store_cache = cls._load_from_file()
+        return cls._store_cache
+
+    @staticmethod
+    @contextmanager
+    def _file_lock():
+        """跨进程的排他锁，进程池中的多个工作进程依次读取、合并、写入 tokenStore.json"""
+        if fcntl is None:
+            yield
+            return
+        TOKEN_STORE_LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(TOKEN_STORE_LOCK_PATH, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def _save(cls):
+        if not cls.persistent():
+            return
+        # 先写临时文件再替换，并行运行的其他进程不会读到写了一半的文件
+        tmp_path = TOKEN_STORE_PATH.with_name(f"{TOKEN_STORE_PATH.name}.{os.getpid()}.tmp")
+        try:
+            TOKEN_STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cls.load(), f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, TOKEN_STORE_PATH)
+        except Exception as e:
+            logger.error(f"写入 tokenStore.json 失败: {e}")
+        finally:
+            if tmp_path.exists():
+                os.unlink(tmp_path)
+
+    @classmethod
+    def _derive(cls, purpose: str, phone: str) -> str:
+        """以 TOKEN_STORE_KEY 为密钥对手机号做 HMAC-SHA256，不同用途使用不同前缀，得到互不相关的值"""
+        secret = cls._secret() or cls._ephemeral_secret
+        return hmac.new(secret.encode("utf-8"), f"{purpose}:{phone}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+    @classmethod
+    def _entry_key(cls, phone: str) -> str:
+        # 不知道 TOKEN_STORE_KEY 时无法由手机号反查条目
+        return cls._derive("entry", phone)
+
+    @classmethod
+    def _cipher_key(cls, phone: str) -> str:
+        # 32 个字符，对应 AES-256
+        return cls._derive("cipher", phone)[:32]
+
+    @classmethod
+    def lifetime(cls) -> float:
+        """当前估计的 token 有效期（秒）"""
+        return cls.load().get("lifetime") or DEFAULT_TOKEN_LIFETIME
+
+    @classmethod
+    def get(cls, phone: Optional[str]) -> Optional[dict]:
+        """
+        读取某个手机号保存的登录信息。
+
+        Returns:
+            Optional[dict]: {"userInfo": {...}, "issuedAt": 时间戳}，不存在、已失效或无法解密时返回 None
+        """
+        if not phone:
+            return None
+        with cls._lock:
+            ciphertext = cls.load()["tokens"].get(cls._entry_key(phone))
+        if not ciphertext:
+            return None
+        try:
+            entry = json.loads(aes_decrypt(ciphertext, cls._cipher_key(phone)))
+        except Exception:
+            logger.warning("已保存的 token 无法解密（TOKEN_STORE_KEY 可能已更改），将重新登录")
+            return None
+        if entry.get("expiredAt") or not entry.get("userInfo", {}).get("token"):
+            return None
+        return entry
+
+    @classmethod
+    def needs_refresh(cls, entry: dict) -> bool:
+        """token 已使用超过估计有效期的 80% 时返回 True"""
+        return time.time() - entry.get("issuedAt", 0) >= cls.lifetime() * REFRESH_RATIO
+
+    @classmethod
+    def _put(cls, phone: str, entry: dict):
+        ciphertext = aes_encrypt(json.dumps(entry, ensure_ascii=False), cls._cipher_key(phone))
+        # 写入前合并文件中的最新内容，并行运行的其他进程保存的 token 不会被覆盖；
+        # 读取到写入之间持有文件锁，避免两个进程同时合并后互相覆盖
+        with cls._file_lock():
+            current, stored = cls.load(), cls._load_from_file()
+            lifetimes = [value for value in (current.get("lifetime"), stored.get("lifetime")) if value]
+            current["lifetime"] = min(lifetimes) if lifetimes else None
+            current["tokens"] = {**current["tokens"], **stored["tokens"], cls._entry_key(phone): ciphertext}
+            cls._save()
+
+    @classmethod
+    def save(cls, phone: Optional[str], user_info: dict):
+        """登录成功后保存 userInfo，签发时间记为当前时间"""
+        if not phone or not user_info.get("token"):
+            return
+        with cls._lock:
+            cls._put(phone, {"userInfo": user_info, "issuedAt": int(time.time())})
+        logger.info("已保存登录 token")
+
+    @classmethod
+    def mark_expired(cls, phone: Optional[str], token: Optional[str]):
+        """
+        记录 token 失效：标记对应条目，并用其实际存活时长修正有效期估计。
+
+        Args:
+            phone (Optional[str]): 手机号。
+            token (Optional[str]): 失效的 token，与已保存的 token 不一致时忽略。
+        """
+        entry = cls.get(phone)
+        if not entry or entry["userInfo"].get("token") != token:
+            return
+        now = int(time.time())
+        observed = now - entry.get("issuedAt", now)
+        with cls._lock:
+            store = cls.load()
+            if observed > 0 and (store.get("lifetime") is None or observed < store["lifetime"]):
+                store["lifetime"] = observed
+                logger.info(f"观察到 token 有效期不超过 {observed / 3600:.1f} 小时")
+            cls._put(phone, {**entry, "expiredAt": now})
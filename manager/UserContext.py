@@ -0,0 +1,97 @@
+import logging
+import threading
+from typing import Any, Optional
+
+from manager.ConfigManager import ConfigManager
+from manager.PlanInfoManager import PlanInfoManager
+from manager.UserInfoManager import UserInfoManager
+
+logger = logging.getLogger(__name__)
+
+
+class UserContext:
+    """
+    单个用户的运行上下文：
+    - 在内存中保存 config、userInfo、planInfo，互不干扰，可在同一进程中并发使用
+    - persist=True 时写操作同步到对应管理器（及其 json 文件），供单用户模式复用登录状态
+    """
+
+    def __init__(self,
+                 config: Optional[dict] = None,
+                 user_info: Optional[dict] = None,
+                 plan_info: Optional[dict] = None,
+                 persist: bool = False):
+        self.config = config or {}
+        self.user_info = user_info or {}
+        self.plan_info = PlanInfoManager.lower_keys(plan_info or {})
+        self.persist = persist
+        self.retry_budget = None  # 该用户所有请求共用的重试时间预算，由 RetryPolicy 在首次请求时创建
+        self.circuit_rejected = False  # 是否有请求因接口熔断被拒绝
+        # Token失效时同一用户只由一个请求重新登录，其余请求等待并复用结果；异步锁在事件循环中首次使用时创建
+        self.token_lock = threading.RLock()
+        self.async_token_lock = None
+
+    @classmethod
+    def from_managers(cls) -> "UserContext":
+        """从 config.json、userInfo.json、planInfo.json 创建上下文，写操作会回写文件"""
+        return cls(ConfigManager.load(),
+                   UserInfoManager.load(),
+                   PlanInfoManager.load(),
+                   persist=True)
+
+    @classmethod
+    def from_user_config(cls, user_config: dict) -> "UserContext":
+        """从多用户配置中的单个条目（{"config": {...}}）创建纯内存上下文"""
+        return cls(user_config.get("config", {}))
+
+    @staticmethod
+    def _lookup(data: Optional[dict], keys: tuple, default: Any) -> Any:
+        if not data:
+            return default
+        for key in keys:
+            if isinstance(data, dict) and key in data:
+                data = data[key]
+            else:
+                return default
+        return data
+
+    def get_config(self, *keys: str, default: Any = None) -> Any:
+        """访问 config，支持嵌套 key"""
+        return self._lookup(self.config, keys, default)
+
+    def get_user(self, *keys: str, default: Any = None) -> Any:
+        """访问 userInfo，支持嵌套 key"""
+        return self._lookup(self.user_info, keys, default)
+
+    def get_plan(self, *keys: str, default: Any = None) -> Any:
+        """访问 planInfo，大小写不敏感，支持嵌套 key"""
+        return self._lookup(self.plan_info, tuple(key.lower() for key in keys), default)
+
+    def set_userinfo(self, user_info: dict):
+        """更新 userInfo"""
+        self.user_info = user_info
+        if self.persist:
+            UserInfoManager.set_userinfo(user_info)
+
+    def set_planinfo(self, plan_info: dict):
+        """更新 planInfo"""
+        self.plan_info = PlanInfoManager.lower_keys(plan_info)
+        if self.persist:
+            PlanInfoManager.set_planinfo(plan_info)
+
+    @property
+    def phone(self) -> Optional[str]:
+        """当前配置的手机号"""
+        return self.get_config("user", "phone")
+
+    def get_token(self) -> Optional[str]:
+        """获取 token"""
+        return self.get_user("token")
+
+    def get_userid(self) -> Optional[str]:
+        """获取 userId"""
+        return self.get_user("userId")
+
+    def get_plan_id(self) -> Optional[str]:
+        """获取 planId"""
+        return self.get_plan("planId")
@@ -1,26 +1,38 @@
 import logging
 from datetime import datetime
+from typing import Optional
 
-from manager.ConfigManager import ConfigManager
-from manager.UserInfoManager import UserInfoManager
+from manager.UserContext import UserContext
 from util.ApiService import ApiService
 from util.HelperFunctions import get_checkin_type, desensitize_name
 
 logger = logging.getLogger(__name__)
 
 
-def clock_in() -> dict[str, str]:
-    logging.info("执行签到打卡")
+def prepare_clock_in(ctx: Optional[UserContext] = None, checkin: Optional[dict] = None) -> dict:
+    """
+    打卡前的准备工作：判断打卡类型、查询最近一次打卡记录并组装打卡信息。
+    可以在计划打卡时间之前执行，到点后只需调用 submit_clock_in。
+
+    Args:
+        ctx (Optional[UserContext]): 用户上下文，默认使用本地 json 文件。
+        checkin (Optional[dict]): 指定的打卡类型（{"type": ..., "display": ...}），默认由 get_checkin_type 按配置和当前时间判断。
+
+    Returns:
+        dict: 准备好的打卡状态；今日已打过卡时 result 字段为最终结果。
+    """
+    ctx = ctx or UserContext.from_managers()
 
     current_time = datetime.now()
 
     # 获取打卡类型
-    checkin = get_checkin_type()
+    checkin = checkin or get_checkin_type(ctx)
     checkin_type = checkin.get("type")
     display_type = checkin.get("display")
 
     # 调用API服务
-    api_client = ApiService()
+    api_client = ApiService(ctx)
+    prepared = {"api_client": api_client, "display_type": display_type, "result": None}
     # 获取打卡信息
     last_checkin_info = api_client.get_checkin_info()
     # 检查是否已经打过卡
@@ -30,27 +42,51 @@ def clock_in() -> dict[str, str]:
         if last_checkin_time.date() == current_time.date():
             log = f"今日[{display_type}]卡已打，无需重复打卡"
             logger.info(log)
-            return {"title": "工学云签到任务通知", "content": log}
-
-    user_name = desensitize_name(UserInfoManager.get("nikeName"))
-    logger.info(f"用户 {user_name} 开始 {display_type} 打卡")
+            prepared["result"] = {"title": "工学云签到任务通知", "content": log}
+            return prepared
 
     # 设置打卡信息
-    checkin_info = {
+    prepared["checkin_info"] = {
         "type": checkin_type,
         "lastDetailAddress": last_checkin_info.get("address"),
         "attachments": None,
         "description": "",
     }
+    return prepared
+
+
+def submit_clock_in(prepared: dict) -> dict[str, str]:
+    """
+    提交 prepare_clock_in 准备好的打卡信息。
 
-    success = api_client.submit_clock_in(checkin_info)
+    Args:
+        prepared (dict): prepare_clock_in 的返回值。
+
+    Returns:
+        dict[str, str]: 通知标题和内容。
+    """
+    if prepared["result"]:
+        return prepared["result"]
+
+    api_client = prepared["api_client"]
+    ctx = api_client.ctx
+    display_type = prepared["display_type"]
+    user_name = desensitize_name(ctx.get_user("nikeName"))
+    logger.info(f"用户 {user_name} 开始 {display_type} 打卡")
+
+    success = api_client.submit_clock_in(prepared["checkin_info"])
     # success = {"result": True, "data": "打卡成功"}
 
     # 记录获取结果
     if success.get("result"):
         logger.info("打卡成功")
-        content = f"签到账号：{ConfigManager.get('user', 'phone')}\n签到地点：{ConfigManager.get('clockIn', 'location', 'address')}"
+        content = f"签到账号：{ctx.phone}\n签到地点：{ctx.get_config('clockIn', 'location', 'address')}"
         return {"title": "工学云签到成功通知", "content": content}
     else:
         logger.warning(f"打卡失败：{success.get('data')}")
         return {"title": "fail", "content": success.get('data')}
+
+
+def clock_in(ctx: Optional[UserContext] = None) -> dict[str, str]:
+    logging.info("执行签到打卡")
+    return submit_clock_in(prepare_clock_in(ctx))
@@ -1,22 +1,27 @@
 import logging
+from typing import Optional
 
-from manager.PlanInfoManager import PlanInfoManager
+from manager.UserContext import UserContext
 from util.ApiService import ApiService
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_plan() -> bool:
+def fetch_plan(ctx: Optional[UserContext] = None) -> bool:
     """
     获取打卡计划信息
 
+    Args:
+        ctx (Optional[UserContext]): 用户上下文，默认使用本地 json 文件。
+
     Returns:
         bool: 获取成功返回True，获取失败返回False
     """
     logging.info("检查打卡信息")
 
     # 检查本地是否已存在打卡计划信息
-    planId = PlanInfoManager.get_plan_id()
+    ctx = ctx or UserContext.from_managers()
+    planId = ctx.get_plan_id()
     if planId:
         logger.info("检测到本地已有打卡信息 ，跳过获取打卡信息")
         return True
@@ -24,7 +29,7 @@ def fetch_plan() -> bool:
     logger.info("未检测到打卡信息，开始执行获取打卡信息")
 
     # 调用API服务获取打卡计划信息
-    api_client = ApiService()
+    api_client = ApiService(ctx)
     success = api_client.fetch_plan()
 
     # 记录获取结果
@@ -1,34 +1,48 @@
 import logging
+from typing import Optional
 
-from manager.ConfigManager import ConfigManager
-from manager.UserInfoManager import UserInfoManager
+from manager.TokenStoreManager import TokenStoreManager
+from manager.UserContext import UserContext
 from util.ApiService import ApiService
 
 logger = logging.getLogger(__name__)
 
 
-def login() -> bool:
+def login(ctx: Optional[UserContext] = None) -> bool:
     """
     登录流程：
-    1. 如果本地 token 存在，直接返回 True
-    2. 否则调用 ApiService.login() 执行登录并写入 userInfo.json
+    1. 如果 token 存储中有当前手机号未临近过期的 token，直接复用并返回 True
+    2. 如果用户上下文中的 token 存在且属于当前手机号，直接返回 True
+    3. 否则调用 ApiService.login() 执行登录并写入用户上下文；
+       提前刷新失败时降级使用尚未过期的旧 token
+
+    Args:
+        ctx (Optional[UserContext]): 用户上下文，默认使用本地 json 文件。
     """
     logging.info("检查登录状态")
-    token = UserInfoManager.get_token()
-    isSame = ConfigManager.get("user", "phone") == UserInfoManager.get("phone")
+    ctx = ctx or UserContext.from_managers()
+    api_client = ApiService(ctx)
+    if api_client.restore_token():
+        logger.info("检测到已保存的 token，跳过登录")
+        return True
+
+    token = ctx.get_token()
+    isSame = ctx.phone == ctx.get_user("phone")
     if isSame:
-        if token:
+        if token and TokenStoreManager.get(ctx.phone) is None:
             logger.info("检测到本地 token，跳过登录")
             return True
-        else:
+        elif not token:
             logger.info("未检测到 token，开始执行登录")
     else:
         logger.info("检测到用户信息不一致，执行重新登录")
-    api_client = ApiService()
     success = api_client.login()
 
     if success:
         logger.info("登录成功")
+    elif api_client.restore_token(allow_expiring=True):
+        logger.warning("登录失败，继续使用已保存的 token")
+        return True
     else:
         logger.warning("登录失败")
 
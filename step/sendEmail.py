@@ -4,32 +4,42 @@ from email.header import Header
 from email.mime.text import MIMEText
 from email.utils import formataddr
 
-from manager.ConfigManager import ConfigManager
+from manager.UserContext import UserContext
 
 logger = logging.getLogger(__name__)
 
-def send_email(title, content):
-    to_emails = ConfigManager.get("smtp", "to")
+def send_email(title, content, ctx=None):
+    """
+    发送邮件通知。
+
+    Args:
+        title: 邮件标题。
+        content: 邮件正文。
+        ctx (Optional[UserContext]): 用户上下文，SMTP配置取自其中的 smtp 节点，默认使用 config.json。
+    """
+    ctx = ctx or UserContext.from_managers()
+    smtp = ctx.get_config("smtp", default={})
+    to_emails = smtp.get("to")
     
     for to_email in to_emails:
         try:
             # 设置 MIMEText 对象
             message = MIMEText(content, 'plain', 'utf-8')
             message['Subject'] = Header(title, 'utf-8')
-            from_header = Header(ConfigManager.get("smtp", "from"), 'utf-8')
-            message['From'] = formataddr((from_header.encode(), ConfigManager.get("smtp", "username")))
+            from_header = Header(smtp.get("from"), 'utf-8')
+            message['From'] = formataddr((from_header.encode(), smtp.get("username")))
             message['To'] = to_email
 
             # 连接到 SMTP 服务器，添加超时设置
             with smtplib.SMTP_SSL(
-                ConfigManager.get("smtp", "host"), 
-                ConfigManager.get("smtp", "port"),
+                smtp.get("host"), 
+                smtp.get("port"),
                 timeout=30  # 添加超时设置
             ) as server:
                 # 登录到邮箱账户
-                server.login(ConfigManager.get("smtp", "username"), ConfigManager.get("smtp", "password"))
+                server.login(smtp.get("username"), smtp.get("password"))
                 # 发送邮件
-                server.sendmail(ConfigManager.get("smtp", "username"), to_email, message.as_string())
+                server.sendmail(smtp.get("username"), to_email, message.as_string())
                 logger.info(f"邮件已成功发送到 {to_email}")
         except smtplib.SMTPResponseException as e:
             # SMTP响应异常，可能是非标准响应码，但邮件可能已发送成功
@@ -1,24 +1,34 @@
 import json
 import logging
+import os
 import random
-import re
+import socket
+import threading
 import time
 import uuid
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 
+from manager.CaptchaCacheManager import CaptchaCacheManager
 from manager.ConfigManager import ConfigManager
-from manager.PlanInfoManager import PlanInfoManager
-from manager.UserInfoManager import UserInfoManager
-from util.CaptchaUtils import recognize_blockPuzzle_captcha, recognize_clickWord_captcha
+from manager.TokenStoreManager import TokenStoreManager
+from manager.UserContext import UserContext
+from util.CaptchaService import CaptchaService
+from util.CircuitBreaker import CircuitBreaker, CircuitOpenError
 from util.CryptoUtils import create_sign, aes_encrypt, aes_decrypt
 from util.HelperFunctions import get_current_month_info
+from util.RateLimiter import RateLimiter
+from util.RetryPolicy import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 # 常量
-BASE_URL = "https://api.moguding.net:9000/"
+# 可通过环境变量 MOGUDING_BASE_URL 指向本地回放服务器（见 benchmark/replay_server.py）
+BASE_URL = os.environ.get("MOGUDING_BASE_URL", "https://api.moguding.net:9000/")
 HEADERS = {
     "user-agent": "Dart/2.17 (dart:io)",
     "content-type": "application/json; charset=utf-8",
@@ -26,29 +36,232 @@ HEADERS = {
     "host": "api.moguding.net:9000",
 }
 
+# 连接池默认参数，可通过 config.json 的 http 节点覆盖
+HTTP_POOL_DEFAULTS = {
+    "poolConnections": 4,  # 缓存的主机连接池数量
+    "poolMaxsize": 32,  # 每个主机最多保持的空闲连接数
+    "poolBlock": False,  # 连接数达到上限时是否阻塞等待
+    "keepAlive": True,  # 是否启用 HTTP/TCP keep-alive
+}
+
+
+def set_base_url(url: str):
+    """
+    修改接口地址，影响之后发出的所有请求。
+
+    Args:
+        url (str): 接口根地址，如 http://127.0.0.1:9000/，缺少的结尾斜杠会自动补全。
+    """
+    global BASE_URL
+    BASE_URL = url if url.endswith("/") else f"{url}/"
+
+
+class _PooledHTTPAdapter(HTTPAdapter):
+    """在默认适配器基础上按需开启 TCP keep-alive 探测的适配器"""
+
+    def __init__(self, keep_alive: bool = True, **kwargs):
+        self._keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._keep_alive:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
 
 class ApiService:
-    def __init__(self):
+    # 进程内所有 ApiService 实例（含子类）共享的连接池
+    _http_session: requests.Session | None = None
+    _http_session_lock = threading.Lock()
+    _http_pool_options: dict | None = None
+
+    def __init__(self, ctx: Optional[UserContext] = None):
+        """
+        Args:
+            ctx (Optional[UserContext]): 用户上下文，默认从 config.json、userInfo.json、
+                planInfo.json 加载并在登录、获取计划后回写文件。
+        """
+        self.ctx = ctx or UserContext.from_managers()
+
+    @classmethod
+    def configure_http_pool(cls, **options: Any):
+        """
+        设置连接池参数，已创建的连接池会被关闭并在下次请求时按新参数重建。
 
-        self.max_retries = 5  # 控制重新尝试的次数
+        Args:
+            **options: 支持 poolConnections、poolMaxsize、poolBlock、keepAlive，
+                未提供的参数依次取 config.json 的 http 节点和默认值。
+        """
+        with ApiService._http_session_lock:
+            ApiService._http_pool_options = {**(ApiService._http_pool_options or {}), **options}
+            ApiService._close_http_session_locked()
+
+    @classmethod
+    def get_http_session(cls) -> requests.Session:
+        """获取共享的 requests.Session，首次调用时按配置创建连接池"""
+        if ApiService._http_session is not None:
+            return ApiService._http_session
+        with ApiService._http_session_lock:
+            if ApiService._http_session is None:
+                options = {
+                    **HTTP_POOL_DEFAULTS,
+                    **(ConfigManager.get("http", default={}) or {}),
+                    **(ApiService._http_pool_options or {}),
+                }
+                adapter = _PooledHTTPAdapter(
+                    keep_alive=bool(options["keepAlive"]),
+                    pool_connections=int(options["poolConnections"]),
+                    pool_maxsize=int(options["poolMaxsize"]),
+                    pool_block=bool(options["poolBlock"]),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                if not options["keepAlive"]:
+                    session.headers["connection"] = "close"
+                ApiService._http_session = session
+                logger.info(f"已创建共享连接池: {options}")
+        return ApiService._http_session
+
+    @classmethod
+    def get_connection_stats(cls) -> Dict[str, int]:
+        """
+        统计共享连接池的使用情况。
+
+        Returns:
+            Dict[str, int]: requests 为发出的请求数，connections 为新建连接数，
+                reused 为复用已有连接的请求数（即节省的握手次数）。
+        """
+        stats = {"requests": 0, "connections": 0, "reused": 0}
+        session = ApiService._http_session
+        if session is None:
+            return stats
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+        stats["reused"] = max(stats["requests"] - stats["connections"], 0)
+        return stats
+
+    @classmethod
+    def close_http_session(cls):
+        """关闭共享连接池，释放所有保持的连接"""
+        with ApiService._http_session_lock:
+            ApiService._close_http_session_locked()
+
+    @classmethod
+    def _close_http_session_locked(cls):
+        if ApiService._http_session is not None:
+            ApiService._http_session.close()
+            ApiService._http_session = None
+
+    # ======================
+    # 请求发送
+    # ======================
+    def _send_request(self, url: str, headers: Dict[str, str],
+                      data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        通过共享连接池发送一次POST请求并解析响应。
+
+        Returns:
+            Dict[str, Any]: 成功或验证码校验失败（6111）时的响应数据；
+                Token失效时返回原始响应，由调用方决定是否重新登录。
+
+        Raises:
+            requests.RequestException: 网络或HTTP状态异常。
+            ValueError: 响应包含业务错误信息。
+        """
+        breaker = CircuitBreaker.get_default()
+        try:
+            response = self.get_http_session().post(f"{BASE_URL}{url}",
+                                                    headers=headers,
+                                                    json=data,
+                                                    timeout=10)
+            response.raise_for_status()
+            rsp = response.json()
+        except requests.RequestException as e:
+            breaker.record_error(e)
+            raise
+        # 能解析出响应即说明服务端可用，业务错误不计入熔断
+        breaker.record_success()
+
+        if rsp.get("code") == 200 and rsp.get("msg", "未知错误") == "302":
+            raise ValueError("打卡失败，触发行为验证码")
+
+        if rsp.get("code") == 200 or rsp.get("code") == 6111:
+            return rsp
+
+        if "token失效" in rsp.get("msg", "未知错误"):
+            return rsp
+
+        raise ValueError(rsp.get("msg", "未知错误"))
+
+    @staticmethod
+    def _is_token_expired(rsp: Dict[str, Any]) -> bool:
+        return (rsp.get("code") not in (200, 6111)
+                and "token失效" in rsp.get("msg", "未知错误"))
+
+    def _check_circuit(self):
+        """
+        发送请求前检查接口熔断。
+
+        Raises:
+            CircuitOpenError: 熔断打开时直接拒绝，并在用户上下文中记录，供汇总时区分因熔断跳过的用户。
+        """
+        try:
+            CircuitBreaker.get_default().before_request()
+        except CircuitOpenError:
+            self.ctx.circuit_rejected = True
+            raise
+
+    def _token_refreshed_since(self, stale_token: Optional[str]) -> bool:
+        """当前 token 与失效的 token 不同，说明其他请求已经重新登录"""
+        token = self.ctx.get_token()
+        if token and token != stale_token:
+            RetryPolicy.record("token_refresh_shared")
+            logger.info("Token已由同一用户的其他请求刷新，直接使用新 Token")
+            return True
+        return False
+
+    def _refresh_token(self, stale_token: Optional[str]) -> bool:
+        """
+        Token失效后重新登录。同一用户的多个请求同时发现失效时，只有第一个请求执行登录（含验证码），
+        其余请求等待锁后发现 token 已更换，直接复用结果。
+
+        Args:
+            stale_token (Optional[str]): 请求时使用的、已失效的 token。
+
+        Returns:
+            bool: 是否已获得新的 token。
+        """
+        with self.ctx.token_lock:
+            if self._token_refreshed_since(stale_token):
+                return True
+            RetryPolicy.record("token_refreshes")
+            logger.warning("Token失效，正在重新登录...")
+            return self.login()
 
     def _post_request(
             self,
             url: str,
             headers: Dict[str, str],
             data: Dict[str, Any],
-            retry_count: int = 0,
     ) -> Dict[str, Any]:
         """
         发送POST请求，并处理请求过程中可能发生的错误。
-        包括自动重试机制和Token失效处理。
+        网络错误、超时和 5xx/429 按 RetryPolicy 退避重试，Token失效时重新登录一次后重试；
+        接口熔断打开后立即失败，不再等待重试。
 
         Args:
             url (str): 请求的API地址（不包括BASE_URL部分）。
             headers (Dict[str, str]): 请求头信息，包括授权信息。
             data (Dict[str, Any]): POST请求的数据。
-            msg (str, optional): 如果请求失败，输出的错误信息前缀，默认为'请求失败'。
-            retry_count (int, optional): 当前请求的重试次数，默认为0。
 
         Returns:
             Dict[str, Any]: 如果请求成功，返回响应的JSON数据。
@@ -56,52 +269,236 @@ class ApiService:
         Raises:
             ValueError: 如果请求失败或响应包含错误信息，则抛出包含详细错误信息的异常。
         """
-        try:
-            response = requests.post(f"{BASE_URL}{url}",
-                                     headers=headers,
-                                     json=data,
-                                     timeout=10)
-            response.raise_for_status()
-            rsp = response.json()
+        call = RetryPolicy.start_call(self.ctx)
+        while True:
+            # 熔断打开时不再发送和重试，CircuitOpenError 直接抛给调用方
+            self._check_circuit()
+            try:
+                # 所有用户共享的限速预算，突发请求在这里排队
+                RateLimiter.get_default().acquire(url)
+                rsp = self._send_request(url, headers, data)
+                if not self._is_token_expired(rsp):
+                    return rsp
+
+                TokenStoreManager.mark_expired(self.ctx.phone, headers.get("authorization"))
+                if call.token_refreshed:
+                    raise ValueError(rsp.get("msg", "未知错误"))
+                call.token_refreshed = True
+                if not self._refresh_token(headers.get("authorization")):
+                    raise ValueError(rsp.get("msg", "未知错误"))
+                headers["authorization"] = self.ctx.get_token()
+                logger.info("已更新 Authorization Token，重试请求")
+
+            except (requests.RequestException, ValueError) as e:
+                if CircuitBreaker.get_default().is_open():
+                    continue
+                wait_time = call.next_delay(e)
+                logger.warning(
+                    f"{url} 请求失败（{e}），重试 {call.retries}/{call.policy.max_retries}，等待 {wait_time:.2f} 秒"
+                )
+                time.sleep(wait_time)
 
-            if rsp.get("code") == 200 and rsp.get("msg", "未知错误") == "302":
-                raise ValueError("打卡失败，触发行为验证码")
+    # ======================
+    # 请求数据构造（同步/异步客户端共用）
+    # ======================
+    @staticmethod
+    def _build_captcha_request(captcha_type: str) -> Dict[str, Any]:
+        return {
+            "clientUid": str(uuid.uuid4()).replace("-", ""),  # 生成唯一客户端标识
+            "captchaType": captcha_type,  # 验证码类型
+        }
 
-            if rsp.get("code") == 200 or rsp.get("code") == 6111:
-                return rsp
+    @staticmethod
+    def _build_captcha_check(captcha_type: str, captcha_data: Dict[str, Any],
+                             solution: str) -> Dict[str, Any]:
+        return {
+            "pointJson": aes_encrypt(solution, captcha_data["secretKey"],
+                                     "b64"),  # 加密的点位数据
+            "token": captcha_data["token"],  # 验证码令牌
+            "captchaType": captcha_type,
+        }
 
-            if ("token失效" in rsp.get("msg", "未知错误")
-                    and retry_count < self.max_retries):
-                wait_time = 1 * (2 ** retry_count)
-                time.sleep(wait_time)
-                logger.warning("Token失效，正在重新登录...")
-                if self.login():
-                    new_token = UserInfoManager.get_token()
-                    headers["authorization"] = new_token
-                    logger.info("已更新 Authorization Token，重试请求")
-                    return self._post_request(url, headers, data, retry_count + 1)
-            else:
-                raise ValueError(rsp.get("msg", "未知错误"))
-
-        except (requests.RequestException, ValueError) as e:
-            if re.search(r"[\u4e00-\u9fff]",
-                         str(e)) or retry_count >= self.max_retries:
-                raise ValueError(f"{str(e)}")
-
-            wait_time = 1 * (2 ** retry_count)
-            logger.warning(
-                f"重试 {retry_count + 1}/{self.max_retries}，等待 {wait_time:.2f} 秒"
-            )
-            time.sleep(wait_time)
-
-        return self._post_request(url, headers, data, retry_count + 1)
-
-    def pass_blockPuzzle_captcha(self, max_attempts: int = 5) -> str:
+    @staticmethod
+    def _encrypt_captcha_result(captcha_data: Dict[str, Any],
+                                solution: str) -> str:
+        return aes_encrypt(
+            captcha_data["token"] + "---" + solution,
+            captcha_data["secretKey"],
+            "b64",
+        )
+
+    def _build_login_request(self, captcha: str) -> Dict[str, Any]:
+        return {
+            "phone": aes_encrypt(self.ctx.get_config("user", "phone")),
+            "password": aes_encrypt(self.ctx.get_config("user", "password")),
+            "captcha": captcha,
+            "loginType": "android",
+            "uuid": str(uuid.uuid4()).replace("-", ""),
+            "device": "android",
+            "version": "5.16.0",
+            "t": aes_encrypt(str(int(time.time() * 1000))),
+        }
+
+    def _build_plan_request(self) -> tuple[Dict[str, str], Dict[str, Any]]:
+        data = {
+            "pageSize": 999999,
+            "t": aes_encrypt(str(int(time.time() * 1000)))
+        }
+        headers = self._get_authenticated_headers(sign_data=[
+            self.ctx.get_userid(),
+            self.ctx.get_user("roleKey"),
+        ])
+        return headers, data
+
+    def _build_checkin_info_request(
+            self) -> tuple[str, Dict[str, str], Dict[str, Any]]:
+        url = "attendence/clock/v2/listSynchro"
+        if self.ctx.get_user("userType") == "teacher":
+            url = "attendence/clock/teacher/v1/listSynchro"
+        headers = self._get_authenticated_headers()
+        data = {
+            **get_current_month_info(),
+            "t":
+                aes_encrypt(str(int(time.time() * 1000))),
+        }
+        return url, headers, data
+
+    def _build_clock_in_request(
+            self, checkin_info: Dict[str, Any]
+    ) -> tuple[str, Dict[str, str], Dict[str, Any]]:
+        url = "attendence/clock/teacher/v2/save"
+        sign_data = None
+        planId = self.ctx.get_plan_id()
+
+        if self.ctx.get_user("userType") != "teacher":
+            url = "attendence/clock/v5/save"
+            sign_data = [
+                self.ctx.get_config("device"),
+                checkin_info.get("type"),
+                planId,
+                self.ctx.get_userid(),
+                self.ctx.get_config("clockIn", "location", "address")
+            ]
+
+        data = {
+            "distance": None,
+            "content": None,
+            "lastAddress": None,
+            "lastDetailAddress": checkin_info.get("lastDetailAddress"),
+            "attendanceId": None,
+            "country": "中国",
+            "createBy": None,
+            "createTime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            "description": checkin_info.get("description", None),
+            "device": self.ctx.get_config("device"),
+            "images": None,
+            "isDeleted": None,
+            "isReplace": None,
+            "modifiedBy": None,
+            "modifiedTime": None,
+            "schoolId": None,
+            "state": "NORMAL",
+            "teacherId": None,
+            "teacherNumber": None,
+            "type": checkin_info.get("type"),
+            "stuId": None,
+            "planId": planId,
+            "attendanceType": None,
+            "username": None,
+            "attachments": checkin_info.get("attachments", None),
+            "userId": self.ctx.get_userid(),
+            "isSYN": None,
+            "studentId": None,
+            "applyState": None,
+            "studentNumber": None,
+            "memberNumber": None,
+            "headImg": None,
+            "attendenceTime": None,
+            "depName": None,
+            "majorName": None,
+            "className": None,
+            "logDtoList": None,
+            "isBeyondFence": None,
+            "practiceAddress": None,
+            "tpJobId": None,
+            "t": aes_encrypt(str(int(time.time() * 1000))),
+        }
+
+        data.update(self.ctx.get_config("clockIn", "location"))
+
+        headers = self._get_authenticated_headers(sign_data)
+        return url, headers, data
+
+    @staticmethod
+    def _parse_plan_info(rsp: Dict[str, Any]) -> Optional[dict]:
+        # 获取实习计划列表
+        data_list = rsp.get("data")
+        if not data_list or not isinstance(data_list, list):
+            logger.warning("未获取到实习计划数据，rsp 内容: %s", rsp)
+            return None
+
+        plan_info = data_list[0]
+        if not plan_info:
+            logger.warning("实习计划数据为空")
+            return None
+        return plan_info
+
+    @staticmethod
+    def _parse_checkin_info(rsp: Dict[str, Any]) -> Dict[str, Any]:
+        # 每月第一天的第一次打卡返回的是空，所以特殊处理返回空字典
+        return rsp.get("data", [{}])[0] if rsp.get("data") else {}
+
+    # ======================
+    # 业务接口
+    # ======================
+    def _captcha_options(self, max_attempts: Optional[int] = None) -> tuple[int, tuple[float, float], bool]:
         """
-        通过行为验证码（验证码类型为blockPuzzle）。
+        读取验证码重试参数（config.json 的 captcha 节点）。
+
+        Returns:
+            tuple[int, tuple[float, float], bool]: 最大尝试次数、失败后随机等待的秒数范围、是否预取下一张验证码
+        """
+        if max_attempts is None:
+            max_attempts = self.ctx.get_config("captcha", "maxAttempts", default=5)
+        low, high = self.ctx.get_config("captcha", "retryDelay", default=[1, 3])
+        prefetch = self.ctx.get_config("captcha", "prefetch", default=True)
+        return max_attempts, (low, high), prefetch
+
+    def _fetch_and_solve_captcha(self, captcha_type: str, url: str,
+                                 headers: Dict[str, str]) -> tuple[Dict[str, Any], str]:
+        """获取一张验证码并识别，返回验证码数据和识别结果"""
+        captcha_data = self._post_request(url, headers,
+                                          self._build_captcha_request(captcha_type))["data"]
+        return captcha_data, self._recognize_captcha(captcha_type, captcha_data)
+
+    @staticmethod
+    def _recognize_captcha(captcha_type: str, captcha_data: Dict[str, Any]) -> str:
+        """识别验证码，已启动 CaptchaService 时交给工作进程，否则在当前线程识别"""
+        service = CaptchaService.get_default()
+        if service is not None:
+            return service.solve(captcha_type, captcha_data)
+        # 延迟导入：cv2、numpy、onnxruntime 加载耗时较长，复用 token 的运行不需要识别验证码
+        from util.CaptchaUtils import recognize_blockPuzzle_captcha, recognize_clickWord_captcha
+        if captcha_type == "blockPuzzle":
+            return recognize_blockPuzzle_captcha(captcha_data["jigsawImageBase64"],
+                                                 captcha_data["originalImageBase64"])
+        return recognize_clickWord_captcha(captcha_data["originalImageBase64"],
+                                           captcha_data["wordList"])
+
+    def _solve_captcha(self, captcha_type: str, get_url: str, check_url: str,
+                       get_headers: Callable[[], Dict[str, str]],
+                       max_attempts: Optional[int] = None) -> str:
+        """
+        流水线方式通过验证码：出现过一次校验失败（6111）后，之后每次校验当前结果的同时在后台获取并识别下一张验证码，
+        再次失败时等待随机时间即可直接使用已识别好的下一张，无需再串行获取和识别。
+        首次校验不预取，多数一次通过的登录不会多获取、识别一张验证码。
 
         Args:
-            max_attempts (Optional[int]): 最大尝试次数，默认为5次。
+            captcha_type (str): 验证码类型，blockPuzzle 或 clickWord。
+            get_url (str): 获取验证码的接口。
+            check_url (str): 校验验证码的接口。
+            get_headers (Callable[[], Dict[str, str]]): 生成请求头的函数。
+            max_attempts (Optional[int]): 最大尝试次数，默认读取 captcha.maxAttempts。
 
         Returns:
             str: 验证参数。
@@ -109,108 +506,78 @@ class ApiService:
         Raises:
             Exception: 当达到最大尝试次数时抛出异常。
         """
-        attempts = 0
-        while attempts < max_attempts:
-            captcha_url = "session/captcha/v1/get"
-            request_data = {
-                "clientUid": str(uuid.uuid4()).replace("-", ""),
-                "captchaType": "blockPuzzle",
-            }
-            captcha_info = self._post_request(
-                captcha_url,
-                HEADERS,
-                request_data,
-            )
-            slider_data = recognize_blockPuzzle_captcha(
-                captcha_info["data"]["jigsawImageBase64"],
-                captcha_info["data"]["originalImageBase64"],
-            )
-            check_slider_url = "session/captcha/v1/check"
-            check_slider_data = {
-                "pointJson":
-                    aes_encrypt(slider_data, captcha_info["data"]["secretKey"],
-                                "b64"),
-                "token":
-                    captcha_info["data"]["token"],
-                "captchaType":
-                    "blockPuzzle",
-            }
-            check_result = self._post_request(
-                check_slider_url,
-                HEADERS,
-                check_slider_data,
-            )
-            if check_result.get("code") != 6111:
-                return aes_encrypt(
-                    captcha_info["data"]["token"] + "---" + slider_data,
-                    captcha_info["data"]["secretKey"],
-                    "b64",
-                )
-            attempts += 1
-            time.sleep(random.uniform(1, 3))
-        raise Exception("通过滑块验证码失败")
-
-    def solve_click_word_captcha(self, max_retries: int = 5) -> str:
-        retry_count = 0
-        while retry_count < max_retries:
-
-            # 获取验证码的接口地址
-            captcha_endpoint = "/attendence/clock/v1/get"
-            captcha_request_payload = {
-                "clientUid": str(uuid.uuid4()).replace("-", ""),  # 生成唯一客户端标识
-                "captchaType": "clickWord",  # 验证码类型
-            }
-
-            # 向服务器请求验证码信息
-            captcha_response = self._post_request(
-                captcha_endpoint,
-                self._get_authenticated_headers(),
-                captcha_request_payload,
-            )
-
-            # 解析验证码图片数据
-            captcha_solution = recognize_clickWord_captcha(
-                captcha_response["data"]["originalImageBase64"],
-                captcha_response["data"]["wordList"],
-            )
-
-            # 验证验证码的接口地址
-            verification_endpoint = "/attendence/clock/v1/check"
-            verification_payload = {
-                "pointJson":
-                    aes_encrypt(captcha_solution,
-                                captcha_response["data"]["secretKey"],
-                                "b64"),  # 加密的点位数据
-                "token":
-                    captcha_response["data"]["token"],  # 验证码令牌
-                "captchaType":
-                    "clickWord",  # 验证码类型
-            }
-
-            # 验证用户点击结果
-            verification_response = self._post_request(
-                verification_endpoint,
-                self._get_authenticated_headers(),
-                verification_payload,
-            )
-
-            # 如果验证码验证成功，则返回加密结果
-            if verification_response.get("code") != 6111:  # 6111 表示验证码验证失败
-                encrypted_result = aes_encrypt(
-                    captcha_response["data"]["token"] + "---" +
-                    captcha_solution,
-                    captcha_response["data"]["secretKey"],
-                    "b64",
+        max_attempts, retry_delay, prefetch = self._captcha_options(max_attempts)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="captcha-prefetch")
+        try:
+            pending = executor.submit(self._fetch_and_solve_captcha, captcha_type, get_url, get_headers())
+            for attempt in range(max_attempts):
+                captcha_data, solution = pending.result()
+                has_next = attempt + 1 < max_attempts
+                # 第二次尝试起（已失败过一次）才预取
+                prefetched = prefetch and attempt > 0 and has_next
+                if prefetched:
+                    pending = executor.submit(self._fetch_and_solve_captcha, captcha_type, get_url, get_headers())
+
+                check_result = self._post_request(
+                    check_url,
+                    get_headers(),
+                    self._build_captcha_check(captcha_type, captcha_data, solution),
                 )
-                return encrypted_result
+                if check_result.get("code") != 6111:  # 6111 表示验证码验证失败
+                    return self._encrypt_captcha_result(captcha_data, solution)
+                # 识别结果错误，删除缓存，同一张验证码再次出现时重新识别
+                CaptchaCacheManager.invalidate(captcha_type, captcha_data)
+
+                if has_next:
+                    logger.info(f"{captcha_type} 验证码校验失败，重试 {attempt + 1}/{max_attempts - 1}")
+                    # 随机等待以模拟正常用户行为
+                    time.sleep(random.uniform(*retry_delay))
+                    if not prefetched:
+                        pending = executor.submit(self._fetch_and_solve_captcha, captcha_type, get_url,
+                                                  get_headers())
+        finally:
+            # 不等待仍在进行的预取，直接返回
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        raise Exception("通过滑块验证码失败" if captcha_type == "blockPuzzle" else "通过点选验证码失败")
+
+    def pass_blockPuzzle_captcha(self, max_attempts: Optional[int] = None) -> str:
+        """
+        通过行为验证码（验证码类型为blockPuzzle）。
+
+        Args:
+            max_attempts (Optional[int]): 最大尝试次数，默认读取 captcha.maxAttempts（5次）。
+
+        Returns:
+            str: 验证参数。
+
+        Raises:
+            Exception: 当达到最大尝试次数时抛出异常。
+        """
+        return self._solve_captcha("blockPuzzle",
+                                   "session/captcha/v1/get",
+                                   "session/captcha/v1/check",
+                                   lambda: dict(HEADERS),
+                                   max_attempts)
+
+    def solve_click_word_captcha(self, max_retries: Optional[int] = None) -> str:
+        """
+        通过打卡时的点选验证码（验证码类型为clickWord）。
 
-            # 验证失败，增加重试次数
-            retry_count += 1
-            # 随机等待以模拟正常用户行为
-            time.sleep(random.uniform(1, 3))
+        Args:
+            max_retries (Optional[int]): 最大尝试次数，默认读取 captcha.maxAttempts（5次）。
 
-        # 超过最大重试次数，抛出异常
-        raise Exception("通过点选验证码失败")
+        Returns:
+            str: 验证参数。
+
+        Raises:
+            Exception: 当达到最大尝试次数时抛出异常。
+        """
+        return self._solve_captcha("clickWord",
+                                   "/attendence/clock/v1/get",
+                                   "/attendence/clock/v1/check",
+                                   self._get_authenticated_headers,
+                                   max_retries)
 
     def _get_authenticated_headers(
             self,
@@ -219,7 +586,7 @@ class ApiService:
         """
         生成带有认证信息的请求头。
 
-        该方法会从配置管理器中获取用户的Token、用户ID及角色Key，并生成包含这些信息的请求头。
+        该方法会获取用户的Token、用户ID及角色Key，并生成包含这些信息的请求头。
         如果提供了sign_data，还会生成并添加签名信息。
 
         Args:
@@ -230,17 +597,38 @@ class ApiService:
         """
         headers = {
             **HEADERS,
-            "authorization": UserInfoManager.get_token(),
-            "userid": UserInfoManager.get_userid(),
-            "rolekey": UserInfoManager.get("roleKey"),
+            "authorization": self.ctx.get_token(),
+            "userid": self.ctx.get_userid(),
+            "rolekey": self.ctx.get_user("roleKey"),
         }
         if sign_data:
             headers["sign"] = create_sign(*sign_data)
         return headers
 
+    def restore_token(self, allow_expiring: bool = False) -> bool:
+        """
+        从 token 存储恢复当前手机号的登录信息，成功时无需再走验证码登录。
+
+        Args:
+            allow_expiring (bool): 是否接受即将过期（已使用超过估计有效期 80%）的 token，
+                用于提前刷新失败时的降级。
+
+        Returns:
+            bool: 已将可用的 token 写入用户上下文返回 True，否则返回 False
+        """
+        entry = TokenStoreManager.get(self.ctx.phone)
+        if entry is None:
+            return False
+        if not allow_expiring and TokenStoreManager.needs_refresh(entry):
+            logger.info("已保存的 token 即将过期，提前重新登录")
+            return False
+        if self.ctx.get_token() != entry["userInfo"]["token"]:
+            self.ctx.set_userinfo(entry["userInfo"])
+        return True
+
     def login(self) -> bool:
         """
-        执行用户登录操作，成功后将 user_info 写入 UserInfoManager 管理的缓存和文件。
+        执行用户登录操作，成功后将 user_info 写入用户上下文。
 
         Returns:
             bool: 登录并写入成功返回 True，否则返回 False
@@ -249,16 +637,7 @@ class ApiService:
 
         try:
             url = "session/user/v6/login"
-            data = {
-                "phone": aes_encrypt(ConfigManager.get("user", "phone")),
-                "password": aes_encrypt(ConfigManager.get("user", "password")),
-                "captcha": self.pass_blockPuzzle_captcha(),
-                "loginType": "android",
-                "uuid": str(uuid.uuid4()).replace("-", ""),
-                "device": "android",
-                "version": "5.16.0",
-                "t": aes_encrypt(str(int(time.time() * 1000))),
-            }
+            data = self._build_login_request(self.pass_blockPuzzle_captcha())
 
             logger.info(f"登录数据：{data}")
             response = self._post_request(url, HEADERS, data)
@@ -271,10 +650,11 @@ class ApiService:
             user_info = json.loads(aes_decrypt(encrypted_data))
             logger.info(f"登录结果：{user_info}")
 
-            # 使用 UserInfoManager 写入缓存和文件
-            UserInfoManager.set_userinfo(user_info)
+            # 写入用户上下文（单用户模式下同时写入 userInfo.json），并保存到 token 存储供之后的运行复用
+            self.ctx.set_userinfo(user_info)
+            TokenStoreManager.save(self.ctx.phone, user_info)
 
-            logger.info("用户信息已保存到 UserInfoManager 管理的文件和缓存中")
+            logger.info("用户信息已保存到用户上下文")
             return True
 
         except Exception as e:
@@ -283,40 +663,24 @@ class ApiService:
 
     def fetch_plan(self) -> bool:
         """
-        获取当前用户的实习计划并更新 PlanInfoManager 中的 planInfo。
+        获取当前用户的实习计划并更新用户上下文中的 planInfo。
 
         返回:
             bool: 成功获取并更新 planInfo 返回 True，否则返回 False
         """
         try:
-            # 生成请求
-            url = "practice/plan/v3/getPlanByStu"
-            data = {
-                "pageSize": 999999,
-                "t": aes_encrypt(str(int(time.time() * 1000)))
-            }
-            headers = self._get_authenticated_headers(sign_data=[
-                UserInfoManager.get_userid(),
-                UserInfoManager.get("roleKey"),
-            ])
-
             # 发送请求
+            url = "practice/plan/v3/getPlanByStu"
+            headers, data = self._build_plan_request()
             rsp = self._post_request(url, headers, data)
 
-            # 获取实习计划列表
-            data_list = rsp.get("data")
-            if not data_list or not isinstance(data_list, list):
-                logger.warning("未获取到实习计划数据，rsp 内容: %s", rsp)
-                return False
-
-            plan_info = data_list[0]
+            plan_info = self._parse_plan_info(rsp)
             if not plan_info:
-                logger.warning("实习计划数据为空")
                 return False
             logger.info("获取到的实习计划数据: %s", plan_info)
-            # 更新缓存和文件
-            PlanInfoManager.set_planinfo(plan_info)
-            logger.info("实习计划信息已更新到 PlanInfoManager")
+            # 更新用户上下文（单用户模式下同时写入 planInfo.json）
+            self.ctx.set_planinfo(plan_info)
+            logger.info("实习计划信息已更新到用户上下文")
             return True
 
         except Exception as e:
@@ -335,18 +699,9 @@ class ApiService:
         Raises:
             ValueError: 如果获取打卡信息失败，抛出包含详细错误信息的异常。
         """
-        url = "attendence/clock/v2/listSynchro"
-        if UserInfoManager.get("userType") == "teacher":
-            url = "attendence/clock/teacher/v1/listSynchro"
-        headers = self._get_authenticated_headers()
-        data = {
-            **get_current_month_info(),
-            "t":
-                aes_encrypt(str(int(time.time() * 1000))),
-        }
+        url, headers, data = self._build_checkin_info_request()
         rsp = self._post_request(url, headers, data)
-        # 每月第一天的第一次打卡返回的是空，所以特殊处理返回空字典
-        return rsp.get("data", [{}])[0] if rsp.get("data") else {}
+        return self._parse_checkin_info(rsp)
 
     def submit_clock_in(self, checkin_info: Dict[str, Any]) -> dict[str, dict[str, Any] | bool] | None:
         """
@@ -360,69 +715,9 @@ class ApiService:
         Raises:
             ValueError: 如果打卡提交失败，抛出包含详细错误信息的异常。
         """
-        url = "attendence/clock/teacher/v2/save"
-        sign_data = None
-        planId = PlanInfoManager.get_plan_id()
-
-        if UserInfoManager.get("userType") != "teacher":
-            url = "attendence/clock/v5/save"
-            sign_data = [
-                ConfigManager.get("device"),
-                checkin_info.get("type"),
-                planId,
-                UserInfoManager.get_userid(),
-                ConfigManager.get("clockIn", "location", "address")
-            ]
-
         logger.info(f'打卡类型：{checkin_info.get("type")}')
 
-        data = {
-            "distance": None,
-            "content": None,
-            "lastAddress": None,
-            "lastDetailAddress": checkin_info.get("lastDetailAddress"),
-            "attendanceId": None,
-            "country": "中国",
-            "createBy": None,
-            "createTime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-            "description": checkin_info.get("description", None),
-            "device": ConfigManager.get("device"),
-            "images": None,
-            "isDeleted": None,
-            "isReplace": None,
-            "modifiedBy": None,
-            "modifiedTime": None,
-            "schoolId": None,
-            "state": "NORMAL",
-            "teacherId": None,
-            "teacherNumber": None,
-            "type": checkin_info.get("type"),
-            "stuId": None,
-            "planId": planId,
-            "attendanceType": None,
-            "username": None,
-            "attachments": checkin_info.get("attachments", None),
-            "userId": UserInfoManager.get_userid(),
-            "isSYN": None,
-            "studentId": None,
-            "applyState": None,
-            "studentNumber": None,
-            "memberNumber": None,
-            "headImg": None,
-            "attendenceTime": None,
-            "depName": None,
-            "majorName": None,
-            "className": None,
-            "logDtoList": None,
-            "isBeyondFence": None,
-            "practiceAddress": None,
-            "tpJobId": None,
-            "t": aes_encrypt(str(int(time.time() * 1000))),
-        }
-
-        data.update(ConfigManager.get("clockIn", "location"))
-
-        headers = self._get_authenticated_headers(sign_data)
+        url, headers, data = self._build_clock_in_request(checkin_info)
 
         responses = self._post_request(url, headers, data)
         if responses.get("msg") == "302":
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from manager.CaptchaCacheManager import CaptchaCacheManager
+from manager.TokenStoreManager import TokenStoreManager
+from util.ApiService import ApiService, HEADERS
+from util.CaptchaService import CaptchaService
+from util.CircuitBreaker import CircuitBreaker
+from util.CryptoUtils import aes_decrypt
+from util.RateLimiter import RateLimiter
+from util.RetryPolicy import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncApiService(ApiService):
+    """
+    ApiService 的 asyncio 版本，用于在同一事件循环中并发处理多个用户。
+
+    - 用户状态来自传入的 UserContext，不同用户的实例互不干扰
+    - 网络请求复用 ApiService 的共享连接池，在线程中执行以免阻塞事件循环
+    - 重试等待使用 asyncio.sleep，验证码识别在线程中执行
+    """
+
+    # ======================
+    # 请求发送
+    # ======================
+    async def _refresh_token(self, stale_token: Optional[str]) -> bool:
+        """ApiService._refresh_token 的异步版本，等待其他请求登录时只让出事件循环"""
+        if self.ctx.async_token_lock is None:
+            self.ctx.async_token_lock = asyncio.Lock()
+        async with self.ctx.async_token_lock:
+            if self._token_refreshed_since(stale_token):
+                return True
+            RetryPolicy.record("token_refreshes")
+            logger.warning("Token失效，正在重新登录...")
+            return await self.login()
+
+    async def _post_request(
+            self,
+            url: str,
+            headers: Dict[str, str],
+            data: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        异步发送POST请求，重试与Token失效处理逻辑与 ApiService._post_request 一致。
+
+        Raises:
+            ValueError: 如果请求失败或响应包含错误信息，则抛出包含详细错误信息的异常。
+        """
+        call = RetryPolicy.start_call(self.ctx)
+        while True:
+            self._check_circuit()
+            try:
+                # 与同步请求共用限速预算，排队时只让出事件循环，不占用线程
+                await RateLimiter.get_default().acquire_async(url)
+                rsp = await asyncio.to_thread(self._send_request, url, headers, data)
+                if not self._is_token_expired(rsp):
+                    return rsp
+
+                TokenStoreManager.mark_expired(self.ctx.phone, headers.get("authorization"))
+                if call.token_refreshed:
+                    raise ValueError(rsp.get("msg", "未知错误"))
+                call.token_refreshed = True
+                if not await self._refresh_token(headers.get("authorization")):
+                    raise ValueError(rsp.get("msg", "未知错误"))
+                headers["authorization"] = self.ctx.get_token()
+                logger.info("已更新 Authorization Token，重试请求")
+
+            except (requests.RequestException, ValueError) as e:
+                if CircuitBreaker.get_default().is_open():
+                    continue
+                wait_time = call.next_delay(e)
+                logger.warning(
+                    f"{url} 请求失败（{e}），重试 {call.retries}/{call.policy.max_retries}，等待 {wait_time:.2f} 秒"
+                )
+                await asyncio.sleep(wait_time)
+
+    # ======================
+    # 业务接口
+    # ======================
+    async def _fetch_and_solve_captcha_async(self, captcha_type: str, url: str,
+                                             headers: Dict[str, str]) -> tuple[Dict[str, Any], str]:
+        """异步获取一张验证码，在 CaptchaService 工作进程或线程中识别"""
+        captcha_data = (await self._post_request(url, headers,
+                                                 self._build_captcha_request(captcha_type)))["data"]
+        service = CaptchaService.get_default()
+        if service is not None:
+            return captcha_data, await service.solve_async(captcha_type, captcha_data)
+        return captcha_data, await asyncio.to_thread(self._recognize_captcha, captcha_type, captcha_data)
+
+    async def _solve_captcha_async(self, captcha_type: str, get_url: str, check_url: str,
+                                   get_headers: Callable[[], Dict[str, str]],
+                                   max_attempts: Optional[int] = None) -> str:
+        """
+        ApiService._solve_captcha 的异步版本：失败过一次后，校验当前结果的同时用后台任务预取并识别下一张验证码。
+
+        Raises:
+            Exception: 当达到最大尝试次数时抛出异常。
+        """
+        max_attempts, retry_delay, prefetch = self._captcha_options(max_attempts)
+        pending = asyncio.create_task(
+            self._fetch_and_solve_captcha_async(captcha_type, get_url, get_headers()))
+        try:
+            for attempt in range(max_attempts):
+                captcha_data, solution = await pending
+                has_next = attempt + 1 < max_attempts
+                prefetched = prefetch and attempt > 0 and has_next
+                if prefetched:
+                    pending = asyncio.create_task(
+                        self._fetch_and_solve_captcha_async(captcha_type, get_url, get_headers()))
+
+                check_result = await self._post_request(
+                    check_url,
+                    get_headers(),
+                    self._build_captcha_check(captcha_type, captcha_data, solution),
+                )
+                if check_result.get("code") != 6111:  # 6111 表示验证码验证失败
+                    return self._encrypt_captcha_result(captcha_data, solution)
+                # 识别结果错误，删除缓存，同一张验证码再次出现时重新识别
+                CaptchaCacheManager.invalidate(captcha_type, captcha_data)
+
+                if has_next:
+                    logger.info(f"{captcha_type} 验证码校验失败，重试 {attempt + 1}/{max_attempts - 1}")
+                    await asyncio.sleep(random.uniform(*retry_delay))
+                    if not prefetched:
+                        pending = asyncio.create_task(
+                            self._fetch_and_solve_captcha_async(captcha_type, get_url, get_headers()))
+        finally:
+            if not pending.done():
+                pending.cancel()
+            elif not pending.cancelled():
+                pending.exception()  # 取出预取任务的异常，避免未处理异常警告
+
+        raise Exception("通过滑块验证码失败" if captcha_type == "blockPuzzle" else "通过点选验证码失败")
+
+    async def pass_blockPuzzle_captcha(self, max_attempts: Optional[int] = None) -> str:
+        """
+        异步通过行为验证码（blockPuzzle）。
+
+        Raises:
+            Exception: 当达到最大尝试次数时抛出异常。
+        """
+        return await self._solve_captcha_async("blockPuzzle",
+                                               "session/captcha/v1/get",
+                                               "session/captcha/v1/check",
+                                               lambda: dict(HEADERS),
+                                               max_attempts)
+
+    async def solve_click_word_captcha(self, max_retries: Optional[int] = None) -> str:
+        """
+        异步通过点选验证码（clickWord）。
+
+        Raises:
+            Exception: 当达到最大尝试次数时抛出异常。
+        """
+        return await self._solve_captcha_async("clickWord",
+                                               "/attendence/clock/v1/get",
+                                               "/attendence/clock/v1/check",
+                                               self._get_authenticated_headers,
+                                               max_retries)
+
+    async def login(self) -> bool:
+        """
+        异步登录，成功后将 user_info 写入用户上下文。
+
+        Returns:
+            bool: 登录成功返回 True，否则返回 False
+        """
+        logger.info("执行登录")
+
+        try:
+            data = self._build_login_request(await self.pass_blockPuzzle_captcha())
+            response = await self._post_request("session/user/v6/login", HEADERS, data)
+
+            encrypted_data = response.get("data")
+            if not encrypted_data:
+                logger.error("登录失败：返回数据为空")
+                return False
+
+            user_info = json.loads(aes_decrypt(encrypted_data))
+            self.ctx.set_userinfo(user_info)
+            TokenStoreManager.save(self.ctx.phone, user_info)
+            return True
+
+        except Exception as e:
+            logger.exception(f"登录过程发生异常：{e}")
+            return False
+
+    async def fetch_plan(self) -> bool:
+        """
+        异步获取实习计划并写入用户上下文。
+
+        Returns:
+            bool: 成功获取返回 True，否则返回 False
+        """
+        try:
+            headers, data = self._build_plan_request()
+            rsp = await self._post_request("practice/plan/v3/getPlanByStu", headers, data)
+
+            plan_info = self._parse_plan_info(rsp)
+            if not plan_info:
+                return False
+            self.ctx.set_planinfo(plan_info)
+            return True
+
+        except Exception as e:
+            logger.exception("获取实习计划过程中发生异常: %s", e)
+            return False
+
+    async def get_checkin_info(self) -> Dict[str, Any]:
+        """
+        异步获取用户当月最近一次打卡信息。
+
+        Raises:
+            ValueError: 如果获取打卡信息失败，抛出包含详细错误信息的异常。
+        """
+        url, headers, data = self._build_checkin_info_request()
+        rsp = await self._post_request(url, headers, data)
+        return self._parse_checkin_info(rsp)
+
+    async def submit_clock_in(self, checkin_info: Dict[str, Any]) -> dict[str, dict[str, Any] | bool] | None:
+        """
+        异步提交打卡信息。
+
+        Raises:
+            ValueError: 如果打卡提交失败，抛出包含详细错误信息的异常。
+        """
+        logger.info(f'打卡类型：{checkin_info.get("type")}')
+
+        url, headers, data = self._build_clock_in_request(checkin_info)
+
+        responses = await self._post_request(url, headers, data)
+        if responses.get("msg") == "302":
+            logger.info("检测到行为验证码，正在通过···")
+            data["captcha"] = await self.solve_click_word_captcha()
+            rsp = await self._post_request(url, headers, data)
+            logger.info(f"打卡结果: {rsp}")
+            return {"result": True, "data": rsp}
+        else:
+            return {"result": True, "data": responses}
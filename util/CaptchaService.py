@@ -0,0 +1,161 @@
+import base64
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker(warm_up: bool):
+    """工作进程初始化：预先加载 ONNX 模型，之后的识别请求复用同一组会话"""
+    # 识别缓存只在调用方进程中维护（校验失败时才能删除错误的结果），工作进程不缓存
+    from manager.CaptchaCacheManager import CaptchaCacheManager
+    CaptchaCacheManager.configure(size=0, persist=False)
+    if warm_up:
+        from util.CaptchaUtils import warm_up_onnx_sessions
+        warm_up_onnx_sessions()
+
+
+def _ping() -> int:
+    """空任务，用于确认工作进程已完成初始化"""
+    return os.getpid()
+
+
+def _recognize(captcha_type: str, payload: Dict[str, Any]) -> Any:
+    """
+    在工作进程中识别一张验证码，返回可缓存的中间结果：blockPuzzle 为滑动距离，clickWord 为文字的类别id及其文本框
+    """
+    from util.CaptchaUtils import match_blockPuzzle, recognize_glyphs
+    if captcha_type == "blockPuzzle":
+        return match_blockPuzzle(base64.b64decode(payload["jigsawImageBase64"]),
+                                 base64.b64decode(payload["originalImageBase64"]))
+    return recognize_glyphs(base64.b64decode(payload["originalImageBase64"]))
+
+
+def _solution(captcha_type: str, recognition: Any, captcha_data: Dict[str, Any]) -> str:
+    """由识别的中间结果构造验证参数"""
+    from util.CaptchaUtils import blockPuzzle_solution, clickWord_solution
+    if captcha_type == "blockPuzzle":
+        return blockPuzzle_solution(recognition)
+    return clickWord_solution(recognition, captcha_data["wordList"])
+
+
+class CaptchaService:
+    """
+    基于进程池的验证码识别服务：
+    - 每个工作进程启动时加载 ONNX 模型并一直保持，识别（OpenCV、ONNX 推理）不再占用调用方进程的 CPU 和 GIL
+    - 接收验证码接口返回的 base64 数据，返回与 recognize_* 相同的 JSON 结果
+    - 识别缓存（CaptchaCacheManager）只在调用方进程中查询和保存，工作进程只做识别，
+      校验失败时调用方删除的就是实际提供结果的缓存
+    - 通过 CaptchaService.start() 启用进程内共享的默认实例后，ApiService/AsyncApiService 会自动把识别交给它
+    """
+    _default: "CaptchaService | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, workers: Optional[int] = None, warm_up: bool = True):
+        """
+        Args:
+            workers (Optional[int]): 工作进程数，默认为 CPU 核数。
+            warm_up (bool): 工作进程启动时是否预加载点选验证码模型。
+        """
+        # 进程池只在启用服务时才需要，延迟导入以免拖慢不识别验证码的启动
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.workers = workers or os.cpu_count() or 1
+        # 使用 spawn 启动，避免在已有线程（连接池、事件循环）的进程中 fork
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker,
+                                             initargs=(warm_up,))
+        logger.info(f"验证码识别进程池已启动，工作进程数: {self.workers}")
+
+    def submit(self, captcha_type: str, captcha_data: Dict[str, Any]) -> Future:
+        """
+        提交一张验证码。
+
+        Args:
+            captcha_type (str): 验证码类型，blockPuzzle 或 clickWord。
+            captcha_data (Dict[str, Any]): 验证码接口返回的 data 字段。
+
+        Returns:
+            Future: 结果为 recognize_* 返回的 JSON 字符串。
+        """
+        from manager.CaptchaCacheManager import CaptchaCacheManager
+
+        result: Future = Future()
+        cache_key = CaptchaCacheManager.key_for(captcha_type, captcha_data)
+        cached = CaptchaCacheManager.get(cache_key)
+        if cached is not None:
+            logger.info("验证码命中识别缓存")
+            result.set_result(_solution(captcha_type, cached, captcha_data))
+            return result
+
+        if captcha_type == "blockPuzzle":
+            keys = ("jigsawImageBase64", "originalImageBase64")
+        else:
+            keys = ("originalImageBase64",)
+        # 只传识别需要的字段，减少进程间序列化的数据量
+        recognizing = self._executor.submit(_recognize, captcha_type, {key: captcha_data[key] for key in keys})
+
+        def _done(future: Future):
+            if not result.set_running_or_notify_cancel():
+                return
+            try:
+                recognition = future.result()
+                # clickWord 没有识别出任何文字时不缓存，与本进程内识别一致
+                if captcha_type == "blockPuzzle" or recognition:
+                    CaptchaCacheManager.put(cache_key, recognition)
+                result.set_result(_solution(captcha_type, recognition, captcha_data))
+            except BaseException as e:
+                result.set_exception(e)
+
+        recognizing.add_done_callback(_done)
+        return result
+
+    def solve(self, captcha_type: str, captcha_data: Dict[str, Any]) -> str:
+        """同步识别一张验证码，阻塞到结果返回"""
+        return self.submit(captcha_type, captcha_data).result()
+
+    async def solve_async(self, captcha_type: str, captcha_data: Dict[str, Any]) -> str:
+        """异步识别一张验证码，等待期间不阻塞事件循环"""
+        import asyncio
+        return await asyncio.wrap_future(self.submit(captcha_type, captcha_data))
+
+    def wait_ready(self) -> int:
+        """
+        启动全部工作进程并等待其完成初始化（模型加载），避免首次识别时才付出启动成本。
+
+        Returns:
+            int: 已就绪的工作进程数。
+        """
+        # 同时提交与工作进程数相同的任务，迫使进程池启动全部进程
+        futures = [self._executor.submit(_ping) for _ in range(self.workers)]
+        return len({future.result() for future in futures})
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    @classmethod
+    def start(cls, workers: Optional[int] = None, warm_up: bool = True) -> "CaptchaService":
+        """启动（或返回已启动的）默认实例"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(workers, warm_up)
+            return cls._default
+
+    @classmethod
+    def get_default(cls) -> "CaptchaService | None":
+        """获取默认实例，未启动时返回 None，调用方在本进程内识别"""
+        return cls._default
+
+    @classmethod
+    def stop(cls):
+        """关闭默认实例"""
+        with cls._default_lock:
+            if cls._default is not None:
+                cls._default.shutdown()
+                cls._default = None
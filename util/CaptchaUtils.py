@@ -1,16 +1,278 @@
 import base64
+import hashlib
 import json
 import logging
+import os
 import random
 import struct
+import threading
 
 from cv2.typing import MatLike
 import numpy as np
 import onnxruntime as ort
 import cv2
 
+from manager.CaptchaCacheManager import CaptchaCacheManager
+
 logger = logging.getLogger(__name__)
 
+# 点选验证码使用的模型
+YOLO_MODEL_PATH = "./models/yolov5n.onnx"
+OCR_MODEL_PATH = "./models/ocr.onnx"
+
+# 滑块匹配算法，对应 config.json 的 captcha.slideMatcher
+SLIDE_MATCHER_FULL = "full"
+SLIDE_MATCHER_FAST = "fast"
+SLIDE_MATCHERS = (SLIDE_MATCHER_FULL, SLIDE_MATCHER_FAST)
+
+# OCR模型输出的类别id对应的字符，按类别id顺序排列
+OCR_CHARSET = (
+    "士候之科孩雪万章导治亲社所似验习吃历写业为睛睡将林法你观信掉觉站确老方道海性好感"
+    "女术如重细青流心包越且风哥菜劳必阶代令志国们记知谁讲眼提由民怎度村没呀许以四政点"
+    "离说带关答出放告夜识兴做难八叶月马办行三最小亮作晚义活公旁色看从话系高水您到装中"
+    "研雨住因少原什片准脚张深力让顶石山类野阵赶见七立整屋再读相弟两接种车近外几停认特"
+    "战化子定边多产形她衣共音分级别千连理往先队围满在领画他反花农被名这席众很渐乡极实"
+    "城取题儿响那主进去思找总应船身牛歌团爬岁着冲早利受忽苦也表通有像现对头开般呼又的"
+    "把帮收军怕饭或就年背来革压斗位房飞都块跳变今命区爱门入九动根南造其者便每事座算然"
+    "笑阳半大是会一非树旧里至无问发河物东叔它百拿叫明刚脸干样呢更底忙我结地界草论还轻"
+    "数世只用长个光此沙面白转哪想件文未啦口十人各并敌打古合完啊线回嘴究岸听内土跑日平"
+    "咱快坚真够工些已争得望伟却处但过唱时热走书不起神使本自倒比前新直经解步胜次该六后"
+    "报体家急际五北等员何火吗机当么天枪量意同决钱情手强全了可果气加学息黑刻而慢紧照指"
+    "改上运声二吧己字才教于向要建展句史给坐和第成落跟群星生部送服穿友下拉任太常场敢清"
+    "路破传空师切条"
+)
+# 字符到类别id的反向索引，用于按id匹配验证码要求的文字
+OCR_CHAR_TO_ID = {char: class_id for class_id, char in enumerate(OCR_CHARSET)}
+
+# ONNX Runtime 会话参数，对应 config.json 的 onnx 字段（A/auto.py 可用环境变量 ONNX_OPTIONS 传入 JSON）
+ONNX_OPTIONS_ENV = "ONNX_OPTIONS"
+DEFAULT_ONNX_OPTIONS = {
+    "intraOpThreads": 0,  # 单个算子内的线程数，0 为 ONNX Runtime 默认（物理核数）
+    "interOpThreads": 0,  # 算子间并行的线程数，仅 parallel 模式有效
+    "executionMode": "sequential",  # sequential / parallel
+    "graphOptimization": "all",  # disable / basic / extended / all
+    "allowSpinning": True,  # 线程空闲时是否自旋等待，共享的小型机器上关闭可减少 CPU 争用
+    "optimizedModelDir": None,  # 保存优化后模型的目录，之后直接加载，跳过图优化
+    "precision": "fp32",  # fp32 / int8，int8 需要先用 benchmark/quantize_models.py 量化并通过精度校验
+}
+
+# INT8 量化模型的精度校验结果，与模型放在同一目录，由 benchmark/quantize_models.py 生成
+INT8_GATE_FILE = "int8_gate.json"
+
+_EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+_onnx_options: dict = dict(DEFAULT_ONNX_OPTIONS)
+
+# 进程内的 ONNX 推理会话缓存：(模型绝对路径, 执行提供者, 会话参数) -> InferenceSession
+_onnx_sessions: dict[tuple[str, tuple[str, ...], tuple], ort.InferenceSession] = {}
+_onnx_sessions_lock = threading.Lock()
+
+
+def configure_onnx(options: dict | None = None):
+    """
+    设置 ONNX Runtime 会话参数，未指定的字段使用默认值。参数变化后已缓存的会话会被释放，下次使用时按新参数创建。
+
+    Args:
+        options (dict | None): 与 DEFAULT_ONNX_OPTIONS 相同结构的参数。
+
+    Raises:
+        ValueError: 参数名或取值无效。
+    """
+    merged = dict(DEFAULT_ONNX_OPTIONS)
+    for key, value in (options or {}).items():
+        if key not in DEFAULT_ONNX_OPTIONS:
+            raise ValueError(f"未知的 onnx 参数: {key}")
+        merged[key] = value
+    if merged["executionMode"] not in _EXECUTION_MODES:
+        raise ValueError(f"onnx.executionMode 只能是 {', '.join(_EXECUTION_MODES)}")
+    if merged["graphOptimization"] not in _GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"onnx.graphOptimization 只能是 {', '.join(_GRAPH_OPTIMIZATION_LEVELS)}")
+    if merged["precision"] not in ("fp32", "int8"):
+        raise ValueError("onnx.precision 只能是 fp32 或 int8")
+    for key in ("intraOpThreads", "interOpThreads"):
+        if not isinstance(merged[key], int) or merged[key] < 0:
+            raise ValueError(f"onnx.{key} 必须是非负整数")
+
+    global _onnx_options
+    if merged != _onnx_options:
+        _onnx_options = merged
+        release_onnx_sessions()
+
+
+def get_onnx_options() -> dict:
+    """当前生效的 ONNX Runtime 会话参数"""
+    return dict(_onnx_options)
+
+
+def _load_configured_onnx_options():
+    """读取 config.json 的 onnx 字段和环境变量 ONNX_OPTIONS（后者优先），读取失败时使用默认参数"""
+    options = {}
+    try:
+        from manager.ConfigManager import ConfigManager
+        options.update(ConfigManager.get("onnx", default=None) or {})
+        if os.environ.get(ONNX_OPTIONS_ENV):
+            options.update(json.loads(os.environ[ONNX_OPTIONS_ENV]))
+        configure_onnx(options)
+    except Exception as e:
+        logger.warning(f"ONNX Runtime 参数无效，使用默认参数: {e}")
+
+
+def _get_providers(use_gpu: bool) -> tuple[str, ...]:
+    return ("CUDAExecutionProvider", ) if use_gpu else ("CPUExecutionProvider", )
+
+
+def quantized_model_path(model_path: str) -> str:
+    """模型对应的 INT8 量化模型路径，例如 ./models/ocr.onnx -> ./models/ocr.int8.onnx"""
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.int8{ext}"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _resolve_model_path(model_path: str) -> str:
+    """
+    按 onnx.precision 选择实际加载的模型。int8 模式下只有量化模型存在、精度校验通过，
+    且量化模型和其 FP32 源模型都与校验时一致才会使用，否则回退到 FP32 模型。
+    """
+    if _onnx_options["precision"] != "int8":
+        return model_path
+    quantized_path = quantized_model_path(model_path)
+    gate_path = os.path.join(os.path.dirname(model_path), INT8_GATE_FILE)
+    try:
+        with open(gate_path, "r", encoding="utf-8") as f:
+            gate = json.load(f)
+    except Exception as e:
+        logger.warning(f"未找到 INT8 精度校验结果，使用 FP32 模型: {gate_path}, {e}")
+        return model_path
+    if not gate.get("passed"):
+        logger.warning(f"INT8 模型未通过精度校验，使用 FP32 模型: {gate_path}")
+        return model_path
+    recorded = gate.get("models", {}).get(os.path.basename(quantized_path), {})
+    if not os.path.exists(quantized_path) or file_sha256(quantized_path) != recorded.get("sha256"):
+        logger.warning(f"INT8 模型与精度校验时不一致，使用 FP32 模型: {quantized_path}")
+        return model_path
+    # FP32 模型更新后，旧权重量化出的 INT8 模型不再可用，需要重新量化和校验
+    if file_sha256(model_path) != recorded.get("sourceSha256"):
+        logger.warning(f"FP32 模型已更新，INT8 模型需要重新量化和校验，使用 FP32 模型: {model_path}")
+        return model_path
+    return quantized_path
+
+
+def _optimized_model_path(model_path: str, providers: tuple[str, ...]) -> str | None:
+    """优化后模型的保存路径；优化结果与优化级别、执行提供者和 ONNX Runtime 版本有关，都写入文件名"""
+    directory = _onnx_options["optimizedModelDir"]
+    if not directory:
+        return None
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    provider = providers[0].replace("ExecutionProvider", "").lower()
+    return os.path.join(directory,
+                        f"{name}.{_onnx_options['graphOptimization']}.{provider}.ort{ort.__version__}.onnx")
+
+
+def _create_onnx_session(model_path: str, providers: tuple[str, ...]) -> ort.InferenceSession:
+    """按当前参数创建推理会话，配置了 optimizedModelDir 时优先加载已保存的优化模型"""
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = _onnx_options["intraOpThreads"]
+    sess_options.inter_op_num_threads = _onnx_options["interOpThreads"]
+    sess_options.execution_mode = _EXECUTION_MODES[_onnx_options["executionMode"]]
+    sess_options.add_session_config_entry("session.intra_op.allow_spinning",
+                                          "1" if _onnx_options["allowSpinning"] else "0")
+    sess_options.add_session_config_entry("session.inter_op.allow_spinning",
+                                          "1" if _onnx_options["allowSpinning"] else "0")
+
+    optimized_path = _optimized_model_path(model_path, providers)
+    if optimized_path and os.path.exists(optimized_path) \
+            and os.path.getmtime(optimized_path) >= os.path.getmtime(model_path):
+        # 已经优化过的模型不需要再做图优化
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        try:
+            return ort.InferenceSession(optimized_path, sess_options, providers=list(providers))
+        except Exception as e:
+            logger.warning(f"加载优化后的模型失败，重新优化: {optimized_path}, {e}")
+
+    sess_options.graph_optimization_level = _GRAPH_OPTIMIZATION_LEVELS[_onnx_options["graphOptimization"]]
+    if optimized_path:
+        os.makedirs(os.path.dirname(optimized_path) or ".", exist_ok=True)
+        sess_options.optimized_model_filepath = optimized_path
+    return ort.InferenceSession(model_path, sess_options, providers=list(providers))
+
+
+def get_onnx_session(model_path: str,
+                     use_gpu: bool = False) -> ort.InferenceSession:
+    """
+    获取缓存的ONNX推理会话，首次使用时按 configure_onnx 设置的参数加载模型。
+
+    Args:
+        model_path (str): ONNX模型路径。
+        use_gpu (bool): 是否使用GPU进行推理。
+
+    Returns:
+        ort.InferenceSession: 同一模型、执行提供者和会话参数在进程内共享的推理会话。
+    """
+    providers = _get_providers(use_gpu)
+    key = (os.path.abspath(model_path), providers, tuple(sorted(_onnx_options.items())))
+    session = _onnx_sessions.get(key)
+    if session is not None:
+        return session
+    with _onnx_sessions_lock:
+        session = _onnx_sessions.get(key)
+        if session is None:
+            model_path = _resolve_model_path(model_path)
+            session = _create_onnx_session(model_path, providers)
+            _onnx_sessions[key] = session
+            logger.info(f"已加载ONNX模型: {model_path} ({providers[0]})")
+    return session
+
+
+def warm_up_onnx_sessions(model_paths: list[str] | None = None,
+                          use_gpu: bool = False):
+    """
+    预先加载ONNX模型，避免首次识别验证码时等待模型加载。
+
+    Args:
+        model_paths (list[str] | None): 要加载的模型路径，默认加载点选验证码使用的全部模型。
+        use_gpu (bool): 是否使用GPU进行推理。
+    """
+    for model_path in model_paths or [YOLO_MODEL_PATH, OCR_MODEL_PATH]:
+        try:
+            get_onnx_session(model_path, use_gpu)
+        except Exception as e:
+            logger.warning(f"预加载ONNX模型失败: {model_path}, {e}")
+
+
+def release_onnx_sessions(model_path: str | None = None):
+    """
+    释放缓存的ONNX推理会话。
+
+    Args:
+        model_path (str | None): 只释放该模型的会话，默认释放全部。
+    """
+    with _onnx_sessions_lock:
+        if model_path is None:
+            _onnx_sessions.clear()
+            return
+        model_path = os.path.abspath(model_path)
+        for key in [key for key in _onnx_sessions if key[0] == model_path]:
+            del _onnx_sessions[key]
+
+
+_load_configured_onnx_options()
+
 
 def calculate_precise_slider_distance(target_start_x: int, target_end_x: int,
                                       slider_width: int) -> float:
@@ -125,6 +387,130 @@ def slide_match(target_bytes: bytes, background_bytes: bytes) -> list:
         raise
 
 
+def _nonzero_row_range(target: np.ndarray) -> tuple[int, int]:
+    """返回滑块图中拼图块所在的行范围 [top, bottom)，优先使用透明通道"""
+    mask = target[..., 3] if target.ndim == 3 and target.shape[2] == 4 else target
+    rows = np.flatnonzero(mask.reshape(mask.shape[0], -1).any(axis=1))
+    if not len(rows):
+        return 0, target.shape[0]
+    return int(rows[0]), int(rows[-1]) + 1
+
+
+def _match_edges(background_edges: np.ndarray,
+                 target_edges: np.ndarray) -> tuple[int, float]:
+    """在单通道边缘图上做模板匹配，返回最佳匹配的左边界和相似度"""
+    res = cv2.matchTemplate(background_edges, target_edges, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    return max_loc[0], max_val
+
+
+def slide_match_fast(target_bytes: bytes,
+                     background_bytes: bytes,
+                     band_margin: int = 4,
+                     pyramid: bool = False,
+                     refine_radius: int = 3) -> list:
+    """
+    获取验证区域坐标，slide_match 的快速版本：
+    - 在单通道灰度图上提取边缘，不再转换为三通道
+    - 根据滑块图透明通道确定拼图块所在的行，只在背景图对应的水平带内搜索
+    - pyramid=True 时先在缩小一半的图像上粗匹配，再在原图的邻域内精确匹配
+
+    Args:
+        target_bytes (bytes): 滑块图片二进制数据。
+        background_bytes (bytes): 背景图片二进制数据。
+        band_margin (int): 水平带上下额外保留的像素。
+        pyramid (bool): 是否使用由粗到细的两级金字塔匹配。
+        refine_radius (int): 金字塔精匹配时左右搜索的像素范围。
+
+    Returns:
+        list: 目标区域左边界坐标，右边界坐标。
+    """
+    try:
+        target = cv2.imdecode(np.frombuffer(target_bytes, np.uint8), cv2.IMREAD_UNCHANGED)
+        background = cv2.imdecode(np.frombuffer(background_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+
+        # 只保留拼图块所在的水平带
+        top, bottom = _nonzero_row_range(target)
+        top = max(top - band_margin, 0)
+        bottom = min(bottom + band_margin, target.shape[0], background.shape[0])
+        if target.ndim == 3:
+            target = cv2.cvtColor(target, cv2.COLOR_BGRA2GRAY if target.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        target = target[top:bottom]
+        background = background[top:bottom]
+        w = target.shape[1]
+
+        target_edges = cv2.Canny(target, 100, 200)
+        background_edges = cv2.Canny(background, 100, 200)
+
+        if pyramid:
+            # 粗匹配：在缩小一半的图像上定位
+            coarse_x, _ = _match_edges(cv2.Canny(cv2.pyrDown(background), 100, 200),
+                                       cv2.Canny(cv2.pyrDown(target), 100, 200))
+            # 精匹配：只在原图中粗匹配位置附近搜索
+            left = max(coarse_x * 2 - refine_radius, 0)
+            right = min(coarse_x * 2 + refine_radius + w, background_edges.shape[1])
+            x, max_val = _match_edges(background_edges[:, left:right], target_edges)
+            x += left
+        else:
+            x, max_val = _match_edges(background_edges, target_edges)
+
+        logger.info(f"滑块匹配成功，最大相似度: {max_val}")
+        return [int(x), int(x + w)]
+
+    except Exception as e:
+        logger.error(f"滑块匹配时发生错误: {e}")
+        raise
+
+
+def _configured_slide_matcher() -> str:
+    """
+    读取 config.json 的 captcha.slideMatcher：full 为 slide_match（默认），
+    fast 为只在拼图块所在水平带内搜索的 slide_match_fast，切换前建议先用 benchmark.bench_slide_match 在真实语料上对比
+    """
+    try:
+        from manager.ConfigManager import ConfigManager
+        matcher = ConfigManager.get("captcha", "slideMatcher", default=SLIDE_MATCHER_FULL) or SLIDE_MATCHER_FULL
+    except Exception as e:
+        logger.warning(f"读取 captcha.slideMatcher 失败，使用 {SLIDE_MATCHER_FULL}: {e}")
+        return SLIDE_MATCHER_FULL
+    if matcher not in SLIDE_MATCHERS:
+        logger.warning(f"captcha.slideMatcher 取值无效: {matcher}，使用 {SLIDE_MATCHER_FULL}")
+        return SLIDE_MATCHER_FULL
+    return matcher
+
+
+def match_blockPuzzle(target_bytes: bytes, background_bytes: bytes) -> int:
+    """
+    计算滑块需要滑动的距离（不使用识别缓存）。
+
+    Args:
+        target_bytes (bytes): 滑块图像的二进制数据。
+        background_bytes (bytes): 背景图像的二进制数据。
+
+    Returns:
+        int: 滑动距离。
+    """
+    # 调用滑块匹配算法获取目标区域的坐标
+    matcher = slide_match_fast if _configured_slide_matcher() == SLIDE_MATCHER_FAST else slide_match
+    res = matcher(target_bytes=target_bytes, background_bytes=background_bytes)
+
+    # 从滑块图像提取宽度信息
+    target_width = extract_png_width(target_bytes)
+
+    # 计算滑块需要移动的距离
+    return calculate_precise_slider_distance(res[0], res[1], target_width)
+
+
+def blockPuzzle_solution(slider_distance: int) -> str:
+    """由滑动距离构造验证参数（JSON）"""
+    slider_data = {
+        "x": slider_distance,
+        "y": 5,
+    }  # 固定y值为5
+    logger.info(f"验证码识别成功: {slider_data}")
+    return json.dumps(slider_data, separators=(",", ":"))
+
+
 def recognize_blockPuzzle_captcha(target: str, background: str) -> str:
     """
     识别图像验证码。
@@ -141,24 +527,16 @@ def recognize_blockPuzzle_captcha(target: str, background: str) -> str:
         target_bytes = base64.b64decode(target)
         background_bytes = base64.b64decode(background)
 
-        # 调用滑块匹配算法获取目标区域的坐标
-        res = slide_match(target_bytes=target_bytes,
-                          background_bytes=background_bytes)
-
-        # 从滑块图像提取宽度信息
-        target_width = extract_png_width(target_bytes)
-
-        # 计算滑块需要移动的距离
-        slider_distance = calculate_precise_slider_distance(
-            res[0], res[1], target_width)
+        # 同一张验证码直接使用缓存的滑动距离
+        cache_key = CaptchaCacheManager.make_key("blockPuzzle", target_bytes, background_bytes)
+        slider_distance = CaptchaCacheManager.get(cache_key)
+        if slider_distance is None:
+            slider_distance = match_blockPuzzle(target_bytes, background_bytes)
+            CaptchaCacheManager.put(cache_key, slider_distance)
+        else:
+            logger.info("验证码命中识别缓存")
 
-        # 构造返回的数据，格式为JSON
-        slider_data = {
-            "x": slider_distance,
-            "y": 5,
-        }  # 固定y值为5
-        logger.info(f"验证码识别成功: {slider_data}")
-        return json.dumps(slider_data, separators=(",", ":"))
+        return blockPuzzle_solution(slider_distance)
 
     except Exception as e:
         logger.error(f"验证码识别时发生错误: {e}")
@@ -194,43 +572,59 @@ def detect_objects(model_path: str,
         input_img = (np.expand_dims(new_image.transpose(
             (2, 0, 1)), axis=0).astype(np.float32) / 255.0)
 
-        # 加载模型并运行
-        providers = ["CUDAExecutionProvider"
-                     ] if use_gpu else ["CPUExecutionProvider"]
-        session = ort.InferenceSession(model_path, providers=providers)
+        # 获取缓存的模型会话并运行
+        session = get_onnx_session(model_path, use_gpu)
         result = session.run(None, {session.get_inputs()[0].name: input_img})
 
-        # 解析模型输出并应用非极大值抑制（NMS）
-        detections = result[0][0]
-        boxes = [[
-            x_center - width / 2,
-            y_center - height / 2,
-            x_center + width / 2,
-            y_center + height / 2,
-        ] for x_center, y_center, width, height, confidence, *class_scores in
-                 detections if confidence >= 0.5]
-        scores = [
-            max(class_scores)
-            for _, _, _, _, confidence, *class_scores in detections
-            if confidence >= 0.5
-        ]
-
-        if boxes:
-            indices = cv2.dnn.NMSBoxes(boxes, scores, 0.5, 0.5)
-            boxes = [boxes[i] for i in indices]
-
-        # 将边界框坐标还原到原始图像的尺寸
-        return [[
-            int((x1 - dw) / scale),
-            int((y1 - dh) / scale),
-            int((x2 - dw) / scale),
-            int((y2 - dh) / scale),
-        ] for x1, y1, x2, y2 in boxes]
+        # 解析模型输出并将边界框坐标还原到原始图像的尺寸
+        return decode_yolo_output(result[0][0], scale, dw, dh)
 
     except Exception as e:
         raise ValueError(f"目标检测失败: {e}")
 
 
+def _preprocess_ocr_image(image: np.ndarray) -> np.ndarray:
+    """将文字切片缩放为64x64并转换为CHW格式的float32数组"""
+    return cv2.cvtColor(cv2.resize(image, (64, 64)),
+                        cv2.COLOR_BGR2RGB).transpose(
+                            (2, 0, 1)).astype(np.float32) / 255.0
+
+
+def decode_yolo_output(detections: np.ndarray,
+                       scale: float,
+                       dw: int,
+                       dh: int,
+                       conf_threshold: float = 0.5,
+                       nms_threshold: float = 0.5) -> list[list[int]]:
+    """
+    向量化解析YOLOv5输出，应用非极大值抑制（NMS）并还原到原始图像坐标。
+    :param detections: 模型输出，形状为 [N, 5 + 类别数]，每行为 (cx, cy, w, h, conf, *class_scores)。
+    :param scale: 预处理时的缩放比例。
+    :param dw: 预处理时水平方向的填充像素。
+    :param dh: 预处理时垂直方向的填充像素。
+    :param conf_threshold: 置信度阈值。
+    :param nms_threshold: NMS的IoU阈值。
+    :return: 边界框坐标列表，格式为 [[x1, y1, x2, y2], ...]。
+    """
+    candidates = detections[detections[:, 4] >= conf_threshold]
+    if not len(candidates):
+        return []
+
+    # 中心点+宽高 转换为 左上角+右下角
+    half_wh = candidates[:, 2:4] / 2
+    boxes = np.concatenate((candidates[:, 0:2] - half_wh,
+                            candidates[:, 0:2] + half_wh), axis=1)
+    scores = candidates[:, 5:].max(axis=1)
+
+    indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(),
+                               conf_threshold, nms_threshold)
+    boxes = boxes[np.asarray(indices, dtype=np.int64).reshape(-1)]
+
+    # 去除填充并按缩放比例还原
+    boxes = (boxes - np.array([dw, dh, dw, dh], dtype=boxes.dtype)) / scale
+    return boxes.astype(np.int64).tolist()
+
+
 def predict_ocr(model_path: str,
                 image: np.ndarray,
                 use_gpu: bool = False) -> str:
@@ -242,521 +636,111 @@ def predict_ocr(model_path: str,
     :return: 预测的字符。
     :raises: Exception 如果模型加载或推理过程中发生错误。
     """
+    return "".join(predict_ocr_batch(model_path, [image], use_gpu))
+
+
+def predict_ocr_batch(model_path: str,
+                      images: list[np.ndarray],
+                      use_gpu: bool = False) -> list[str]:
+    """
+    使用ONNX模型对多张文字切片进行批量OCR预测，只调用一次推理。
+    :param model_path: ONNX模型路径。
+    :param images: 待识别的图片列表（OpenCV格式，numpy.ndarray）。
+    :param use_gpu: 是否使用GPU进行推理。
+    :return: 与输入顺序一致的预测字符列表。
+    :raises: Exception 如果模型加载或推理过程中发生错误。
+    """
+    return [OCR_CHARSET[class_id] for class_id in predict_ocr_ids(model_path, images, use_gpu)]
+
+
+def predict_ocr_ids(model_path: str,
+                    images: list[np.ndarray],
+                    use_gpu: bool = False) -> np.ndarray:
+    """
+    批量OCR预测，返回类别id而不转换为字符。
+    :param model_path: ONNX模型路径。
+    :param images: 待识别的图片列表（OpenCV格式，numpy.ndarray）。
+    :param use_gpu: 是否使用GPU进行推理。
+    :return: 与输入顺序一致的类别id数组，可通过 OCR_CHARSET 转换为字符。
+    :raises: Exception 如果模型加载或推理过程中发生错误。
+    """
+    if not images:
+        return np.empty(0, dtype=np.int64)
     try:
-        # 加载ONNX模型
-        session = ort.InferenceSession(
-            model_path,
-            providers=(["CUDAExecutionProvider"]
-                       if use_gpu else ["CPUExecutionProvider"]),
-        )
+        # 获取缓存的ONNX模型会话
+        session = get_onnx_session(model_path, use_gpu)
 
-        # 预处理图片
-        image = np.expand_dims(
-            cv2.cvtColor(cv2.resize(image,
-                                    (64, 64)), cv2.COLOR_BGR2RGB).transpose(
-                                        (2, 0, 1)).astype(np.float32) / 255.0,
-            axis=0,
-        )
+        # 预处理图片并堆叠为NCHW张量
+        batch = np.stack([_preprocess_ocr_image(image) for image in images])
+
+        # 模型的批量维度固定时按该大小分批，否则一次推理全部切片
+        model_input = session.get_inputs()[0]
+        batch_size = model_input.shape[0]
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            batch_size = len(batch)
 
-        # 字符集
-        charset = [
-            "士",
-            "候",
-            "之",
-            "科",
-            "孩",
-            "雪",
-            "万",
-            "章",
-            "导",
-            "治",
-            "亲",
-            "社",
-            "所",
-            "似",
-            "验",
-            "习",
-            "吃",
-            "历",
-            "写",
-            "业",
-            "为",
-            "睛",
-            "睡",
-            "将",
-            "林",
-            "法",
-            "你",
-            "观",
-            "信",
-            "掉",
-            "觉",
-            "站",
-            "确",
-            "老",
-            "方",
-            "道",
-            "海",
-            "性",
-            "好",
-            "感",
-            "女",
-            "术",
-            "如",
-            "重",
-            "细",
-            "青",
-            "流",
-            "心",
-            "包",
-            "越",
-            "且",
-            "风",
-            "哥",
-            "菜",
-            "劳",
-            "必",
-            "阶",
-            "代",
-            "令",
-            "志",
-            "国",
-            "们",
-            "记",
-            "知",
-            "谁",
-            "讲",
-            "眼",
-            "提",
-            "由",
-            "民",
-            "怎",
-            "度",
-            "村",
-            "没",
-            "呀",
-            "许",
-            "以",
-            "四",
-            "政",
-            "点",
-            "离",
-            "说",
-            "带",
-            "关",
-            "答",
-            "出",
-            "放",
-            "告",
-            "夜",
-            "识",
-            "兴",
-            "做",
-            "难",
-            "八",
-            "叶",
-            "月",
-            "马",
-            "办",
-            "行",
-            "三",
-            "最",
-            "小",
-            "亮",
-            "作",
-            "晚",
-            "义",
-            "活",
-            "公",
-            "旁",
-            "色",
-            "看",
-            "从",
-            "话",
-            "系",
-            "高",
-            "水",
-            "您",
-            "到",
-            "装",
-            "中",
-            "研",
-            "雨",
-            "住",
-            "因",
-            "少",
-            "原",
-            "什",
-            "片",
-            "准",
-            "脚",
-            "张",
-            "深",
-            "力",
-            "让",
-            "顶",
-            "石",
-            "山",
-            "类",
-            "野",
-            "阵",
-            "赶",
-            "见",
-            "七",
-            "立",
-            "整",
-            "屋",
-            "再",
-            "读",
-            "相",
-            "弟",
-            "两",
-            "接",
-            "种",
-            "车",
-            "近",
-            "外",
-            "几",
-            "停",
-            "认",
-            "特",
-            "战",
-            "化",
-            "子",
-            "定",
-            "边",
-            "多",
-            "产",
-            "形",
-            "她",
-            "衣",
-            "共",
-            "音",
-            "分",
-            "级",
-            "别",
-            "千",
-            "连",
-            "理",
-            "往",
-            "先",
-            "队",
-            "围",
-            "满",
-            "在",
-            "领",
-            "画",
-            "他",
-            "反",
-            "花",
-            "农",
-            "被",
-            "名",
-            "这",
-            "席",
-            "众",
-            "很",
-            "渐",
-            "乡",
-            "极",
-            "实",
-            "城",
-            "取",
-            "题",
-            "儿",
-            "响",
-            "那",
-            "主",
-            "进",
-            "去",
-            "思",
-            "找",
-            "总",
-            "应",
-            "船",
-            "身",
-            "牛",
-            "歌",
-            "团",
-            "爬",
-            "岁",
-            "着",
-            "冲",
-            "早",
-            "利",
-            "受",
-            "忽",
-            "苦",
-            "也",
-            "表",
-            "通",
-            "有",
-            "像",
-            "现",
-            "对",
-            "头",
-            "开",
-            "般",
-            "呼",
-            "又",
-            "的",
-            "把",
-            "帮",
-            "收",
-            "军",
-            "怕",
-            "饭",
-            "或",
-            "就",
-            "年",
-            "背",
-            "来",
-            "革",
-            "压",
-            "斗",
-            "位",
-            "房",
-            "飞",
-            "都",
-            "块",
-            "跳",
-            "变",
-            "今",
-            "命",
-            "区",
-            "爱",
-            "门",
-            "入",
-            "九",
-            "动",
-            "根",
-            "南",
-            "造",
-            "其",
-            "者",
-            "便",
-            "每",
-            "事",
-            "座",
-            "算",
-            "然",
-            "笑",
-            "阳",
-            "半",
-            "大",
-            "是",
-            "会",
-            "一",
-            "非",
-            "树",
-            "旧",
-            "里",
-            "至",
-            "无",
-            "问",
-            "发",
-            "河",
-            "物",
-            "东",
-            "叔",
-            "它",
-            "百",
-            "拿",
-            "叫",
-            "明",
-            "刚",
-            "脸",
-            "干",
-            "样",
-            "呢",
-            "更",
-            "底",
-            "忙",
-            "我",
-            "结",
-            "地",
-            "界",
-            "草",
-            "论",
-            "还",
-            "轻",
-            "数",
-            "世",
-            "只",
-            "用",
-            "长",
-            "个",
-            "光",
-            "此",
-            "沙",
-            "面",
-            "白",
-            "转",
-            "哪",
-            "想",
-            "件",
-            "文",
-            "未",
-            "啦",
-            "口",
-            "十",
-            "人",
-            "各",
-            "并",
-            "敌",
-            "打",
-            "古",
-            "合",
-            "完",
-            "啊",
-            "线",
-            "回",
-            "嘴",
-            "究",
-            "岸",
-            "听",
-            "内",
-            "土",
-            "跑",
-            "日",
-            "平",
-            "咱",
-            "快",
-            "坚",
-            "真",
-            "够",
-            "工",
-            "些",
-            "已",
-            "争",
-            "得",
-            "望",
-            "伟",
-            "却",
-            "处",
-            "但",
-            "过",
-            "唱",
-            "时",
-            "热",
-            "走",
-            "书",
-            "不",
-            "起",
-            "神",
-            "使",
-            "本",
-            "自",
-            "倒",
-            "比",
-            "前",
-            "新",
-            "直",
-            "经",
-            "解",
-            "步",
-            "胜",
-            "次",
-            "该",
-            "六",
-            "后",
-            "报",
-            "体",
-            "家",
-            "急",
-            "际",
-            "五",
-            "北",
-            "等",
-            "员",
-            "何",
-            "火",
-            "吗",
-            "机",
-            "当",
-            "么",
-            "天",
-            "枪",
-            "量",
-            "意",
-            "同",
-            "决",
-            "钱",
-            "情",
-            "手",
-            "强",
-            "全",
-            "了",
-            "可",
-            "果",
-            "气",
-            "加",
-            "学",
-            "息",
-            "黑",
-            "刻",
-            "而",
-            "慢",
-            "紧",
-            "照",
-            "指",
-            "改",
-            "上",
-            "运",
-            "声",
-            "二",
-            "吧",
-            "己",
-            "字",
-            "才",
-            "教",
-            "于",
-            "向",
-            "要",
-            "建",
-            "展",
-            "句",
-            "史",
-            "给",
-            "坐",
-            "和",
-            "第",
-            "成",
-            "落",
-            "跟",
-            "群",
-            "星",
-            "生",
-            "部",
-            "送",
-            "服",
-            "穿",
-            "友",
-            "下",
-            "拉",
-            "任",
-            "太",
-            "常",
-            "场",
-            "敢",
-            "清",
-            "路",
-            "破",
-            "传",
-            "空",
-            "师",
-            "切",
-            "条",
-        ]
-
-        # 运行模型推理并处理输出
-        return "".join(charset[item] for item in session.run(
-            None, {session.get_inputs()[0].name: image})[1])
+        # 运行模型推理，第二个输出为每张切片的类别id
+        return np.concatenate([
+            np.asarray(session.run(None, {model_input.name: batch[i:i + batch_size]})[1]).reshape(-1)
+            for i in range(0, len(batch), batch_size)
+        ])
 
     except Exception as e:
         raise Exception(f"OCR预测失败: {e}")
 
 
+def decode_captcha_image(target_bytes: bytes) -> MatLike:
+    """将验证码图片的二进制数据解码为 OpenCV 格式"""
+    return cv2.imdecode(np.frombuffer(target_bytes, dtype=np.uint8),
+                        cv2.IMREAD_COLOR)
+
+
+def read_glyphs(image: MatLike, bboxes: list[list[int]]) -> list[list]:
+    """
+    裁剪检测到的文本框并批量识别其中的文字。
+
+    Args:
+        image (MatLike): 验证码图片。
+        bboxes (list[list[int]]): detect_objects 返回的文本框。
+
+    Returns:
+        list[list]: [[类别id, [x_min, y_min, x_max, y_max]], ...]，类别id 对应 OCR_CHARSET，识别失败时为空列表。
+    """
+    # 裁剪每个文本框，跳过超出图像范围的空切片
+    crops, crop_bboxes = [], []
+    for bbox in bboxes:
+        x_min, y_min, x_max, y_max = bbox
+        crop = image[max(y_min, 0):y_max, max(x_min, 0):x_max]
+        if crop.size == 0:
+            logger.warning(f"处理文本框时出错: 文本框超出图像范围 {bbox}")
+            continue
+        crops.append(crop)
+        crop_bboxes.append(bbox)
+
+    # 一次推理识别全部文本框
+    try:
+        class_ids = predict_ocr_ids(OCR_MODEL_PATH, crops)
+    except Exception as e:
+        logger.warning(f"处理文本框时出错: {e}")
+        return []
+    return [[class_id, [int(v) for v in bbox]]
+            for class_id, bbox in zip(class_ids.tolist(), crop_bboxes)]
+
+
+def recognize_glyphs(target_bytes: bytes) -> list[list]:
+    """
+    检测并识别点选验证码中的文字：decode_captcha_image → detect_objects → read_glyphs。
+
+    Args:
+        target_bytes (bytes): 验证码图片的二进制数据。
+
+    Returns:
+        list[list]: 同 read_glyphs。
+    """
+    image = decode_captcha_image(target_bytes)
+    return read_glyphs(image, detect_objects(YOLO_MODEL_PATH, image))
+
+
 def recognize_clickWord_captcha(target: str, wordlist: list) -> str:
     """
     从给定的图像中识别点击文字验证码，并返回单词的坐标。
@@ -775,27 +759,44 @@ def recognize_clickWord_captcha(target: str, wordlist: list) -> str:
     """
     target_bytes = base64.b64decode(target)
 
-    # 将图片转换为 OpenCV 格式
-    image = cv2.imdecode(np.frombuffer(target_bytes, dtype=np.uint8),
-                         cv2.IMREAD_COLOR)
+    # 同一张验证码直接使用缓存的类别id和文本框，不再做检测和识别
+    cache_key = CaptchaCacheManager.make_key("clickWord", target_bytes)
+    glyphs = CaptchaCacheManager.get(cache_key)
+    if glyphs is None:
+        glyphs = recognize_glyphs(target_bytes)
+        if glyphs:
+            CaptchaCacheManager.put(cache_key, glyphs)
+    else:
+        logger.info("验证码命中识别缓存")
+    return clickWord_solution(glyphs, wordlist)
 
-    bboxes = detect_objects("./models/yolov5n.onnx", image)
 
-    # 识别每个文本框中的文本，并存储为字典以便快速查找
-    recognized_dict = {}
-    for bbox in bboxes:
-        try:
-            x_min, y_min, x_max, y_max = bbox
-            text = predict_ocr("./models/ocr.onnx", image[y_min:y_max,
-                                                          x_min:x_max])
-            recognized_dict[text] = bbox
-        except Exception as e:
-            logger.warning(f"处理文本框时出错: {e}")
+def locate_glyphs(glyphs: list[list], wordlist: list) -> list[list[int] | None]:
+    """
+    按 wordlist 的顺序找到每个文字对应的文本框。
+
+    Args:
+        glyphs (list[list]): recognize_glyphs 的结果。
+        wordlist (list): 要点击的文字列表。
+
+    Returns:
+        list[list[int] | None]: 与 wordlist 一一对应的文本框，未识别出的文字为 None。
+    """
+    recognized_dict = dict(glyphs)  # 类别id -> 文本框
+    return [recognized_dict.get(OCR_CHAR_TO_ID.get(word)) for word in wordlist]
+
 
+def clickWord_solution(glyphs: list[list], wordlist: list) -> str:
+    """
+    按 wordlist 的顺序在识别出的文字中找到对应文本框，生成随机点击坐标（JSON）。
+
+    Args:
+        glyphs (list[list]): recognize_glyphs 的结果。
+        wordlist (list): 要点击的文字列表。
+    """
     # 根据wordlist的顺序找到对应的文本框，并生成随机坐标
     random_coordinates = []
-    for word in wordlist:
-        bbox = recognized_dict.get(word)
+    for word, bbox in zip(wordlist, locate_glyphs(glyphs, wordlist)):
         if bbox:
             # 生成随机坐标
             x = random.randint(bbox[0], bbox[2])
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from manager.ConfigManager import ConfigManager
+from util.RetryPolicy import classify_error
+
+logger = logging.getLogger(__name__)
+
+# 默认参数，可通过 config.json 的 circuitBreaker 节点覆盖
+CIRCUIT_BREAKER_DEFAULTS = {
+    "enable": True,
+    "windowSize": 20,  # 按最近多少次请求计算失败率
+    "minimumCalls": 10,  # 窗口内至少有这么多次请求才判断是否熔断
+    "failureRate": 0.5,  # 失败率达到该比例时打开熔断
+    "openSeconds": 30,  # 熔断打开后多久进入半开状态
+    "halfOpenProbes": 2,  # 半开状态放行的探测请求数，全部成功后关闭熔断
+}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ValueError):
+    """熔断打开期间请求被直接拒绝"""
+
+
+class CircuitBreaker:
+    """
+    进程内所有用户共享的接口熔断器：
+    - closed：正常放行，记录最近 windowSize 次请求的结果，失败率达到 failureRate 时打开
+    - open：直接拒绝请求（抛出 CircuitOpenError），不再逐个用户走完整的重试等待；openSeconds 后进入半开
+    - half_open：只放行 halfOpenProbes 个探测请求，全部成功则关闭，任一失败则重新打开
+    只有网络错误、超时和 HTTP 5xx 计为失败；业务错误、Token失效、429 说明服务端仍在正常响应，计为成功。
+    """
+    _default: "CircuitBreaker | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        options = {**CIRCUIT_BREAKER_DEFAULTS, **(options or {})}
+        self.enabled = bool(options["enable"])
+        self.window_size = max(int(options["windowSize"]), 1)
+        self.minimum_calls = max(int(options["minimumCalls"]), 1)
+        self.failure_rate = float(options["failureRate"])
+        self.open_seconds = float(options["openSeconds"])
+        self.half_open_probes = max(int(options["halfOpenProbes"]), 1)
+
+        self.state = CLOSED
+        self._outcomes: deque = deque(maxlen=self.window_size)  # True 为失败
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @staticmethod
+    def is_failure(error: Exception) -> bool:
+        """判断请求错误是否说明服务端不可用"""
+        retryable, _, kind = classify_error(error)
+        return retryable and kind not in ("http_429", "other")
+
+    def _transition(self, state: str):
+        """切换状态，调用方需持有锁"""
+        if state == self.state:
+            return
+        logger.warning(f"接口熔断状态 {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        elif state == HALF_OPEN:
+            self._probes_started = 0
+            self._probes_succeeded = 0
+        else:
+            self._outcomes.clear()
+
+    def before_request(self):
+        """
+        发送请求前调用。
+
+        Raises:
+            CircuitOpenError: 熔断打开，或半开状态下探测请求已满。
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if (self.state == HALF_OPEN and self._probes_started >= self.half_open_probes
+                    and time.monotonic() - self._opened_at >= self.open_seconds * 2):
+                # 探测请求一直没有结果（例如调用方异常退出），重新放行一轮探测
+                self._opened_at = time.monotonic() - self.open_seconds
+                self._probes_started = self._probes_succeeded = 0
+            if self.state == HALF_OPEN and self._probes_started < self.half_open_probes:
+                self._probes_started += 1
+                self.stats["requests"] += 1
+                return
+            if self.state != CLOSED:
+                self.stats["rejected"] += 1
+                remaining = max(self.open_seconds - (time.monotonic() - self._opened_at), 0)
+                raise CircuitOpenError(f"接口连续失败，已暂停请求（约 {remaining:.0f} 秒后重试）")
+            self.stats["requests"] += 1
+
+    def record_success(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_succeeded += 1
+                if self._probes_succeeded >= self.half_open_probes:
+                    self._transition(CLOSED)
+            elif self.state == CLOSED:
+                self._outcomes.append(False)
+
+    def record_failure(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.stats["failures"] += 1
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+            elif self.state == CLOSED:
+                self._outcomes.append(True)
+                if (len(self._outcomes) >= self.minimum_calls
+                        and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                    self._transition(OPEN)
+
+    def record_error(self, error: Exception):
+        """按错误类型记录一次请求结果"""
+        if self.is_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def is_open(self) -> bool:
+        """熔断是否处于打开状态（不含已到期、即将进入半开的情况）"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            failures = sum(self._outcomes)
+            return {
+                "state": self.state,
+                **self.stats,
+                "window_failure_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+            }
+
+    @classmethod
+    def configure(cls, options: Optional[Dict[str, Any]] = None):
+        """
+        替换默认实例。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 熔断配置，默认读取 config.json 的 circuitBreaker 节点。
+        """
+        with cls._default_lock:
+            if options is None:
+                options = ConfigManager.get("circuitBreaker", default={}) or {}
+            cls._default = cls(options)
+
+    @classmethod
+    def get_default(cls) -> "CircuitBreaker":
+        """获取默认实例，首次调用时按 config.json 的 circuitBreaker 节点创建"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls(ConfigManager.get("circuitBreaker", default={}) or {})
+        return cls._default
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """默认实例的统计，未创建时返回空字典"""
+        return cls._default.snapshot() if cls._default is not None else {}
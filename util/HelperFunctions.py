@@ -2,9 +2,8 @@ import logging
 import threading
 from datetime import datetime, timedelta
 
-import requests
-
 from manager.ConfigManager import ConfigManager
+from manager.HolidayCalendarManager import HolidayCalendarManager
 
 # 尝试导入主模块的日志上下文，失败则创建本地版本
 try:
@@ -108,70 +107,41 @@ def desensitize_address(address: str) -> str:
 
 def is_workday_realtime() -> bool:
     """
-    实时判断今天是否为法定工作日。
+    判断今天是否为法定工作日。
 
-    通过调用第三方节假日 API（https://timor.tech/api/holiday）获取当前日期的节假日信息，
-    并根据返回结果判断是否为法定工作日。若调用失败或解析异常，则降级使用 weekday 判断。
+    查询本地节假日日历（manager/HolidayCalendarManager，按年整体从 https://timor.tech/api/holiday 拉取并缓存），
+    日历缺失或过期时才会访问网络。若没有可用日历，则降级使用 weekday 判断。
 
     返回值:
         bool: True 表示是法定工作日，False 表示是非工作日（周末或节假日）
     """
-
-    check_date = datetime.today()
+    check_date = datetime.today().date()
     date_str = check_date.strftime("%Y-%m-%d")
-    url = f"https://timor.tech/api/holiday/info/{date_str}"
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-    }
-
-    # 默认降级结果：weekday < 5 为工作日
-    fallback_is_workday = check_date.weekday() < 5
-
-    try:
-        resp = requests.get(url, headers=headers, timeout=5)
-        if resp.status_code != 200:
-            logging.warning(f"API 非 200 状态码: {resp.status_code}, 内容: {resp.text[:200]}")
-            return fallback_is_workday
-
-        data = resp.json()
-        logging.debug(f"API 返回数据: {data}")
 
-        # Timor API：code == 0 表示请求成功
-        if data.get("code") != 0:
-            logging.warning(f"API 业务码异常: {data}")
-            return fallback_is_workday
+    is_workday = HolidayCalendarManager.is_workday(check_date)
+    if is_workday is None:
+        # 默认降级结果：weekday < 5 为工作日
+        logging.warning(f"没有 {check_date.year} 年的节假日日历，按周一至周五判断")
+        is_workday = check_date.weekday() < 5
 
-        # 解析 type.type 字段以判断日期类型：
-        # 0 - 工作日；1 - 周末；2 - 节假日；3 - 调休日（视为工作日）
-        day_type = data.get("type", {}).get("type")
-        if day_type is None:
-            logging.warning(f"返回数据缺少 type.type 字段: {data}")
-            return fallback_is_workday
+    logging.info(f"{date_str} 是否为法定工作日: {is_workday}")
+    return is_workday
 
-        is_workday = day_type in (0, 3)
-        logging.info(f"{date_str} 是否为法定工作日: {is_workday}")
 
-        return is_workday
-
-    except Exception as e:
-        logging.error(f"API 调用异常: {e}")
-        return fallback_is_workday
-
-
-def get_checkin_type() -> dict[str, str]:
+def get_checkin_type(ctx=None) -> dict[str, str]:
     """
     获取打卡类型。
 
     该方法根据配置文件获取打卡类型，并返回一个字典，包含打卡类型和显示名称。
 
+    Args:
+        ctx (Optional[UserContext]): 用户上下文，默认读取 ConfigManager。
+
     Returns:
         dict[str, str]: 包含打卡类型和显示名称的字典。
     """
-    mode = ConfigManager.get("clockIn", "mode")
+    get_config = ctx.get_config if ctx is not None else ConfigManager.get
+    mode = get_config("clockIn", "mode")
     # 1. 法定工作日模式
     if mode == "weekday":
         # 判断今天是否为工作日
@@ -186,7 +156,7 @@ def get_checkin_type() -> dict[str, str]:
 
     # 3. 自定义模式
     if mode == "customize":
-        custom_days = ConfigManager.get("clockIn", "customDays", default=[])
+        custom_days = get_config("clockIn", "customDays", default=[])
         today = datetime.today().weekday() + 1  # 1=星期一, 7=星期天
         if today in custom_days:
             return {"type": "START", "display": "上班"}
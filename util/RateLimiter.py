@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from manager.ConfigManager import ConfigManager
+
+logger = logging.getLogger(__name__)
+
+# 默认预算，可通过 config.json 的 rateLimit 节点覆盖：
+# global 作用于所有请求，endpoints 中的预算按接口路径前缀匹配，两者同时生效
+RATE_LIMIT_DEFAULTS = {
+    "enable": True,
+    "global": {"rate": 30, "burst": 30},
+    "endpoints": {
+        "captcha": {
+            "rate": 10,
+            "burst": 10,
+            "paths": ["session/captcha/", "attendence/clock/v1/get", "attendence/clock/v1/check"],
+        },
+        "login": {"rate": 5, "burst": 5, "paths": ["session/user/v6/login"]},
+        "clockIn": {"rate": 5, "burst": 5, "paths": ["attendence/clock/v5/save", "attendence/clock/teacher/v2/save"]},
+    },
+}
+
+
+class TokenBucket:
+    """
+    令牌桶：以 rate 个/秒的速度补充令牌，最多积攒 burst 个。
+    reserve 采用预约方式，令牌不足时仍扣减（允许为负）并返回需要等待的时间，
+    先预约的请求先放行，突发请求被均匀地摊开，空闲时积攒的令牌可以立即使用。
+    """
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "delayed": 0, "waiting": 0, "max_waiting": 0,
+                      "total_wait": 0.0, "max_wait": 0.0}
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预约令牌。
+
+        Returns:
+            float: 需要等待的秒数，0 表示可以立即发送。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["delayed"] += 1
+                self.stats["total_wait"] += wait
+                self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+            return wait
+
+    def _enter_queue(self):
+        with self._lock:
+            self.stats["waiting"] += 1
+            self.stats["max_waiting"] = max(self.stats["max_waiting"], self.stats["waiting"])
+
+    def _leave_queue(self):
+        with self._lock:
+            self.stats["waiting"] -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "requests": stats["requests"],
+            "delayed": stats["delayed"],
+            "waiting": stats["waiting"],
+            "max_waiting": stats["max_waiting"],
+            "total_wait_s": round(stats["total_wait"], 3),
+            "max_wait_ms": round(stats["max_wait"] * 1000, 1),
+            "mean_wait_ms": round(stats["total_wait"] / stats["requests"] * 1000, 1) if stats["requests"] else 0.0,
+        }
+
+
+class RateLimiter:
+    """
+    进程内共享的请求限速器：
+    - 所有用户的请求共用同一组令牌桶，并发用户增多时总请求速率不超过预算，避免被服务端限流或频繁触发验证码
+    - 每个请求同时消耗全局预算和所匹配接口的预算，等待时间取两者中较长的
+    - 同步请求用 acquire（time.sleep），异步请求用 acquire_async（asyncio.sleep），等待期间不占用事件循环
+    """
+    _default: "RateLimiter | None" = None
+    _default_lock = threading.Lock()
+    _scale: float = 1.0
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None, scale: float = 1.0):
+        """
+        Args:
+            options (Optional[Dict[str, Any]]): 与 RATE_LIMIT_DEFAULTS 相同结构的配置，未提供的字段使用默认值。
+            scale (float): 速率缩放比例，多个进程分摊同一份预算时按进程数缩小。
+        """
+        options = self._merge_options(options or {})
+        self.enabled = bool(options["enable"])
+        self.global_bucket = TokenBucket("global", options["global"]["rate"] * scale, options["global"]["burst"])
+        self.endpoint_buckets: List[tuple[tuple[str, ...], TokenBucket]] = []
+        for name, budget in options["endpoints"].items():
+            if not budget or not budget.get("paths"):
+                continue
+            bucket = TokenBucket(name, budget["rate"] * scale, budget.get("burst", budget["rate"]))
+            self.endpoint_buckets.append((tuple(path.lstrip("/") for path in budget["paths"]), bucket))
+
+    @staticmethod
+    def _merge_options(options: Dict[str, Any]) -> Dict[str, Any]:
+        endpoints = {name: dict(budget) for name, budget in RATE_LIMIT_DEFAULTS["endpoints"].items()}
+        for name, budget in (options.get("endpoints") or {}).items():
+            # 设为 null 可以去掉某个默认预算
+            endpoints[name] = {**endpoints.get(name, {}), **budget} if budget else None
+        return {
+            "enable": options.get("enable", RATE_LIMIT_DEFAULTS["enable"]),
+            "global": {**RATE_LIMIT_DEFAULTS["global"], **(options.get("global") or {})},
+            "endpoints": endpoints,
+        }
+
+    def _buckets_for(self, url: str) -> List[TokenBucket]:
+        path = url.lstrip("/")
+        buckets = [self.global_bucket]
+        for prefixes, bucket in self.endpoint_buckets:
+            if path.startswith(prefixes):
+                buckets.append(bucket)
+        return buckets
+
+    def reserve(self, url: str) -> tuple[float, List[TokenBucket]]:
+        """
+        为一次请求预约令牌。
+
+        Args:
+            url (str): 接口路径（不含 BASE_URL）。
+
+        Returns:
+            tuple[float, List[TokenBucket]]: 需要等待的秒数，以及令牌不足、造成等待的桶（用于统计排队数）。
+        """
+        if not self.enabled:
+            return 0.0, []
+        waits = [(bucket.reserve(), bucket) for bucket in self._buckets_for(url)]
+        return max(wait for wait, _ in waits), [bucket for wait, bucket in waits if wait > 0]
+
+    def acquire(self, url: str) -> float:
+        """同步等待到可以发送请求，返回实际等待的秒数"""
+        wait, buckets = self.reserve(url)
+        if wait > 0:
+            for bucket in buckets:
+                bucket._enter_queue()
+            try:
+                time.sleep(wait)
+            finally:
+                for bucket in buckets:
+                    bucket._leave_queue()
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """异步等待到可以发送请求，返回实际等待的秒数"""
+        import asyncio
+        wait, buckets = self.reserve(url)
+        if wait > 0:
+            for bucket in buckets:
+                bucket._enter_queue()
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                for bucket in buckets:
+                    bucket._leave_queue()
+        return wait
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各令牌桶的实时统计：waiting 为当前排队的请求数，max_waiting 为排队峰值"""
+        return {bucket.name: bucket.snapshot()
+                for bucket in [self.global_bucket, *(bucket for _, bucket in self.endpoint_buckets)]}
+
+    @classmethod
+    def configure(cls, options: Optional[Dict[str, Any]] = None, scale: Optional[float] = None):
+        """
+        替换默认实例。
+
+        Args:
+            options (Optional[Dict[str, Any]]): 限速配置，默认读取 config.json 的 rateLimit 节点。
+            scale (Optional[float]): 速率缩放比例，未提供时保持不变。
+        """
+        with cls._default_lock:
+            if scale is not None:
+                cls._scale = scale
+            if options is None:
+                options = ConfigManager.get("rateLimit", default={}) or {}
+            cls._default = cls(options, cls._scale)
+
+    @classmethod
+    def get_default(cls) -> "RateLimiter":
+        """获取默认实例，首次调用时按 config.json 的 rateLimit 节点创建"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls(ConfigManager.get("rateLimit", default={}) or {}, cls._scale)
+        return cls._default
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """默认实例的统计，未创建时返回空字典"""
+        return cls._default.stats() if cls._default is not None else {}
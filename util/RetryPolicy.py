@@ -0,0 +1,204 @@
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 默认重试参数，可通过用户配置的 retry 节点覆盖
+RETRY_DEFAULTS = {
+    "maxRetries": 5,  # 单次调用最多重试的次数
+    "baseDelay": 0.5,  # 退避的最短等待（秒）
+    "maxDelay": 8,  # 单次退避的最长等待（秒）
+    "callBudget": 20,  # 单次调用从开始到放弃的最长时间（秒）
+    "userBudget": 60,  # 同一用户所有调用累计用于重试的最长时间（秒），超过后不再重试
+}
+
+# 这些状态码表示服务端暂时不可用或限流，可以重试
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryExhausted(ValueError):
+    """放弃重试时抛出，保留最后一次的错误信息"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头。
+
+    Args:
+        value (Optional[str]): 秒数或 HTTP 日期。
+
+    Returns:
+        Optional[float]: 需要等待的秒数，无法解析时返回 None。
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def classify_error(error: Exception) -> tuple[bool, Optional[float], str]:
+    """
+    判断一次请求错误是否值得重试。
+
+    Returns:
+        tuple[bool, Optional[float], str]: (是否可重试, 服务端要求的等待秒数, 错误类别)
+    """
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        status = response.status_code if response is not None else None
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        return status in RETRYABLE_STATUS, retry_after, f"http_{status}"
+    if isinstance(error, requests.Timeout):
+        return True, None, "timeout"
+    if isinstance(error, requests.ConnectionError):
+        return True, None, "connection"
+    if isinstance(error, requests.RequestException):
+        # 包括响应不是合法 JSON 等情况
+        return True, None, "request"
+    # 包含中文的错误信息来自服务端业务响应，重试无意义
+    if re.search(r"[\u4e00-\u9fff]", str(error)):
+        return False, None, "business"
+    return True, None, "other"
+
+
+class RetryBudget:
+    """同一用户所有请求共用的重试时间预算，保存在 UserContext.retry_budget 中"""
+
+    def __init__(self, seconds: float):
+        self.limit = float(seconds)
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        with self._lock:
+            return max(self.limit - self.spent, 0.0)
+
+    def consume(self, seconds: float):
+        with self._lock:
+            self.spent += seconds
+
+
+class RetryCall:
+    """
+    单次调用的重试状态：next_delay 根据错误类型、剩余次数和时间预算决定是否重试以及等待多久。
+    等待时间使用 decorrelated jitter：在 [baseDelay, 上次等待 × 3] 之间随机取值并限制在 maxDelay 以内，
+    多个用户同时失败时重试时间自然错开。
+    """
+
+    def __init__(self, policy: "RetryPolicy", budget: RetryBudget):
+        self.policy = policy
+        self.budget = budget
+        self.started = time.monotonic()
+        self.retries = 0
+        self.token_refreshed = False
+        self._previous_delay = policy.base_delay
+        RetryPolicy.record("calls")
+
+    def next_delay(self, error: Exception) -> float:
+        """
+        Returns:
+            float: 下次重试前需要等待的秒数。
+
+        Raises:
+            RetryExhausted: 错误不可重试，或重试次数、单次调用时限、用户重试预算已用尽。
+        """
+        retryable, retry_after, kind = classify_error(error)
+        RetryPolicy.record(f"errors.{kind}")
+        if not retryable:
+            RetryPolicy.record("gave_up.fatal")
+            raise RetryExhausted(str(error))
+        if self.retries >= self.policy.max_retries:
+            RetryPolicy.record("gave_up.max_retries")
+            raise RetryExhausted(str(error))
+
+        delay = min(self.policy.max_delay,
+                    random.uniform(self.policy.base_delay, self._previous_delay * 3))
+        self._previous_delay = delay
+        if retry_after is not None:
+            # 服务端明确要求的等待时间优先，但不超过单次调用的时限
+            RetryPolicy.record("retry_after")
+            delay = max(delay, retry_after)
+
+        elapsed = time.monotonic() - self.started
+        if elapsed + delay > self.policy.call_budget:
+            RetryPolicy.record("gave_up.call_budget")
+            raise RetryExhausted(f"{error}（超过单次请求时限 {self.policy.call_budget:g} 秒）")
+        if delay > self.budget.remaining():
+            RetryPolicy.record("gave_up.user_budget")
+            raise RetryExhausted(f"{error}（该用户的重试时间已用尽）")
+
+        self.retries += 1
+        self.budget.consume(delay)
+        RetryPolicy.record("retries")
+        RetryPolicy.record("retry_wait", delay)
+        return delay
+
+
+class RetryPolicy:
+    """
+    请求重试策略：
+    - 按错误类型分类，业务错误（中文提示）和 4xx 直接放弃，网络错误、超时、5xx、429 重试
+    - 429/503 等响应带 Retry-After 时按服务端要求等待
+    - 单次调用有总时限，同一用户的累计重试时间有预算，个别账号异常不会拖住整个批次
+    - get_stats 汇总进程内所有调用的重试次数、等待时间和放弃原因
+    """
+    _stats: Dict[str, float] = {}
+    _stats_lock = threading.Lock()
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        options = {**RETRY_DEFAULTS, **(options or {})}
+        self.max_retries = int(options["maxRetries"])
+        self.base_delay = float(options["baseDelay"])
+        self.max_delay = float(options["maxDelay"])
+        self.call_budget = float(options["callBudget"])
+        self.user_budget = float(options["userBudget"])
+
+    @classmethod
+    def start_call(cls, ctx) -> RetryCall:
+        """
+        为一次请求创建重试状态，参数读取 ctx 的 retry 配置，重试预算在同一 ctx 的所有请求间共享。
+
+        Args:
+            ctx (UserContext): 用户上下文。
+        """
+        policy = cls(ctx.get_config("retry", default={}) or {})
+        if ctx.retry_budget is None:
+            ctx.retry_budget = RetryBudget(policy.user_budget)
+        return RetryCall(policy, ctx.retry_budget)
+
+    @classmethod
+    def record(cls, key: str, value: float = 1):
+        """
+        累加一项请求统计，get_stats 中一并输出。
+
+        Args:
+            key (str): 统计项名称，例如 token_refreshes。
+            value (float): 累加的值，默认为 1。
+        """
+        with cls._stats_lock:
+            cls._stats[key] = cls._stats.get(key, 0) + value
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, float]:
+        """进程内的重试统计：calls 调用数、retries 重试次数、retry_wait 累计等待秒数、errors.* 错误类别、gave_up.* 放弃原因"""
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        if "retry_wait" in stats:
+            stats["retry_wait"] = round(stats["retry_wait"], 3)
+        return stats
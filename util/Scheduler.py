@@ -0,0 +1,96 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledJob:
+    """当天计划执行一次的任务"""
+    name: str
+    run_at: datetime
+    func: Callable[[], Any]
+    done: bool = False
+
+
+class DailyScheduler:
+    """
+    基于截止时间的每日调度器：
+    - 每天零点（以及启动时）调用 planner 生成当天的任务列表，一天可以有多个任务
+    - 计算下一个截止时间（最近的待执行任务或次日零点）并睡眠到该时刻，不再按固定间隔轮询
+    - 单次睡眠不超过 max_sleep 秒，醒来后重新读取系统时间，以应对系统休眠和时钟跳变
+    """
+
+    def __init__(self,
+                 planner: Callable[[date], List[ScheduledJob]],
+                 max_sleep: float = 300,
+                 grace: float = 600):
+        """
+        Args:
+            planner (Callable[[date], List[ScheduledJob]]): 根据日期生成当天任务列表的函数。
+            max_sleep (float): 单次睡眠的最长秒数。
+            grace (float): 任务允许延迟执行的秒数，超过后视为错过并跳过（如时钟向前跳变、启动时已过计划时间）。
+        """
+        self.planner = planner
+        self.max_sleep = max_sleep
+        self.grace = grace
+        self.day: date | None = None
+        self.jobs: List[ScheduledJob] = []
+
+    def _plan(self, day: date):
+        if self.day is not None and day < self.day:
+            logger.warning(f"检测到系统时间回拨：{self.day} -> {day}，重新规划任务")
+        self.day = day
+        try:
+            self.jobs = sorted(self.planner(day), key=lambda job: job.run_at)
+        except Exception as e:
+            logger.exception(f"规划 {day} 的任务失败：{e}")
+            self.jobs = []
+        for job in self.jobs:
+            logger.info(f"计划任务 [{job.name}]：{job.run_at.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    def _run_due(self, now: datetime):
+        for job in self.jobs:
+            if job.done or job.run_at > now:
+                continue
+            job.done = True
+            delay = (now - job.run_at).total_seconds()
+            if delay > self.grace:
+                logger.warning(f"任务 [{job.name}] 已错过计划时间 {job.run_at.strftime('%H:%M')}，跳过")
+                continue
+            logger.info(f"执行任务 [{job.name}]")
+            try:
+                job.func()
+            except Exception as e:
+                logger.exception(f"任务 [{job.name}] 执行失败：{e}")
+
+    def next_deadline(self) -> datetime:
+        """下一个需要醒来的时刻：最近的待执行任务或次日零点"""
+        next_midnight = datetime.combine(self.day + timedelta(days=1), datetime.min.time())
+        pending = [job.run_at for job in self.jobs if not job.done]
+        return min(pending + [next_midnight])
+
+    def run_pending(self) -> datetime:
+        """
+        处理当前时刻：必要时重新规划当天任务并执行已到期的任务。
+
+        Returns:
+            datetime: 下一个截止时间。
+        """
+        now = datetime.now()
+        if now.date() != self.day:
+            self._plan(now.date())
+        self._run_due(now)
+        return self.next_deadline()
+
+    def run_forever(self):
+        """循环执行：处理到期任务后睡眠到下一个截止时间"""
+        while True:
+            deadline = self.run_pending()
+            remaining = (deadline - datetime.now()).total_seconds()
+            if remaining > 0:
+                logger.debug(f"下一个截止时间：{deadline}，睡眠 {min(remaining, self.max_sleep):.1f} 秒")
+                time.sleep(min(remaining, self.max_sleep))